@@ -1,4 +1,3 @@
-import base64
 from flask_apscheduler import APScheduler
 from flask import (
     Flask,
@@ -10,31 +9,90 @@ from flask import (
 )
 from flask_session import Session
 import logging
-import requests
 from datetime import datetime, timedelta
 from mqtt_client import MQTTClient
 from api_config_loader import load_api_config
 from sensor_data_simulator import SensorDataSimulator
+from static_assets import StaticAssets
+from job_queue import BackgroundJobQueue
+from feedback_outbox import FeedbackOutbox
+from online_learner import OnlineFeedbackLearner
+from service_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from log_setup import logging_from_environment, summarize
+from sampling_profiler import DEFAULT_INTERVAL, ProfilerBusyError, profile
+from db.database_connection import connect_to_database, load_config
+from db.local_database import connect_local_database
+from local_broker import LocalBroker
+from virtual_clock import clock_from_environment
+from team_standings import PERIODS as STANDINGS_PERIODS, TeamStandings
+from competition_scoring import (
+    READING_COLUMNS,
+    determine_winner,
+    rank_scores,
+    score_teams,
+    team_results,
+    total_scores,
+)
+from sensor_views import (
+    format_future_data,
+    future_timestamp,
+    is_valid_basic_auth,
+    latest_data_payload,
+    plots_payload,
+    sensor_data_payload,
+)
 import numpy as np
 import redis
 import os
+import tempfile
 import time
 import random
 
 
-logging.basicConfig(level=logging.INFO)
+logging_from_environment()
 base_dir = os.path.abspath(os.path.dirname(__file__))
 static_folder = os.path.join(base_dir, "static")
 
+# Mit LOCAL_SERVICES=1 (Benchmarks, Lasttests) verbindet sich die Anwendung
+# weder mit dem MQTT-Broker noch mit PostgreSQL oder der Feedback-API:
+# MQTT läuft über den Broker-Ersatz, die Datenbank ist eine SQLite-Datei und
+# alle geschriebenen Dateien (Sessions, Outbox, Wertungen, Online-Modell)
+# liegen in einem temporären Verzeichnis statt im Projekt.
+LOCAL_SERVICES = os.environ.get("LOCAL_SERVICES") == "1"
+local_dir = tempfile.mkdtemp(prefix="smart_ventilation-") if LOCAL_SERVICES else None
+
+
+def local_path(path):
+    """
+    :return: im lokalen Modus der Pfad im temporären Verzeichnis, sonst ``path``
+    """
+    if LOCAL_SERVICES:
+        return os.path.join(local_dir, os.path.basename(path))
+    return path
+
+
+def connect_feedback_database():
+    """
+    :return: Verbindung zur Datenbank mit feedback_tabelle
+    """
+    if LOCAL_SERVICES:
+        return connect_local_database(local_path("local_database.db"))
+    return connect_to_database(load_config("db/db_config.yaml"))
+
+
 app = Flask(__name__, static_folder=static_folder)
 app.config["SECRET_KEY"] = os.environ.get("FLASK_SECRET_KEY", "default_secret_key")
 # app.config["SESSION_TYPE"] = "redis"
 # app.config["SESSION_REDIS"] = "redis://localhost:6379"
 app.config["SESSION_TYPE"] = "filesystem"
+app.config["SESSION_FILE_DIR"] = local_path(os.path.join(os.getcwd(), "flask_session"))
 
 # Initialize Flask-Session
 Session(app)
 
+# Statische Dateien mit Fingerprint und langlebigem Caching ausliefern
+StaticAssets(app)
+
 
 # Pfad zu YAML-Konfigurationsdatei
 config_file_path = "api_config.yaml"
@@ -47,9 +105,33 @@ READ_API_KEY = api_config["READ_API_KEY"]
 POST_API_KEY = api_config["POST_API_KEY"]
 API_BASE_URL = api_config["API_BASE_URL"]
 CONTENT_TYPE = api_config["CONTENT_TYPE"]
-
-# MQTT-Client initialisieren
-mqtt_client = MQTTClient()
+FEEDBACK_OUTBOX_PATH = local_path(
+    api_config.get("FEEDBACK_OUTBOX_PATH", "outbox/feedback_outbox.db")
+)
+TEAM_STANDINGS_PATH = local_path(
+    api_config.get("TEAM_STANDINGS_PATH", "standings/team_standings.json")
+)
+ONLINE_MODEL_PATH = local_path(
+    api_config.get("ONLINE_MODEL_PATH", "models/Online_Logistic_Regression.pkl")
+)
+ONLINE_LEARNER_STATE_PATH = local_path(
+    api_config.get("ONLINE_LEARNER_STATE_PATH", "models/online_learner_state.pkl")
+)
+ONLINE_LEARNER_INTERVAL = api_config.get("ONLINE_LEARNER_INTERVAL", 60)
+ONLINE_MODEL_PUBLISH_INTERVAL = api_config.get("ONLINE_MODEL_PUBLISH_INTERVAL", 600)
+# Unter dem Standard-Timeout der gunicorn-Worker (30 Sekunden) bleiben
+PROFILE_MAX_SECONDS = api_config.get("PROFILE_MAX_SECONDS", 25)
+
+# MQTT-Client initialisieren (mit REPLAY_SPEED im beschleunigten Replay-Modus)
+if LOCAL_SERVICES:
+    local_broker = LocalBroker()
+    mqtt_client = MQTTClient(
+        clock=clock_from_environment(),
+        client=local_broker.client(),
+        conn=connect_feedback_database(),
+    )
+else:
+    mqtt_client = MQTTClient(clock=clock_from_environment())
 mqtt_client.initialize()
 
 # Sensor-Daten-Simulator initialisieren (für echte Sensordaten)
@@ -66,6 +148,40 @@ scheduler = APScheduler()
 scheduler.init_app(app)
 scheduler.start()
 
+# Teams des Klassen-Wettbewerbs
+TEAM_NAMES = ["Team A", "Team B"]
+
+# Laufende Tages-, Wochen- und Halbjahreswertungen der Teams
+team_standings = TeamStandings(TEAM_NAMES, TEAM_STANDINGS_PATH)
+
+# Hintergrundaufträge für langsame Abfragen (z. B. zukünftige Daten im Leaderboard).
+# fetch_future_data fragt bis zu 5 Minuten lang ab und der Schlüssel (Minute)
+# wechselt jede Minute, daher laufen bis zu 6 Aufträge gleichzeitig.
+background_jobs = BackgroundJobQueue(max_workers=6, max_pending=6)
+
+# Feedback wird lokal zwischengespeichert und im Hintergrund an die API gesendet
+feedback_outbox = FeedbackOutbox(
+    FEEDBACK_OUTBOX_PATH,
+    API_BASE_URL,
+    headers={"X-Api-Key": POST_API_KEY, "Content-Type": CONTENT_TYPE},
+    on_sent=mqtt_client.store_feedback_data,
+)
+# Im lokalen Modus bleibt das Feedback in der Outbox und wird nicht gesendet
+if not LOCAL_SERVICES:
+    feedback_outbox.start()
+
+# Online-Modell lernt im Hintergrund aus neuen Zeilen in feedback_tabelle
+# und wird periodisch als zusätzliches Vorhersagemodell übernommen
+online_learner = OnlineFeedbackLearner(
+    connect_feedback_database,
+    model_path=ONLINE_MODEL_PATH,
+    state_path=ONLINE_LEARNER_STATE_PATH,
+    interval=ONLINE_LEARNER_INTERVAL,
+    publish_interval=ONLINE_MODEL_PUBLISH_INTERVAL,
+    on_publish=lambda model: mqtt_client.set_model("Online Logistic Regression", model),
+)
+online_learner.start()
+
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -91,7 +207,7 @@ def index():
             ambient_temp = sensor_data.get("ambient_temp", 0)
             predictions = sensor_data.get("predictions", {})
 
-        # index.html Templates mit Sensordaten und Cache-Busting rendern
+        # index.html Templates mit Sensordaten rendern
         response = make_response(
             render_template(
                 "index.html",
@@ -102,7 +218,6 @@ def index():
                 tvoc=tvoc,
                 ambient_temp=ambient_temp,
                 predictions=predictions,
-                version=time.time(),
             )
         )
 
@@ -118,7 +233,7 @@ def index():
         logging.error(
             "Ein Fehler ist in index() aufgetreten: %s. Sensordaten: %s",
             str(e),
-            str(mqtt_client.combined_data),
+            summarize(mqtt_client.combined_data),
         )
         return (
             "Es gab ein Problem bei der Verarbeitung Ihrer Anfrage. Bitte aktualisieren Sie die Seite.",
@@ -136,49 +251,8 @@ def plots():
     try:
         sensor_data = mqtt_client.get_latest_sensor_data()
 
-        if sensor_data:
-            time_data = [data.get("time", None) for data in sensor_data]
-            co2_data = [data.get("co2", None) for data in sensor_data]
-            temperature_data = [data.get("temperature", None) for data in sensor_data]
-            humidity_data = [data.get("humidity", None) for data in sensor_data]
-            tvoc_data = [data.get("tvoc", None) for data in sensor_data]
-            ambient_temp_data = [data.get("ambient_temp", None) for data in sensor_data]
-
-            def fill_missing_with_last_known(data):
-                last_known = None
-                for i in range(len(data)):
-                    if data[i] is not None:
-                        last_known = data[i]
-                    elif last_known is not None:
-                        data[i] = last_known
-                return data
-
-            co2_data = fill_missing_with_last_known(co2_data)
-            temperature_data = fill_missing_with_last_known(temperature_data)
-            humidity_data = fill_missing_with_last_known(humidity_data)
-            tvoc_data = fill_missing_with_last_known(tvoc_data)
-            ambient_temp_data = fill_missing_with_last_known(ambient_temp_data)
-
-            return render_template(
-                "plots.html",
-                co2_data=co2_data,
-                temperature_data=temperature_data,
-                humidity_data=humidity_data,
-                tvoc_data=tvoc_data,
-                ambient_temp_data=ambient_temp_data,
-                time_data=time_data,
-            )
-        else:
-            # Falls keine Sensordaten verfügbar sind, leere Plots rendern
-            return render_template(
-                "plots.html",
-                co2_data=[],
-                temperature_data=[],
-                humidity_data=[],
-                tvoc_data=[],
-                ambient_temp_data=[],
-                time_data=[],
-            )
+        # Falls keine Sensordaten verfügbar sind, werden leere Plots gerendert
+        return render_template("plots.html", **plots_payload(sensor_data))
 
     except Exception as e:
         logging.error(f"Fehler in plots(): {e}")
@@ -198,10 +272,10 @@ def feedback():
     """
     Diese Funktion behandelt das Feedback der Benutzer bezüglich der Vorhersagen.
 
-    Wenn die Methode POST ist, wird das Feedback gesendet.
+    Wenn die Methode POST ist, wird das Feedback in die Outbox gelegt.
     Wenn die Methode GET ist, wird das Feedback-Formular angezeigt.
-    Validiert die Daten und sendet sie an die API.
-    Bei Erfolg wird die Dankeseite angezeigt.
+    Validiert die Daten und legt sie in der Outbox ab, von wo sie im
+    Hintergrund an die API gesendet werden. Danach wird sofort die Dankeseite angezeigt.
 
     :return: gerenderte HTML-Seite oder JSON-Antwort mit Fehlermeldung
     """
@@ -231,22 +305,9 @@ def feedback():
                 "accurate_prediction": accurate_prediction,
             }
 
-            headers = {"X-Api-Key": POST_API_KEY, "Content-Type": CONTENT_TYPE}
-            response = requests.post(API_BASE_URL, headers=headers, json=feedback_data)
+            feedback_outbox.enqueue(feedback_data)
 
-            if response.status_code == 200:
-                return render_template("thank_you.html")
-            else:
-                return (
-                    jsonify(
-                        {
-                            "Meldung": "Keine Rückmeldung übermittelt",
-                            "status": response.status_code,
-                            "response": response.text,
-                        }
-                    ),
-                    400,
-                )
+            return render_template("thank_you.html")
 
         except Exception as e:
             logging.error(f"feedback: Ein unerwarteter Fehler ist aufgetreten: {e}")
@@ -273,7 +334,6 @@ def feedback():
                     "feedback.html",
                     predictions=predictions,
                     features=features_df.to_dict(orient="records")[0],
-                    version=str(time.time()),
                 )
             )
 
@@ -365,11 +425,14 @@ def leaderboard():
                 f"Predictions Typ: {type(last_prediction)} und Wert: {last_prediction}"
             )
 
+            future_job_id = background_jobs.submit("future_data", adjusted_date_str)
+
             if last_prediction == 1:
                 response = render_template(
                     "leaderboard2.html",
                     current_data=formatted_current_data,
                     future_data=None,
+                    future_job_id=future_job_id,
                     adjusted_date_str=adjusted_date_str,
                     error=False,
                 )
@@ -378,6 +441,7 @@ def leaderboard():
                     "leaderboard.html",
                     current_data=formatted_current_data,
                     future_data=None,
+                    future_job_id=future_job_id,
                     adjusted_date_str=adjusted_date_str,
                     error=False,
                 )
@@ -398,7 +462,7 @@ def leaderboard():
                 )
 
             combined_data = mqtt_client.combined_data
-            logging.info(f"combined_data in leaderboard: {combined_data}")
+            logging.debug("combined_data in leaderboard: %s", summarize(combined_data))
 
             latest_date = combined_data["time"][-1]
             logging.info(
@@ -437,36 +501,8 @@ def leaderboard():
                 }
             ]
 
-            future_data_response = get_future_data(adjusted_date_str)
-
-            if future_data_response.status_code != 200:
-                return future_data_response
-
-            future_data = future_data_response.get_json()
-            logging.info(
-                f"aktuellste future_data innerhalb der Leaderboard-Funktion: {future_data}"
-            )
-
-            formatted_future_data = [
-                {
-                    "timestamp": future_data.get("timestamp"),
-                    "co2_values": (
-                        float(future_data.get("co2_values"))
-                        if future_data.get("co2_values") is not None
-                        else None
-                    ),
-                    "temperature": (
-                        float(future_data.get("temperature"))
-                        if future_data.get("temperature") is not None
-                        else None
-                    ),
-                    "humidity": (
-                        float(future_data.get("humidity"))
-                        if future_data.get("humidity") is not None
-                        else None
-                    ),
-                }
-            ]
+            # Zukünftige Daten im Hintergrund berechnen, die Seite fragt sie über /jobs ab
+            future_job_id = background_jobs.submit("future_data", adjusted_date_str)
 
             last_prediction = predictions.get("Logistic Regression")
 
@@ -478,7 +514,8 @@ def leaderboard():
                 response = render_template(
                     "leaderboard2.html",
                     current_data=formatted_current_data,
-                    future_data=formatted_future_data,
+                    future_data=None,
+                    future_job_id=future_job_id,
                     adjusted_date_str=adjusted_date_str,
                     error=False,
                 )
@@ -486,7 +523,8 @@ def leaderboard():
                 response = render_template(
                     "leaderboard.html",
                     current_data=formatted_current_data,
-                    future_data=formatted_future_data,
+                    future_data=None,
+                    future_job_id=future_job_id,
                     adjusted_date_str=adjusted_date_str,
                     error=False,
                 )
@@ -506,76 +544,67 @@ def leaderboard():
         )
 
 
-@app.route("/future_data/<timestamp>")
-def get_future_data(timestamp):
-    try:
-        # Überprüfen, ob die Anfrage Anmeldedaten enthält
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            auth_type, auth_credentials = auth_header.split(" ", 1)
-            if auth_type.lower() == "basic":
-                benutzername, passwort = (
-                    base64.b64decode(auth_credentials).decode("utf-8").split(":", 1)
-                )
-                if benutzername != "admin" or passwort != "HJ|*fS1i":
-                    return make_response(
-                        "Verifizierung fehlgeschlagen",
-                        401,
-                        {"WWW-Authenticate": 'Basic realm="Login erforderlich!"'},
-                    )
-            else:
-                return make_response(
-                    "Verifizierung fehlgeschlagen",
-                    401,
-                    {"WWW-Authenticate": 'Basic realm="Login erforderlich!"'},
-                )
-        else:
-            return make_response(
-                "Verifizierung fehlgeschlagen",
-                401,
-                {"WWW-Authenticate": 'Basic realm="Login erforderlich!"'},
-            )
+def check_basic_auth():
+    """
+    Prüft die Basic-Auth-Anmeldedaten der aktuellen Anfrage.
 
-        # Den eingehenden Zeitstempel analysieren
-        timestamp_dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M")
+    :return: None bei gültigen Anmeldedaten, sonst eine 401-Antwort
+    """
+    if is_valid_basic_auth(request.headers.get("Authorization")):
+        return None
+
+    return make_response(
+        "Verifizierung fehlgeschlagen",
+        401,
+        {"WWW-Authenticate": 'Basic realm="Login erforderlich!"'},
+    )
 
-        # 5 Minuten zum Zeitstempel hinzufügen
-        future_timestamp_dt = timestamp_dt + timedelta(minutes=5)
-        future_timestamp_str = future_timestamp_dt.strftime("%Y-%m-%d %H:%M")
 
-        logging.info(f"Abruf zukünftiger Daten für Zeitstempel: {future_timestamp_str}")
+def compute_future_data(timestamp):
+    """
+    Ruft die gemittelten Sensordaten ab, die 5 Minuten nach dem Zeitstempel liegen.
+    Kann bis zu 5 Minuten auf neue Daten warten und wird deshalb im Leaderboard
+    als Hintergrundauftrag ausgeführt.
 
-        # Zukünftige Daten sofort abrufen
-        future_data = mqtt_client.fetch_future_data(future_timestamp_str)
+    :param timestamp: Zeitstempel im Format "%Y-%m-%d %H:%M"
+    :return: formatierte Zukunftsdaten oder None, wenn keine Daten verfügbar sind
+    """
+    future_timestamp_str = future_timestamp(timestamp)
 
-        if not future_data:
-            logging.info(
-                f"Keine zukünftigen Daten für Zeitstempel verfügbar: {future_timestamp_str}"
-            )
-            return jsonify({"Fehler": "Keine zukünftigen Daten verfügbar"}), 404
+    logging.info(f"Abruf zukünftiger Daten für Zeitstempel: {future_timestamp_str}")
 
-        formatted_future_data = {
-            "timestamp": future_data.get("timestamp"),
-            "co2_values": (
-                float(future_data.get("co2_values"))
-                if future_data.get("co2_values") is not None
-                else None
-            ),
-            "temperature": (
-                float(future_data.get("temperature"))
-                if future_data.get("temperature") is not None
-                else None
-            ),
-            "humidity": (
-                float(future_data.get("humidity"))
-                if future_data.get("humidity") is not None
-                else None
-            ),
-        }
+    formatted_future_data = format_future_data(
+        mqtt_client.fetch_future_data(future_timestamp_str)
+    )
 
+    if formatted_future_data is None:
         logging.info(
-            f"Zukünftige Daten wurden erfolgreich abgerufen: {formatted_future_data}"
+            f"Keine zukünftigen Daten für Zeitstempel verfügbar: {future_timestamp_str}"
         )
+        return None
+
+    logging.info(
+        f"Zukünftige Daten wurden erfolgreich abgerufen: {formatted_future_data}"
+    )
+    return formatted_future_data
+
+
+background_jobs.register("future_data", compute_future_data)
+
+
+@app.route("/future_data/<timestamp>")
+def get_future_data(timestamp):
+    try:
+        # Überprüfen, ob die Anfrage Anmeldedaten enthält
+        auth_error = check_basic_auth()
+        if auth_error is not None:
+            return auth_error
+
+        formatted_future_data = compute_future_data(timestamp)
+
+        if formatted_future_data is None:
+            return jsonify({"Fehler": "Keine zukünftigen Daten verfügbar"}), 404
+
         return jsonify(formatted_future_data)
 
     except Exception as e:
@@ -583,6 +612,41 @@ def get_future_data(timestamp):
         return jsonify({"Fehler": str(e)}), 500
 
 
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    """
+    Gibt den Status eines Hintergrundauftrags zurück und, sobald er
+    abgeschlossen ist, dessen Ergebnis.
+
+    :return: JSON mit Status; 202 solange der Auftrag läuft, 200 wenn er fertig ist,
+             503 mit Retry-After, wenn er wegen voller Warteschlange abgelehnt wurde
+    """
+    try:
+        auth_error = check_basic_auth()
+        if auth_error is not None:
+            return auth_error
+
+        job = background_jobs.get(job_id)
+        if job is None:
+            return jsonify({"Fehler": "Unbekannter Auftrag"}), 404
+
+        if job.status in ("pending", "running"):
+            return jsonify(job.to_dict()), 202
+        if job.status == "rejected":
+            return (
+                jsonify(job.to_dict()),
+                503,
+                {"Retry-After": str(background_jobs.retry_after)},
+            )
+        if job.status == "failed":
+            return jsonify(job.to_dict()), 500
+        return jsonify(job.to_dict())
+
+    except Exception as e:
+        logging.error(f"get_job: Fehler beim Abrufen des Auftrags: {e}")
+        return jsonify({"Fehler": str(e)}), 500
+
+
 @app.route("/save_analysis_data", methods=["POST"])
 def save_analysis_data():
     try:
@@ -639,26 +703,21 @@ def clear_predictions_route():
         return jsonify({"Fehler in clear_predictions_route()": str(e)}), 500
 
 
+@app.route("/plots_data", methods=["GET"])
+def get_plots_data():
+    """
+    Liefert die Zeitreihen der Plots-Seite als JSON.
+    """
+    try:
+        return jsonify(plots_payload(mqtt_client.get_latest_sensor_data()))
+    except Exception as e:
+        logging.error(f"Fehler in get_plots_data(): {e}")
+        return jsonify({"Fehler": str(e)}), 500
+
+
 @app.route("/latest_data", methods=["GET"])
 def get_latest_data():
-    latest_data = {
-        "time": mqtt_client.latest_time,
-        "humidity": (
-            mqtt_client.combined_data.get("humidity")[-1]
-            if mqtt_client.combined_data.get("humidity")
-            else None
-        ),
-        "temperature": (
-            mqtt_client.combined_data.get("temperature")[-1]
-            if mqtt_client.combined_data.get("temperature")
-            else None
-        ),
-        "co2": (
-            mqtt_client.combined_data.get("co2")[-1]
-            if mqtt_client.combined_data.get("co2")
-            else None
-        ),
-    }
+    latest_data = latest_data_payload(mqtt_client)
     return jsonify(latest_data)
 
 
@@ -668,25 +727,8 @@ def get_sensor_data():
     Gibt die aktuellen Sensordaten zurück - bevorzugt Live-MQTT-Daten.
     """
     try:
-        current_data = mqtt_client.get_current_live_data()
-        data_source = "Live-MQTT"
-        
-        if not current_data:
-            current_data = sensor_simulator.get_current_data()
-            data_source = "Sensor-Simulator"
-        
-        if current_data:
-            return jsonify({
-                "status": "success",
-                "data": current_data,
-                "data_source": data_source,
-                "message": f"Sensordaten geladen von {data_source}"
-            })
-        else:
-            return jsonify({
-                "status": "error",
-                "message": "Keine Sensordaten verfügbar"
-            }), 404
+        payload, status = sensor_data_payload(mqtt_client, sensor_simulator)
+        return jsonify(payload), status
     except Exception as e:
         logging.error(f"Fehler beim Abrufen der Sensordaten: {e}")
         return jsonify({
@@ -695,6 +737,62 @@ def get_sensor_data():
         }), 500
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Gibt die Kennzahlen dieses Prozesses im Prometheus-Textformat zurück
+    (MQTT-Nachrichten, on_message-Dauer, Lock-, Datenbank- und Vorhersagezeiten,
+    Puffergrößen).
+    """
+    return make_response(REGISTRY.render(), 200, {"Content-Type": METRICS_CONTENT_TYPE})
+
+
+@app.route("/admin/profile", methods=["GET"])
+def admin_profile():
+    """
+    Profiliert alle Threads dieses Prozesses (MQTT-Netzwerkthread,
+    Vorhersage-Thread, Simulator, Request-Threads) für ``seconds`` Sekunden per
+    Stichproben und gibt die Stacks im collapsed-stack-Format zurück, z. B. für
+    ``flamegraph.pl profile.folded > profile.svg`` oder speedscope.
+
+    Parameter: ``seconds`` (Standard 10, höchstens PROFILE_MAX_SECONDS),
+    ``interval`` (Sekunden zwischen zwei Stichproben, Standard 0.01),
+    ``lines=1`` für Zeilennummern.
+
+    :return: Textdatei; 401 ohne Admin-Anmeldung, 409 wenn bereits ein Lauf aktiv ist
+    """
+    auth_error = check_basic_auth()
+    if auth_error is not None:
+        return auth_error
+
+    try:
+        seconds = min(float(request.args.get("seconds", 10)), PROFILE_MAX_SECONDS)
+        interval = max(float(request.args.get("interval", DEFAULT_INTERVAL)), 0.001)
+    except ValueError:
+        return jsonify({"Fehler": "seconds und interval müssen Zahlen sein"}), 400
+    lines = request.args.get("lines") == "1"
+
+    try:
+        profiler = profile(seconds, interval, lines)
+    except ProfilerBusyError as e:
+        return jsonify({"Fehler": str(e)}), 409
+
+    logging.info(
+        f"Profiling: {profiler.samples} Stichproben in {seconds}s, "
+        f"davon {profiler.sampling_seconds:.3f}s für das Sammeln"
+    )
+    filename = f"profile-{os.getpid()}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+    return make_response(
+        profiler.collapsed(),
+        200,
+        {
+            "Content-Type": "text/plain; charset=utf-8",
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(profiler.samples),
+        },
+    )
+
+
 @app.route("/thank_you")
 def thank_you():
     """
@@ -714,120 +812,159 @@ def contact():
     return render_template("contact.html")
 
 
+def current_team_readings():
+    """
+    Aktuelle Messwerte aller Teams. Team A: aktueller Messwert, Team B:
+    vorheriger Messwert (zeitversetzt). Ohne Live-MQTT-Daten wird der
+    Sensor-Simulator verwendet.
+
+    :return: Tuple (Liste der Messwerte pro Team oder leere Liste, Datenquelle)
+    """
+    recent_readings = mqtt_client.get_recent_readings(len(TEAM_NAMES))
+    data_source = "Live-MQTT"
+
+    if not recent_readings:
+        logging.info("Keine Live-MQTT-Daten verfügbar, verwende Sensor-Simulator als Fallback")
+        simulator_data = sensor_simulator.get_current_data()
+        recent_readings = [simulator_data] if simulator_data else []
+        data_source = "Sensor-Simulator"
+
+    if recent_readings:
+        # Fehlende zeitversetzte Werte durch den aktuellen Messwert ersetzen
+        recent_readings += [recent_readings[0]] * (
+            len(TEAM_NAMES) - len(recent_readings)
+        )
+    return recent_readings, data_source
+
+
+def readings_matrix(recent_readings):
+    """
+    :return: Array der Form (Teams, 3) in der Spaltenreihenfolge von READING_COLUMNS
+    """
+    return np.array(
+        [
+            [reading.get(column) for column in READING_COLUMNS]
+            for reading in recent_readings
+        ],
+        dtype=float,
+    )
+
+
+def reading_time():
+    """
+    Zeitpunkt des neuesten MQTT-Messwerts; ohne Messwerte (z. B. beim
+    Sensor-Simulator) die aktuelle Zeit der Uhr des MQTT-Clients.
+
+    :return: datetime
+    """
+    with mqtt_client.data_lock:
+        times = mqtt_client.combined_data.get("time")
+        latest = times[-1] if times else None
+    if latest is not None:
+        try:
+            return datetime.strptime(latest, "%Y-%m-%d %H:%M")
+        except (TypeError, ValueError):
+            logging.error(f"Ungültiger Zeitstempel im Messwert: {latest}")
+    return mqtt_client.clock.now()
+
+
+@scheduler.task("interval", id="update_team_standings", minutes=1)
+def update_team_standings():
+    """
+    Bewertet die Teams einmal pro Minute und übernimmt die Punktzahlen in die
+    laufenden Tages-, Wochen- und Halbjahreswertungen. Als Minute zählt der
+    Zeitpunkt des Messwerts, damit eine erneut gemeldete Minute ihre Wertung
+    ersetzt statt eine weitere Minute zu zählen.
+    """
+    try:
+        recent_readings, _ = current_team_readings()
+        if not recent_readings:
+            return
+        scores = score_teams(readings_matrix(recent_readings))
+        team_standings.record(reading_time(), scores["total_score"])
+    except Exception as e:
+        logging.error(f"Fehler beim Aktualisieren der Team-Wertungen: {e}")
+
+
+@app.route("/team-competition/standings")
+def team_competition_standings():
+    """
+    Gibt die Rangliste eines Zeitraums als JSON zurück.
+    Query-Parameter: period ("day", "week" oder "term", Standard: "day") und
+    optional key (z. B. "2024-05-06", "2024-W19" oder "2023/24-2").
+    """
+    period = request.args.get("period", "day")
+    if period not in STANDINGS_PERIODS:
+        return jsonify({"Fehler": f"Unbekannter Zeitraum: {period}"}), 400
+
+    standings = team_standings.leaderboard(period, request.args.get("key"))
+    if standings is None:
+        return jsonify({"Fehler": "Keine Wertungen für diesen Zeitraum verfügbar"}), 404
+    standings["available_keys"] = team_standings.periods(period)
+    return jsonify(standings)
+
+
 @app.route("/team-competition")
 def team_competition():
     """
-    Rendert die Team-Wettbewerbsseite mit Live-Daten für zwei Teams.
-    Verwendet echte Sensordaten für realistische Wettbewerbsdaten.
+    Rendert die Team-Wettbewerbsseite mit Live-Daten für alle Teams.
+    Verwendet echte Sensordaten für realistische Wettbewerbsdaten und bewertet
+    alle Teams in einem vektorisierten Durchlauf (siehe competition_scoring.py).
     """
     try:
-        current_sensor_data = mqtt_client.get_current_live_data()
-        
-        if not current_sensor_data:
-            logging.info("Keine Live-MQTT-Daten verfügbar, verwende Sensor-Simulator als Fallback")
-            current_sensor_data = sensor_simulator.get_current_data()
-        
-        if current_sensor_data:
-            team_a_temp = current_sensor_data['temperature']
-            team_a_co2 = current_sensor_data['co2']
-            team_a_humidity = current_sensor_data['humidity']
-            
-            team_b_data_staggered = mqtt_client.get_staggered_data()
-            if team_b_data_staggered:
-                team_b_temp = team_b_data_staggered['temperature']
-                team_b_co2 = team_b_data_staggered['co2']
-                team_b_humidity = team_b_data_staggered['humidity']
-            else:
-                team_b_temp = team_a_temp
-                team_b_co2 = team_a_co2
-                team_b_humidity = team_a_humidity
-            
-            team_a_data = {
-                'energy_consumption': round(max(2.0, min(4.0, 2.0 + (team_a_co2 - 400) / 800)), 2),
-                'air_quality_score': round(max(60, min(95, 100 - (team_a_co2 - 400) / 40)), 1),
-                'temperature_deviation': round(abs(team_a_temp - 20.0), 1),
-                'total_score': 0
-            }
-            
-            team_b_data = {
-                'energy_consumption': round(max(2.0, min(4.0, 2.0 + (team_b_co2 - 400) / 800)), 2),
-                'air_quality_score': round(max(60, min(95, 100 - (team_b_co2 - 400) / 40)), 1),
-                'temperature_deviation': round(abs(team_b_temp - 20.0), 1),
-                'total_score': 0
-            }
-            
-            # Bestimme Datenquelle für Logging
-            data_source = "Live-MQTT" if mqtt_client.get_current_live_data() else "Sensor-Simulator"
-            logging.info(f"Sensordaten verwendet ({data_source}): Team A - Temp={team_a_temp}°C, CO2={team_a_co2}ppm | Team B - Temp={team_b_temp}°C, CO2={team_b_co2}ppm")
-            
+        recent_readings, data_source = current_team_readings()
+
+        if recent_readings:
+            scores = score_teams(readings_matrix(recent_readings))
+
+            logging.info(
+                f"Sensordaten verwendet ({data_source}): "
+                + " | ".join(
+                    f"{name} - Temp={reading['temperature']}°C, CO2={reading['co2']}ppm"
+                    for name, reading in zip(TEAM_NAMES, recent_readings)
+                )
+            )
+
         else:
             # Fallback auf simulierte Daten wenn keine echten Daten verfügbar
             logging.warning("Keine echten Sensordaten verfügbar, verwende Fallback-Daten")
-            team_a_data = {
-                'energy_consumption': round(random.uniform(2.0, 3.2), 2),
-                'air_quality_score': round(random.uniform(75, 90), 1),
-                'temperature_deviation': round(random.uniform(0.8, 2.2), 1),
-                'total_score': 0
+            energy = np.round([random.uniform(2.0, 3.2), random.uniform(1.9, 3.0)], 2)
+            air_quality = np.round([random.uniform(75, 90), random.uniform(78, 92)], 1)
+            temp_deviation = np.round([random.uniform(0.8, 2.2), random.uniform(0.6, 2.0)], 1)
+            total = total_scores(energy, air_quality, temp_deviation)
+            scores = {
+                "energy_consumption": energy,
+                "air_quality_score": air_quality,
+                "temperature_deviation": temp_deviation,
+                "total_score": total,
+                "rank": rank_scores(total),
             }
-            
-            team_b_data = {
-                'energy_consumption': round(random.uniform(1.9, 3.0), 2),
-                'air_quality_score': round(random.uniform(78, 92), 1),
-                'temperature_deviation': round(random.uniform(0.6, 2.0), 1),
-                'total_score': 0
-            }
-        
-
-        def calculate_score(energy, air_quality, temp_deviation):
-            energy_score = max(60, 100 - (energy - 2.0) * 20)
-            
-            air_quality_score = air_quality
-            
-
-            temp_score = max(70, 100 - temp_deviation * 10)
-            
-            # Gewichtete Summe: Luftqualität ist wichtiger
-            return (energy_score * 0.25 + air_quality_score * 0.5 + temp_score * 0.25)
-        
-        team_a_data['total_score'] = round(calculate_score(
-            team_a_data['energy_consumption'], 
-            team_a_data['air_quality_score'], 
-            team_a_data['temperature_deviation']
-        ), 1)
-        
-        team_b_data['total_score'] = round(calculate_score(
-            team_b_data['energy_consumption'], 
-            team_b_data['air_quality_score'], 
-            team_b_data['temperature_deviation']
-        ), 1)
-        
-        # Bestimme den Gewinner
-        winner = "Team A" if team_a_data['total_score'] > team_b_data['total_score'] else "Team B"
-        if team_a_data['total_score'] == team_b_data['total_score']:
-            winner = "Unentschieden"
-        
-
-        data_source = "Live-MQTT" if mqtt_client.get_current_live_data() else "Sensor-Simulator"
-        
-        logging.info(f"Team A Score: {team_a_data['total_score']}, Team B Score: {team_b_data['total_score']}, Gewinner: {winner}")
-        
+
+        teams = team_results(TEAM_NAMES, scores)
+        winner = determine_winner(teams)
+
+        logging.info(
+            ", ".join(f"{team['name']} Score: {team['total_score']}" for team in teams)
+            + f", Gewinner: {winner}"
+        )
+
         return render_template(
             "team_competition.html",
-            team_a=team_a_data,
-            team_b=team_b_data,
+            team_a=teams[0],
+            team_b=teams[1],
+            teams=teams,
             winner=winner,
             data_source=data_source,
             current_time=int(time.time()),
-            version=time.time()
         )
-        
+
     except Exception as e:
         logging.error(f"Fehler in team_competition: {e}")
         # Fallback auf Standard-Daten bei Fehlern
         team_a_data = {'energy_consumption': 2.5, 'air_quality_score': 90.0, 'temperature_deviation': 1.0, 'total_score': 85.0}
         team_b_data = {'energy_consumption': 2.8, 'air_quality_score': 87.0, 'temperature_deviation': 1.2, 'total_score': 82.0}
         winner = "Team A"
-        
+
         return render_template(
             "team_competition.html",
             team_a=team_a_data,
@@ -835,7 +972,6 @@ def team_competition():
             winner=winner,
             data_source="Fallback-Daten",
             current_time=int(time.time()),
-            version=time.time()
         )
 
 
@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from mqtt_client import MQTTClient
 from api_config_loader import load_api_config
 from sensor_data_simulator import SensorDataSimulator
+from static_assets import StaticAssets
 import numpy as np
 import redis
 import os
@@ -35,6 +36,9 @@ app.config["SESSION_TYPE"] = "filesystem"
 # Initialize Flask-Session
 Session(app)
 
+# Statische Dateien mit Fingerprint und langlebigem Caching ausliefern
+StaticAssets(app)
+
 
 # Pfad zu YAML-Konfigurationsdatei
 config_file_path = "api_config.yaml"
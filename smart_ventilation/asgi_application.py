@@ -0,0 +1,279 @@
+"""
+Asynchroner Servermodus (ASGI) für die lesenden Endpunkte.
+
+Stellt ``/latest_data``, ``/sensor_data``, ``/future_data/<timestamp>`` und
+``/plots_data`` mit derselben Logik wie die Flask-Anwendung bereit
+(siehe ``sensor_views.py``). Datenbankabfragen laufen über einen asyncpg-Pool,
+Ergebnisse von ``/future_data`` werden in Redis zwischengespeichert. Langsame
+Abfragen belegen dadurch keinen Worker, sondern nur eine Coroutine.
+
+Start:
+    uvicorn asgi_application:app --host 0.0.0.0 --port 8001 --workers 4
+"""
+
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import asyncpg
+import redis.asyncio as aioredis
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from db.database_connection import load_config
+from log_setup import logging_from_environment
+from mqtt_client import MQTTClient
+from sensor_data_simulator import SensorDataSimulator
+from sensor_views import (
+    format_future_data,
+    future_timestamp,
+    is_valid_basic_auth,
+    latest_data_payload,
+    plots_payload,
+    sensor_data_payload,
+)
+from virtual_clock import clock_from_environment
+
+logging_from_environment()
+
+db_config_path = "db/db_config.yaml"
+REDIS_URL = os.environ.get("REDIS_URL")
+
+FUTURE_DATA_QUERY = """
+    SELECT
+        AVG(co2_values) as co2_values,
+        AVG(temperature) as temperature,
+        AVG(humidity) as humidity
+    FROM classroom_environmental_data
+    WHERE timestamp > $1;
+"""
+
+
+class AsyncSensorStore:
+    """
+    Asynchroner Zugriff auf die PostgreSQL-Datenbank mit Redis-Cache.
+    Gleichzeitige Anfragen für denselben Zeitstempel teilen sich eine Abfrage.
+    """
+
+    def __init__(self, config, redis_url=None, cache_ttl=600):
+        """
+        :param config: Datenbankkonfiguration aus ``db_config.yaml``
+        :param redis_url: URL des Redis-Servers oder None ohne Cache
+        :param cache_ttl: Gültigkeitsdauer der Cache-Einträge in Sekunden
+        """
+        self.config = config
+        self.redis_url = redis_url
+        self.cache_ttl = cache_ttl
+        self.pool = None
+        self.cache = None
+        self.inflight = {}
+
+    async def open(self):
+        try:
+            self.pool = await asyncpg.create_pool(
+                database=self.config["NAME"],
+                user=self.config["USER"],
+                password=self.config["PASSWORD"],
+                host=self.config["HOST"],
+                port=int(self.config["PORT"]),
+                min_size=1,
+                max_size=10,
+            )
+            logging.info("Asynchroner Datenbank-Pool erfolgreich erstellt.")
+        except Exception as e:
+            logging.error(f"Fehler beim Erstellen des asynchronen Datenbank-Pools: {e}")
+
+        if self.redis_url:
+            try:
+                self.cache = aioredis.from_url(self.redis_url)
+                await self.cache.ping()
+            except Exception as e:
+                logging.error(f"Redis nicht erreichbar, Cache deaktiviert: {e}")
+                self.cache = None
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+        if self.cache is not None:
+            await self.cache.aclose()
+
+    async def _cache_get(self, key):
+        if self.cache is None:
+            return None
+        try:
+            value = await self.cache.get(key)
+            return json.loads(value) if value is not None else None
+        except Exception as e:
+            logging.error(f"Fehler beim Lesen aus dem Redis-Cache: {e}")
+            return None
+
+    async def _cache_set(self, key, value):
+        if self.cache is None:
+            return
+        try:
+            await self.cache.set(key, json.dumps(value), ex=self.cache_ttl)
+        except Exception as e:
+            logging.error(f"Fehler beim Schreiben in den Redis-Cache: {e}")
+
+    async def fetch_future_data(self, timestamp, max_attempts=30, wait_time=10):
+        """
+        Asynchrones Gegenstück zu ``MQTTClient.fetch_future_data``: fragt bis zu
+        5 Minuten lang ab, ob Daten nach dem Zeitstempel vorliegen.
+
+        :param timestamp: Zeitstempel im Format "%Y-%m-%d %H:%M"
+        :return: gemittelte Daten als Dictionary
+        """
+        cache_key = f"future_data:{timestamp}"
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        task = self.inflight.get(timestamp)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._poll_future_data(timestamp, max_attempts, wait_time)
+            )
+            self.inflight[timestamp] = task
+            task.add_done_callback(lambda _: self.inflight.pop(timestamp, None))
+
+        averaged_data = await asyncio.shield(task)
+        if averaged_data["co2_values"] is not None:
+            await self._cache_set(cache_key, averaged_data)
+        return averaged_data
+
+    async def _poll_future_data(self, timestamp, max_attempts, wait_time):
+        averaged_data = {
+            "timestamp": timestamp,
+            "co2_values": None,
+            "temperature": None,
+            "humidity": None,
+        }
+        if self.pool is None:
+            return averaged_data
+
+        timestamp_dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M")
+        try:
+            for attempt in range(max_attempts):
+                result = await self.pool.fetchrow(FUTURE_DATA_QUERY, timestamp_dt)
+                if result and any(val is not None for val in result):
+                    averaged_data.update(
+                        {
+                            "co2_values": (
+                                float(result[0]) if result[0] is not None else None
+                            ),
+                            "temperature": (
+                                float(result[1]) if result[1] is not None else None
+                            ),
+                            "humidity": (
+                                float(result[2]) if result[2] is not None else None
+                            ),
+                        }
+                    )
+                    break
+                await asyncio.sleep(wait_time)
+        except Exception as e:
+            logging.error(
+                f"fetch_future_data: Fehler beim asynchronen Abrufen von Zukunftsdaten: {e}"
+            )
+        return averaged_data
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # MQTT-Client und Sensor-Simulator wie in application.py initialisieren
+    app.state.mqtt_client = MQTTClient(clock=clock_from_environment())
+    app.state.mqtt_client.initialize()
+    app.state.sensor_simulator = SensorDataSimulator(app.state.mqtt_client)
+    app.state.sensor_simulator.start_simulation()
+
+    app.state.store = AsyncSensorStore(load_config(db_config_path), REDIS_URL)
+    await app.state.store.open()
+    try:
+        yield
+    finally:
+        await app.state.store.close()
+        app.state.sensor_simulator.running = False
+        app.state.mqtt_client.stop()
+
+
+# Die Methoden des MQTTClient nehmen das threading-Lock data_lock, das auch
+# während synchroner Datenbankzugriffe gehalten wird. Sie laufen deshalb im
+# Threadpool, damit ein langsames INSERT nicht die Event-Loop blockiert.
+
+
+async def get_latest_data(request):
+    return JSONResponse(
+        await run_in_threadpool(latest_data_payload, request.app.state.mqtt_client)
+    )
+
+
+async def get_sensor_data(request):
+    """
+    Gibt die aktuellen Sensordaten zurück - bevorzugt Live-MQTT-Daten.
+    """
+    try:
+        payload, status = await run_in_threadpool(
+            sensor_data_payload,
+            request.app.state.mqtt_client,
+            request.app.state.sensor_simulator,
+        )
+        return JSONResponse(payload, status_code=status)
+    except Exception as e:
+        logging.error(f"Fehler beim Abrufen der Sensordaten: {e}")
+        return JSONResponse(
+            {"status": "error", "message": f"Fehler: {str(e)}"}, status_code=500
+        )
+
+
+async def get_future_data(request):
+    try:
+        if not is_valid_basic_auth(request.headers.get("Authorization")):
+            return Response(
+                "Verifizierung fehlgeschlagen",
+                status_code=401,
+                headers={"WWW-Authenticate": 'Basic realm="Login erforderlich!"'},
+            )
+
+        future_timestamp_str = future_timestamp(request.path_params["timestamp"])
+        formatted_future_data = format_future_data(
+            await request.app.state.store.fetch_future_data(future_timestamp_str)
+        )
+        if formatted_future_data is None:
+            return JSONResponse(
+                {"Fehler": "Keine zukünftigen Daten verfügbar"}, status_code=404
+            )
+        return JSONResponse(formatted_future_data)
+
+    except Exception as e:
+        logging.error(f"get_future_data: Fehler beim Abrufen von Zukunftsdaten: {e}")
+        return JSONResponse({"Fehler": str(e)}, status_code=500)
+
+
+async def get_plots_data(request):
+    """
+    Liefert die Zeitreihen der Plots-Seite als JSON.
+    """
+    try:
+        sensor_data = await run_in_threadpool(
+            request.app.state.mqtt_client.get_latest_sensor_data
+        )
+        return JSONResponse(await run_in_threadpool(plots_payload, sensor_data))
+    except Exception as e:
+        logging.error(f"Fehler in get_plots_data(): {e}")
+        return JSONResponse({"Fehler": str(e)}, status_code=500)
+
+
+app = Starlette(
+    routes=[
+        Route("/latest_data", get_latest_data),
+        Route("/sensor_data", get_sensor_data),
+        Route("/future_data/{timestamp}", get_future_data),
+        Route("/plots_data", get_plots_data),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,53 @@
+"""
+Angaben zum Rechner einer Benchmark-Basislinie.
+
+Laufzeiten sind nur mit einer Basislinie vergleichbar, die auf einem Rechner
+mit derselben Anzahl CPUs, derselben Architektur und denselben Versionen von
+Python und pandas aufgenommen wurde. Die Angaben werden mit der Basislinie
+gespeichert und vor jedem Vergleich geprüft.
+"""
+
+import os
+import platform
+
+import pandas as pd
+
+
+def host_info():
+    """
+    :return: Dictionary mit Python- und pandas-Version, Architektur und Anzahl CPUs
+    """
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def host_differences(baseline):
+    """
+    :param baseline: gespeicherte Basislinie (Dictionary aus dem JSON)
+    :return: Liste der abweichenden Angaben als Strings, leer bei gleichem Rechner
+    """
+    return [
+        f"{field}: {baseline.get(field, 'unbekannt')} -> {current}"
+        for field, current in host_info().items()
+        if baseline.get(field) != current
+    ]
+
+
+def comparable(baseline):
+    """
+    Gibt aus, warum nicht verglichen wird, wenn die Basislinie von einem
+    anderen Rechner stammt.
+
+    :return: True, wenn die Basislinie auf einem gleichen Rechner aufgenommen wurde
+    """
+    differences = host_differences(baseline)
+    if differences:
+        print(
+            "\nKein Vergleich mit der Basislinie, sie stammt von einem anderen Rechner "
+            f"({', '.join(differences)}). Mit --save-baseline neu aufnehmen."
+        )
+    return not differences
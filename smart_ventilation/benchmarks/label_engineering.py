@@ -0,0 +1,90 @@
+"""
+Vergleicht die zeilenweise Berechnung der Zielvariablen in ``models.py``
+(``DataFrame.apply`` bzw. String-Slicing pro Vorhersage) mit den
+vektorisierten Spaltenoperationen auf einem synthetischen Datensatz.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.label_engineering --scale 100
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.models import calculate_duration_open, leading_two_digits
+
+# Zeilen des zusammengeführten Datensatzes (final_dataset.xlsx)
+BASE_ROWS = 6400
+
+
+def synthetic_dataset(rows, seed=0):
+    """
+    Synthetischer Datensatz mit den Spalten des zusammengeführten Datensatzes.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="min"),
+            "co2": rng.uniform(400, 2500, rows).round(),
+            "temperature": rng.uniform(15, 30, rows).round(2),
+            "humidity": rng.uniform(30, 70, rows).round(2),
+            "tvoc": rng.uniform(0, 500, rows).round(1),
+            "ambient_temp": rng.uniform(-5, 30, rows).round(1),
+        }
+    )
+
+
+def duration_row_by_row(final_dataset, co2_limit=1000, temp_limit=21):
+    """
+    Bisherige Berechnung mit einem Python-Aufruf pro Zeile.
+    """
+
+    def calculate_duration(row):
+        duration = 0
+        if row["co2"] > co2_limit:
+            duration += (row["co2"] - co2_limit) / 45
+        if row["temperature"] > temp_limit:
+            duration += row["temperature"] - temp_limit * 1.05
+        return duration
+
+    return final_dataset.apply(calculate_duration, axis=1).to_numpy()
+
+
+def measure(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=100)
+    args = parser.parse_args()
+
+    dataset = synthetic_dataset(BASE_ROWS * args.scale)
+    print(f"Zeilen: {len(dataset)}")
+
+    reference, row_time = measure(duration_row_by_row, dataset)
+    vectorized, vector_time = measure(calculate_duration_open, dataset)
+    assert np.allclose(reference, vectorized)
+    print(
+        f"duration_open:  apply {row_time:.3f}s, vektorisiert {vector_time:.4f}s, "
+        f"Faktor {row_time / vector_time:.0f}"
+    )
+
+    predictions = vectorized * 3
+    reference, row_time = measure(
+        lambda values: np.array([int(str(int(pred))[:2]) for pred in values]), predictions
+    )
+    vectorized, vector_time = measure(leading_two_digits, predictions)
+    assert np.array_equal(reference, vectorized)
+    print(
+        f"Vorhersagen:    pro Element {row_time:.3f}s, vektorisiert {vector_time:.4f}s, "
+        f"Faktor {row_time / vector_time:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
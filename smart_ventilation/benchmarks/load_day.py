@@ -0,0 +1,353 @@
+"""
+End-to-End-Lasttest der Anwendung über einen simulierten Tag.
+
+Die Flask-Anwendung läuft in einem eingebetteten HTTP-Server (werkzeug,
+threaded) mit einem MQTT-Client, der über den Broker-Ersatz
+(``local_broker.py``) Nachrichten empfängt und in die SQLite-Ersatzdatenbank
+(``db/local_database.py``) schreibt. Eine virtuelle Uhr
+(``virtual_clock.VirtualClock``) lässt den Tag beschleunigt ablaufen, sodass
+stündliche Löschung und 10-minütiger Vorhersagezyklus wie im Betrieb
+stattfinden.
+
+Gleichzeitig:
+- veröffentlicht ein Thread Nachrichten im Takt der Produktionsrate mal
+  ``--rate`` (in virtueller Zeit, Zeitstempel der Nachrichten ebenfalls virtuell),
+- senden ``--http-clients`` Threads reihum Anfragen an ``--path`` (Standard
+  siehe DEFAULT_PATHS) mit ``--think-time`` Sekunden Pause,
+- werden in der Mitte jeder virtuellen Stunde der Speicher (RSS) und die
+  Größe der Puffer des MQTT-Clients festgehalten.
+
+Ausgegeben werden Durchsatz und p50/p95/p99 der Latenzen für den MQTT-Eingang
+(Veröffentlichung bis Ende von on_message) und jede Route sowie der Verlauf
+des Speichers über den Tag.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.load_day --hours 24 --speed 1000 --rate 1 --http-clients 4
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+from werkzeug.serving import make_server
+
+from benchmarks.mqtt_ingest_load import (
+    DEVICE_INTERVALS,
+    RoomState,
+    make_payload,
+    percentile,
+    room_application_id,
+)
+from db.local_database import connect_local_database
+from local_broker import LocalBroker
+from mqtt_client import MQTTClient
+from virtual_clock import VirtualClock
+
+DEFAULT_PATHS = ["/", "/latest_data", "/sensor_data", "/plots_data", "/team-competition"]
+
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        rss_kb = next(int(line.split()[1]) for line in status if line.startswith("VmRSS"))
+    return round(rss_kb / 1024, 1)
+
+
+def latency_summary(latencies, seconds):
+    """
+    :param latencies: Latenzen in Sekunden
+    :param seconds: Dauer der Messung für den Durchsatz
+    """
+    if not latencies:
+        return {"count": 0}
+    return {
+        "count": len(latencies),
+        "per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+def publish_day(broker, clock, end, rate, stop, seed=0):
+    """
+    Veröffentlicht Nachrichten des Klassenraums bis zum virtuellen Zeitpunkt
+    ``end``. Die Sendeintervalle der Geräte werden durch ``rate`` geteilt.
+
+    :return: Anzahl der veröffentlichten Nachrichten
+    """
+    rng = random.Random(seed)
+    state = RoomState(rng)
+    application_id = room_application_id(0)
+    start = clock.now()
+    schedule = [
+        (rng.uniform(0, interval / rate), dev_eui)
+        for dev_eui, interval in DEVICE_INTERVALS.items()
+    ]
+    heapq.heapify(schedule)
+
+    published = 0
+    while not stop.is_set():
+        offset, dev_eui = schedule[0]
+        if start.timestamp() + offset >= end.timestamp():
+            break
+        delay = offset - (clock.now() - start).total_seconds()
+        if delay > 0:
+            clock.sleep(delay)
+        heapq.heapreplace(schedule, (offset + DEVICE_INTERVALS[dev_eui] / rate, dev_eui))
+        payload = make_payload(application_id, dev_eui, state.measurement(dev_eui), published)
+        payload["time"] = (
+            clock.now().astimezone(timezone.utc).isoformat(timespec="microseconds")
+        )
+        broker.publish(
+            f"application/{application_id}/device/{dev_eui}/event/up", json.dumps(payload)
+        )
+        published += 1
+    return published
+
+
+def http_client(base_url, paths, think_time, stop, results, offset):
+    """
+    Sendet bis ``stop`` reihum Anfragen und hängt (Pfad, Latenz, Fehler) an
+    ``results`` an.
+    """
+    i = offset
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        failed = False
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=30) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            failed = True
+        results.append((path, time.perf_counter() - started, failed))
+        if think_time:
+            stop.wait(think_time)
+
+
+def load_application():
+    """
+    Importiert die Flask-Anwendung im lokalen Modus (Broker-Ersatz, SQLite,
+    Dateien im temporären Verzeichnis) und hält ihren MQTT-Client an. Der
+    Sensor-Simulator läuft wie im Betrieb weiter (Ersatzdaten für /sensor_data).
+    """
+    os.environ.setdefault("LOCAL_SERVICES", "1")
+    # Startmeldungen der Anwendung (Scheduler, Simulator usw.) unterdrücken
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import application
+
+    application.mqtt_client.stop()
+    # Zugriffsprotokoll des eingebetteten Servers unterdrücken
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    return application
+
+
+def start_application(application, mqtt_client):
+    """
+    Ersetzt den MQTT-Client der Anwendung und startet sie in einem
+    eingebetteten HTTP-Server.
+
+    :return: (Server, Basis-URL)
+    """
+    application.mqtt_client = mqtt_client
+    server = make_server("127.0.0.1", 0, application.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="http-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run_day(args):
+    # Vor dem Start der virtuellen Uhr importieren, der Import dauert einige Sekunden
+    application = load_application()
+    start = (
+        datetime.fromisoformat(args.start)
+        if args.start
+        else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    )
+    clock = VirtualClock(args.speed, start)
+    broker = LocalBroker()
+    broker_client = broker.client()
+    mqtt_client = MQTTClient(
+        clock=clock, client=broker_client, conn=connect_local_database(args.database)
+    )
+    server, base_url = start_application(application, mqtt_client)
+    logging.getLogger().setLevel(args.log_level)
+    mqtt_client.initialize()
+
+    stop = threading.Event()
+    requests = []
+    paths = args.path or DEFAULT_PATHS
+    clients = [
+        threading.Thread(
+            target=http_client,
+            args=(base_url, paths, args.think_time, stop, requests, n),
+            name=f"http-client-{n}",
+        )
+        for n in range(args.http_clients)
+    ]
+
+    end = clock.now() + timedelta(hours=args.hours)
+    published = [0]
+    publisher = threading.Thread(
+        target=lambda: published.__setitem__(
+            0, publish_day(broker, clock, end, args.rate, stop, args.seed)
+        ),
+        name="publisher",
+    )
+
+    hourly = []
+    baseline_rss = rss_mb()
+    started = time.perf_counter()
+    publisher.start()
+    for client in clients:
+        client.start()
+
+    hour = 0
+    while publisher.is_alive():
+        # Mitte jeder virtuellen Stunde, abseits der stündlichen Löschung
+        snapshot_at = started + (hour + 0.5) * 3600 / args.speed
+        publisher.join(timeout=max(0, snapshot_at - time.perf_counter()))
+        hour += 1
+        hourly.append(
+            {
+                "hour": hour,
+                "virtual_time": clock.now().strftime("%Y-%m-%d %H:%M"),
+                "rss_mb": rss_mb(),
+                "data_points": len(mqtt_client.data_points),
+                "combined_data": sum(
+                    len(values)
+                    for values in mqtt_client.combined_data.values()
+                    if isinstance(values, list)
+                ),
+                "delivered": broker_client.delivered,
+                "backlog": broker_client.backlog(),
+                "requests": len(requests),
+            }
+        )
+        print(
+            f"  {hourly[-1]['virtual_time']}  RSS {hourly[-1]['rss_mb']:7.1f} MB"
+            f"  data_points {hourly[-1]['data_points']:7}  Rückstau {hourly[-1]['backlog']:5}"
+            f"  Anfragen {hourly[-1]['requests']:7}"
+        )
+    duration = time.perf_counter() - started
+
+    stop.set()
+    for client in clients:
+        client.join()
+    drain_deadline = time.perf_counter() + args.drain_timeout
+    while broker_client.backlog() and time.perf_counter() < drain_deadline:
+        time.sleep(0.01)
+    server.shutdown()
+    mqtt_client.stop()
+
+    routes = {}
+    for path in paths:
+        latencies = [latency for p, latency, failed in requests if p == path and not failed]
+        routes[path] = latency_summary(latencies, duration)
+        routes[path]["errors"] = sum(1 for p, _, failed in requests if p == path and failed)
+
+    rss_values = [entry["rss_mb"] for entry in hourly]
+    return {
+        "hours": args.hours,
+        "speed": args.speed,
+        "rate": args.rate,
+        "http_clients": args.http_clients,
+        "think_time": args.think_time,
+        "real_seconds": round(duration, 1),
+        "mqtt": dict(
+            latency_summary(list(broker_client.latencies), duration),
+            published=published[0],
+            undelivered=broker_client.backlog(),
+            max_backlog=broker_client.max_backlog,
+        ),
+        "http": dict(
+            latency_summary(
+                [latency for _, latency, failed in requests if not failed], duration
+            ),
+            errors=sum(1 for _, _, failed in requests if failed),
+        ),
+        "routes": routes,
+        "memory": {
+            "rss_start_mb": baseline_rss,
+            "rss_end_mb": rss_values[-1] if rss_values else None,
+            "rss_max_mb": max(rss_values) if rss_values else None,
+            # Zuwachs nach der ersten Stunde (Importe, Templates, Caches sind dann geladen)
+            "growth_after_first_hour_mb": (
+                round(rss_values[-1] - rss_values[0], 1) if rss_values else None
+            ),
+        },
+        "hourly": hourly,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--speed", type=float, default=1000, help="Beschleunigung der Uhr")
+    parser.add_argument(
+        "--rate", type=float, default=1, help="Vielfaches der Produktionsrate der Sensoren"
+    )
+    parser.add_argument("--http-clients", type=int, default=4)
+    parser.add_argument(
+        "--think-time", type=float, default=0.05, help="Pause zwischen zwei Anfragen (s)"
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        help="Zu testende Pfade, mehrfach angebbar (Standard: " + ", ".join(DEFAULT_PATHS) + ")",
+    )
+    parser.add_argument(
+        "--start", default=None, help="Virtueller Startzeitpunkt (ISO), Standard: heute 00:00"
+    )
+    parser.add_argument("--database", default=":memory:", help="SQLite-Ersatzdatenbank")
+    parser.add_argument("--drain-timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    result = run_day(args)
+
+    mqtt = result["mqtt"]
+    print(
+        f"\nMQTT: {mqtt['published']} veröffentlicht, {mqtt.get('count', 0)} verarbeitet "
+        f"({mqtt.get('per_second', 0)}/s), p50 {mqtt.get('p50_ms')} ms, "
+        f"p95 {mqtt.get('p95_ms')} ms, p99 {mqtt.get('p99_ms')} ms, "
+        f"max. Rückstau {mqtt['max_backlog']}"
+    )
+    for path, route in [("HTTP gesamt", result["http"])] + list(result["routes"].items()):
+        print(
+            f"{path:<20}{route.get('count', 0):>8} Anfragen {route.get('per_second', 0):>8}/s"
+            f"  p50 {route.get('p50_ms')} ms  p95 {route.get('p95_ms')} ms"
+            f"  p99 {route.get('p99_ms')} ms  Fehler {route['errors']}"
+        )
+    memory = result["memory"]
+    print(
+        f"Speicher (RSS): Start {memory['rss_start_mb']} MB, Ende {memory['rss_end_mb']} MB, "
+        f"Maximum {memory['rss_max_mb']} MB, Zuwachs nach der ersten Stunde "
+        f"{memory['growth_after_first_hour_mb']} MB"
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+
+    # Hintergrund-Threads der Anwendung (Scheduler, Outbox) nicht abwarten
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
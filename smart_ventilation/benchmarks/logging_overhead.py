@@ -0,0 +1,99 @@
+"""
+Misst den Aufwand des Loggings im Eingangspfad.
+
+Dieselben Nachrichten (Format aus ``mqtt_ingest_load``) werden direkt an
+``MQTTClient.on_message`` übergeben, jeweils mit einer anderen
+Logging-Einrichtung auf Level INFO:
+
+- ``off``: Logging abgeschaltet (Untergrenze),
+- ``basic``: ``logging.basicConfig`` mit synchronem StreamHandler (bisher),
+- ``queue``: ``log_setup.configure_logging`` (Warteschlange und Listener-Thread).
+
+Ausgegeben wird in eine temporäre Datei. Gemessen wird die mittlere Dauer von
+on_message; die Ausgabe des Listeners wird danach abgewartet, aber nicht
+mitgezählt. Datenbank ist die SQLite-Ersatzdatenbank.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.logging_overhead --messages 500 --repeat 7
+"""
+
+import argparse
+import gc
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import log_setup
+from benchmarks.metrics_overhead import messages
+from db.local_database import connect_local_database
+from local_broker import LocalBroker
+from mqtt_client import MQTTClient
+
+MODES = ("off", "basic", "queue")
+
+
+def setup(mode, stream):
+    if mode == "queue":
+        log_setup.configure_logging(logging.INFO, stream=stream)
+        return
+    log_setup.stop_logging()
+    logging.basicConfig(level=logging.INFO, format=log_setup.TEXT_FORMAT, stream=stream, force=True)
+    if mode == "off":
+        logging.getLogger().setLevel(logging.CRITICAL + 1)
+
+
+def ingest(batch, mode):
+    """
+    :return: (mittlere Dauer von on_message in Sekunden, geschriebene Zeilen)
+    """
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as stream:
+        gc.collect()
+        client = MQTTClient(client=LocalBroker().client(), conn=connect_local_database())
+        setup(mode, stream)
+        try:
+            started = time.perf_counter()
+            for msg in batch:
+                client.on_message(None, None, msg)
+            elapsed = time.perf_counter() - started
+        finally:
+            log_setup.stop_logging()
+            logging.basicConfig(level=logging.WARNING, force=True)
+            client.stop()
+        stream.seek(0)
+        lines = sum(1 for _ in stream)
+    return elapsed / len(batch), lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    batch = messages(args.messages)
+    timings = {mode: [] for mode in args.modes}
+    lines = {}
+    for run in range(args.repeat):
+        # Reihenfolge rotieren, damit Schwankungen alle Varianten gleich treffen
+        shift = run % len(args.modes)
+        for mode in args.modes[shift:] + args.modes[:shift]:
+            seconds, lines[mode] = ingest(batch, mode)
+            timings[mode].append(seconds)
+
+    print(f"on_message ({args.messages} Nachrichten, Median aus {args.repeat} Läufen, PID {os.getpid()}):")
+    baseline = statistics.median(timings[args.modes[0]])
+    for mode in args.modes:
+        median = statistics.median(timings[mode])
+        print(
+            f"  {mode:<6}{median * 1e6:8.1f} µs ({median / baseline - 1:+.1%})"
+            f"  {lines[mode] / args.messages:6.2f} Zeilen pro Nachricht"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Misst den Aufwand der Instrumentierung aus ``service_metrics.py``.
+
+1. Einzelkosten: ``with threading.Lock()`` gegenüber ``InstrumentedLock``,
+   ``Histogram.observe`` und ``Counter.inc``.
+2. Eingangspfad: dieselben Nachrichten (Format aus ``mqtt_ingest_load``)
+   werden direkt an ``MQTTClient.on_message`` übergeben, einmal mit und einmal
+   ohne Instrumentierung (Kennzahlen durch wirkungslose Objekte und das Lock
+   durch ein einfaches ``threading.Lock`` ersetzt). Datenbank ist die
+   SQLite-Ersatzdatenbank.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.metrics_overhead --messages 500 --repeat 11
+"""
+
+import argparse
+import gc
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+
+import mqtt_client as mqtt_client_module
+import service_metrics
+from benchmarks.mqtt_ingest_load import (
+    DEVICE_INTERVALS,
+    RoomState,
+    make_payload,
+    room_application_id,
+)
+from db.local_database import connect_local_database
+from local_broker import LocalBroker
+from mqtt_client import MQTTClient
+from service_metrics import Counter, Histogram, InstrumentedLock
+
+INSTRUMENTED = ("MESSAGES_INGESTED", "ON_MESSAGE_SECONDS", "DB_SECONDS", "PREDICTION_SECONDS")
+
+
+class NoMetric:
+    def inc(self, *args, **kwargs):
+        pass
+
+    def observe(self, *args, **kwargs):
+        pass
+
+
+def per_call(function, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations
+
+
+def micro_costs(iterations):
+    plain = threading.Lock()
+    instrumented = InstrumentedLock("benchmark")
+    histogram = Histogram("benchmark_seconds", "Benchmark", ["topic"])
+    counter = Counter("benchmark_total", "Benchmark", ["topic"])
+    labels = ("application/x/device/0004a30b01045883/event/up",)
+
+    def with_plain():
+        with plain:
+            pass
+
+    def with_instrumented():
+        with instrumented:
+            pass
+
+    return {
+        "threading.Lock": per_call(with_plain, iterations),
+        "InstrumentedLock": per_call(with_instrumented, iterations),
+        "Histogram.observe": per_call(lambda: histogram.observe(0.0003, labels), iterations),
+        "Counter.inc": per_call(lambda: counter.inc(labels), iterations),
+    }
+
+
+def messages(count, seed=0):
+    """
+    Nachrichten eines Klassenraums in der Reihenfolge der Produktionsraten.
+    """
+    rng = random.Random(seed)
+    state = RoomState(rng)
+    devices = []
+    for dev_eui, interval in DEVICE_INTERVALS.items():
+        devices += [(step * interval, dev_eui) for step in range(count)]
+    devices.sort()
+    result = []
+    for f_cnt, (_, dev_eui) in enumerate(devices[:count]):
+        topic = f"application/{room_application_id(0)}/device/{dev_eui}/event/up"
+        payload = make_payload(room_application_id(0), dev_eui, state.measurement(dev_eui), f_cnt)
+        result.append(SimpleNamespace(topic=topic, payload=json.dumps(payload).encode()))
+    return result
+
+
+def ingest(batch, instrumented):
+    """
+    :return: mittlere Dauer von on_message in Sekunden
+    """
+    originals = {name: getattr(mqtt_client_module, name) for name in INSTRUMENTED}
+    if not instrumented:
+        for name in INSTRUMENTED:
+            setattr(mqtt_client_module, name, NoMetric())
+    try:
+        gc.collect()
+        client = MQTTClient(client=LocalBroker().client(), conn=connect_local_database())
+        if not instrumented:
+            client.data_lock = threading.Lock()
+        started = time.perf_counter()
+        for msg in batch:
+            client.on_message(None, None, msg)
+        elapsed = time.perf_counter() - started
+        client.stop()
+        return elapsed / len(batch)
+    finally:
+        for name, metric in originals.items():
+            setattr(mqtt_client_module, name, metric)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=11)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print("Einzelkosten:")
+    for name, seconds in micro_costs(args.iterations).items():
+        print(f"  {name:<20}{seconds * 1e9:8.0f} ns")
+
+    batch = messages(args.messages)
+    timings = {True: [], False: []}
+    for run in range(args.repeat):
+        # Abwechselnd und in wechselnder Reihenfolge messen, damit Schwankungen
+        # (v. a. die mit data_points wachsende Dauer von collect_data) beide
+        # Varianten gleich treffen
+        for instrumented in (True, False) if run % 2 else (False, True):
+            timings[instrumented].append(ingest(batch, instrumented))
+
+    plain = statistics.median(timings[False])
+    instrumented = statistics.median(timings[True])
+    print(f"on_message ({args.messages} Nachrichten, Median aus {args.repeat} Läufen):")
+    print(f"  ohne Kennzahlen {plain * 1e6:8.1f} µs")
+    print(f"  mit Kennzahlen  {instrumented * 1e6:8.1f} µs ({(instrumented / plain - 1):+.1%})")
+
+    print("\nAuszug aus /metrics:")
+    for line in service_metrics.REGISTRY.render().splitlines():
+        if not line.startswith("#") and "_bucket" not in line:
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
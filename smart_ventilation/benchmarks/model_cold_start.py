@@ -0,0 +1,165 @@
+"""
+Misst den Kaltstart der Vorhersagemodelle: Importe, Laden beider Modelle und
+eine erste Vorhersage in einem frischen Python-Prozess, einmal aus den
+Pickles (joblib, sklearn/imblearn) und einmal aus dem kompakten Format
+(compact_model, nur numpy). Zusätzlich wird geprüft, dass beide Varianten
+dieselben Vorhersagen liefern.
+
+Beide Modelle werden mit logistic_regression_model und random_forest_model auf
+synthetischen Daten trainiert, da Pickles nur mit der sklearn-Version
+zuverlässig funktionieren, mit der sie erstellt wurden.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.model_cold_start --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compact_model import export_model, load_model
+from models.models import logistic_regression_model, random_forest_model
+
+CHILD = """
+import time
+started = time.perf_counter()
+import json, sys
+import numpy as np
+{load}
+X = np.array([[950.0, 21.5, 48.0, 120.0, 14.0, 10, 2, 3]])
+predictions = [
+    float(models[0].predict(X)[0]),
+    float(models[1].predict(X[:, :2])[0]),
+]
+seconds = time.perf_counter() - started
+# VmHWM statt ru_maxrss: ru_maxrss enthält den Speicher des Elternprozesses vor exec
+with open("/proc/self/status") as status:
+    peak_kb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+print(json.dumps({{
+    "seconds": seconds,
+    "max_rss_mb": peak_kb / 1024,
+    "sklearn_imported": "sklearn" in sys.modules,
+    "modules": len(sys.modules),
+    "predictions": predictions,
+}}))
+"""
+
+LOAD_PICKLE = """
+import warnings
+warnings.simplefilter("ignore")
+import joblib
+models = [joblib.load(path) for path in {paths!r}]
+"""
+
+LOAD_COMPACT = """
+from compact_model import load_model
+models = [load_model(path) for path in {paths!r}]
+"""
+
+
+def synthetic_training_dataset(rows, rng):
+    """
+    Datensatz im Format von training_dataset mit plausiblen Sensorwerten.
+    """
+    timestamps = pd.date_range("2024-01-08", periods=rows, freq="5min")
+    co2 = rng.uniform(400, 2000, rows)
+    temperature = rng.uniform(16, 28, rows)
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "co2": co2,
+            "temperature": temperature,
+            "humidity": rng.uniform(30, 70, rows),
+            "tvoc": rng.uniform(50, 500, rows),
+            "ambient_temp": rng.uniform(-5, 30, rows),
+            "hour": timestamps.hour,
+            "day_of_week": timestamps.dayofweek,
+            "month": timestamps.month,
+            "open_window": ((co2 > 1200) ^ (rng.random(rows) < 0.1)).astype(int),
+        }
+    )
+
+
+def cold_start(load, paths, repeat):
+    code = CHILD.format(load=load.format(paths=paths))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=20000, help="Zeilen des Trainingsdatensatzes")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        dataset = synthetic_training_dataset(args.rows, rng)
+        logistic_regression = logistic_regression_model(dataset)
+        random_forest = random_forest_model(dataset)
+
+        pickle_paths, compact_paths = [], []
+        for name, model in (("lr", logistic_regression), ("rf", random_forest)):
+            pickle_path = os.path.join(directory, f"{name}.pkl")
+            compact_path = os.path.join(directory, f"{name}.npz")
+            joblib.dump(model, pickle_path)
+            export_model(model, compact_path)
+            pickle_paths.append(pickle_path)
+            compact_paths.append(compact_path)
+
+        # Gleiche Vorhersagen auf zufälligen Merkmalen (mit fehlenden Werten)
+        X = np.column_stack(
+            [
+                rng.uniform(400, 2000, 5000),
+                rng.uniform(16, 28, 5000),
+                rng.uniform(30, 70, 5000),
+                rng.uniform(50, 500, 5000),
+                rng.uniform(-5, 30, 5000),
+                rng.integers(0, 24, 5000),
+                rng.integers(0, 7, 5000),
+                rng.integers(1, 13, 5000),
+            ]
+        )
+        X[rng.random(X.shape) < 0.05] = np.nan
+        X_frame = pd.DataFrame(X, columns=dataset.columns[1:9])
+        compact_lr = load_model(compact_paths[0])
+        compact_rf = load_model(compact_paths[1])
+        assert (compact_lr.predict(X) == logistic_regression.predict(X_frame)).all()
+        assert np.allclose(
+            compact_lr.predict_proba(X), logistic_regression.predict_proba(X_frame)
+        )
+        X_rf = np.nan_to_num(X[:, :2], nan=1000.0)
+        X_rf_frame = pd.DataFrame(X_rf, columns=["co2", "temperature"])
+        assert np.allclose(compact_rf.predict(X_rf), random_forest.predict(X_rf_frame))
+        print("Identische Vorhersagen auf 5000 Zeilen")
+
+        for label, load, paths in (
+            ("Pickle (joblib)", LOAD_PICKLE, pickle_paths),
+            ("Kompakt (numpy)", LOAD_COMPACT, compact_paths),
+        ):
+            runs = cold_start(load, paths, args.repeat)
+            size = sum(os.path.getsize(path) for path in paths) / 1024
+            print(
+                f"{label:<16} Kaltstart {statistics.median(run['seconds'] for run in runs):6.3f}s"
+                f"  RSS {statistics.median(run['max_rss_mb'] for run in runs):6.1f} MB"
+                f"  Module {runs[0]['modules']:5}"
+                f"  sklearn importiert: {'ja' if runs[0]['sklearn_imported'] else 'nein'}"
+                f"  Dateien {size:8.1f} KB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Lastgenerator für den vollständigen MQTT-Eingangspfad.
+
+Erzeugt für N virtuelle Klassenräume Nachrichten im Format der echten
+Geräte-Topics (ChirpStack ``application/<id>/device/<dev_eui>/event/up``) und
+veröffentlicht sie über den eingebetteten Broker-Ersatz (``local_broker.py``).
+Ohne Datenbankserver werden die Messwerte in eine SQLite-Ersatzdatenbank
+(``db/local_database.py``) geschrieben.
+``MQTTClient`` verarbeitet sie wie im Betrieb über ``on_message`` (JSON,
+Topic-Routing, collect_data, check_and_clear_data).
+
+Die Rate wird als Vielfaches der Produktionsrate angegeben (Klimasensor
+jede Minute, TVOC alle 10 Minuten, Außentemperatur alle 15 Minuten).
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.mqtt_ingest_load --rooms 10 --speed 100 --duration 10
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from db.local_database import connect_local_database
+from local_broker import LocalBroker
+from mqtt_client import APPLICATION_ID, MQTTClient
+
+# Sendeintervall der Geräte im Betrieb (Sekunden)
+DEVICE_INTERVALS = {
+    "0004a30b01045883": 60,  # CO2, Temperatur, Feuchtigkeit
+    "24e124707c481005": 600,  # TVOC
+    "647fda000000aa92": 900,  # Außentemperatur
+}
+
+
+def room_application_id(room):
+    """
+    Raum 0 verwendet die echte Anwendung, weitere Räume eigene, stabile IDs.
+    """
+    if room == 0:
+        return APPLICATION_ID
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"klassenraum-{room}"))
+
+
+class RoomState:
+    """
+    Zufallspfad der Messwerte eines virtuellen Klassenraums.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.co2 = rng.uniform(450, 900)
+        self.temperature = rng.uniform(19, 24)
+        self.humidity = rng.uniform(40, 60)
+        self.tvoc = rng.uniform(50, 200)
+        self.ambient_temp = rng.uniform(5, 25)
+
+    def measurement(self, dev_eui):
+        rng = self.rng
+        if dev_eui == "0004a30b01045883":
+            self.co2 = min(2000, max(400, self.co2 + rng.uniform(-25, 30)))
+            self.temperature = min(28, max(16, self.temperature + rng.uniform(-0.2, 0.2)))
+            self.humidity = min(80, max(30, self.humidity + rng.uniform(-1, 1)))
+            return {
+                "co2": round(self.co2, 1),
+                "temperature": round(self.temperature, 2),
+                "humidity": round(self.humidity, 2),
+            }
+        if dev_eui == "24e124707c481005":
+            self.tvoc = max(0, self.tvoc + rng.uniform(-10, 10))
+            return {"tvoc": round(self.tvoc, 1)}
+        self.ambient_temp += rng.uniform(-0.3, 0.3)
+        return {"ambient_temp": round(self.ambient_temp, 1)}
+
+
+def make_payload(application_id, dev_eui, measurement, f_cnt):
+    """
+    Uplink-Nachricht im ChirpStack-Format mit dekodiertem ``object``.
+    """
+    return {
+        "deduplicationId": str(uuid.uuid4()),
+        "time": datetime.now(timezone.utc).isoformat(timespec="microseconds"),
+        "deviceInfo": {"applicationId": application_id, "devEui": dev_eui},
+        "fCnt": f_cnt,
+        "fPort": 1,
+        "object": measurement,
+    }
+
+
+def run_load(broker, rooms, speed, duration, seed=0):
+    """
+    Veröffentlicht Nachrichten für ``duration`` Sekunden im Takt der
+    Produktionsrate mal ``speed``.
+
+    :return: Anzahl der veröffentlichten Nachrichten
+    """
+    rng = random.Random(seed)
+    states = [RoomState(rng) for _ in range(rooms)]
+    topics = {}
+    schedule = []
+    started = time.perf_counter()
+    for room in range(rooms):
+        for dev_eui, interval in DEVICE_INTERVALS.items():
+            topics[(room, dev_eui)] = (
+                f"application/{room_application_id(room)}/device/{dev_eui}/event/up"
+            )
+            # Startzeitpunkte über das Intervall verteilen
+            first = started + rng.uniform(0, interval / speed)
+            heapq.heappush(schedule, (first, room, dev_eui))
+
+    published = 0
+    deadline = started + duration
+    while schedule:
+        due, room, dev_eui = schedule[0]
+        if due >= deadline:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0.001:
+            time.sleep(delay)
+        heapq.heapreplace(
+            schedule, (due + DEVICE_INTERVALS[dev_eui] / speed, room, dev_eui)
+        )
+        payload = make_payload(
+            room_application_id(room),
+            dev_eui,
+            states[room].measurement(dev_eui),
+            published,
+        )
+        broker.publish(topics[(room, dev_eui)], json.dumps(payload))
+        published += 1
+    return published
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rooms", type=int, default=1)
+    parser.add_argument(
+        "--speed", type=float, default=10, help="Vielfaches der Produktionsrate"
+    )
+    parser.add_argument("--duration", type=float, default=10, help="Sekunden")
+    parser.add_argument("--drain-timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--database",
+        default=":memory:",
+        help="SQLite-Ersatzdatenbank oder 'postgres' für db/db_config.yaml",
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+
+    broker = LocalBroker()
+    broker_client = broker.client()
+    mqtt_client = MQTTClient(
+        client=broker_client,
+        application_id="+" if args.rooms > 1 else APPLICATION_ID,
+        conn=(
+            None if args.database == "postgres" else connect_local_database(args.database)
+        ),
+    )
+    mqtt_client.initialize()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    published = run_load(broker, args.rooms, args.speed, args.duration, args.seed)
+    publish_time = time.perf_counter() - started
+
+    drain_deadline = time.perf_counter() + args.drain_timeout
+    while broker_client.backlog() and time.perf_counter() < drain_deadline:
+        time.sleep(0.01)
+    total_time = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mqtt_client.stop()
+
+    latencies = list(broker_client.latencies)
+    offered_rate = args.rooms * sum(1 / i for i in DEVICE_INTERVALS.values()) * args.speed
+    result = {
+        "rooms": args.rooms,
+        "speed": args.speed,
+        "offered_rate_per_s": round(offered_rate, 1),
+        "published": published,
+        "published_rate_per_s": round(published / publish_time, 1),
+        "delivered": broker_client.delivered,
+        "delivered_rate_per_s": round(broker_client.delivered / total_time, 1),
+        "undelivered": broker_client.backlog(),
+        "max_backlog": broker_client.max_backlog,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        "latency_mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        "data_points": len(mqtt_client.data_points),
+        "peak_memory_mb": round(peak_memory / 1024 / 1024, 1),
+    }
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Vergleicht das stapelweise Nachlernen aus feedback_tabelle
+(``online_learner.OnlineFeedbackLearner``) mit einem vollständigen Neutraining
+einer logistischen Regression auf der gesamten Feedback-Historie.
+
+Die Tabelle liegt in der lokalen SQLite-Ersatzdatenbank; die Feedback-Zeilen
+werden synthetisch erzeugt.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.online_feedback --history 100000 --new 64
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from db.local_database import connect_local_database
+from online_learner import OnlineFeedbackLearner, feedback_matrix
+
+
+def insert_feedback(conn, count, start, rng):
+    """
+    Fügt ``count`` synthetische Feedback-Zeilen im Minutenabstand ein.
+
+    :return: Zeitstempel nach der letzten Zeile
+    """
+    co2 = rng.uniform(400, 2000, count).round()
+    temperature = rng.uniform(16, 28, count).round(1)
+    humidity = rng.uniform(30, 70, count).round(1)
+    outdoor = rng.uniform(-5, 30, count).round(1)
+    open_window = ((co2 > 1000) | (temperature > 24)).astype(int)
+    rows = [
+        (
+            float(temperature[i]),
+            float(humidity[i]),
+            float(co2[i]),
+            (start + timedelta(minutes=i)).isoformat(sep=" "),
+            float(outdoor[i]),
+            int(open_window[i]),
+        )
+        for i in range(count)
+    ]
+    conn.connection.executemany(
+        "INSERT INTO feedback_tabelle VALUES (?, ?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    return start + timedelta(minutes=count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--history", type=int, default=100000)
+    parser.add_argument("--new", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp()
+    conn = connect_local_database(os.path.join(directory, "feedback.db"))
+    learner = OnlineFeedbackLearner(
+        lambda: conn,
+        model_path=os.path.join(directory, "online.pkl"),
+        state_path=os.path.join(directory, "state.pkl"),
+        batch_size=args.batch_size,
+    )
+
+    next_start = insert_feedback(conn, args.history, datetime(2024, 1, 1), rng)
+    started = time.perf_counter()
+    learned = learner.learn_pending()
+    print(f"Historie {learned} Zeilen nachgelernt in {time.perf_counter() - started:.2f}s")
+
+    insert_feedback(conn, args.new, next_start, rng)
+    started = time.perf_counter()
+    learned = learner.learn_pending()
+    incremental = time.perf_counter() - started
+    learner.publish()
+    print(f"{learned} neue Zeilen: partial_fit inkl. Abfrage {incremental * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT temperature, humidity, co2, timestamp, outdoor_temperature, "
+        "accurate_prediction FROM feedback_tabelle"
+    )
+    X, y = feedback_matrix(cursor.fetchall())
+    X = np.delete(X, 3, axis=1)
+    make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)).fit(X, y)
+    full = time.perf_counter() - started
+    print(f"Neutraining auf {len(y)} Zeilen: {full * 1000:.1f} ms, Faktor {full / incremental:.0f}")
+
+    assert learner.model.samples == args.history + args.new
+    # Ein Neustart mit gespeichertem Zustand lernt keine Zeile doppelt
+    restarted = OnlineFeedbackLearner(
+        lambda: conn,
+        model_path=learner.model_path,
+        state_path=learner.state_path,
+        batch_size=args.batch_size,
+    )
+    assert restarted.learn_once() == 0
+    print(f"Gelernte Zeilen insgesamt: {learner.model.samples}, nach Neustart 0 erneut gelernt")
+
+
+if __name__ == "__main__":
+    main()
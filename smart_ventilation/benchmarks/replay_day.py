@@ -0,0 +1,124 @@
+"""
+Beschleunigter Replay eines Zeitraums mit MQTT-Client und Sensor-Simulator.
+
+MQTT-Client und Simulator laufen mit einer gemeinsamen virtuellen Uhr
+(``virtual_clock.VirtualClock``). Wie in ``on_message`` werden nach jedem
+Datenpunkt ``collect_data`` und ``check_and_clear_data`` aufgerufen, sodass
+Datensammlung, stündliche Löschung und der 10-minütige Vorhersagezyklus in
+Sekunden statt Stunden durchlaufen werden. Eine Verbindung zum MQTT-Broker
+wird nicht aufgebaut.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.replay_day --speed 1000 --hours 24
+"""
+
+import argparse
+import logging
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from mqtt_client import MQTTClient
+from sensor_data_simulator import SensorDataSimulator
+from virtual_clock import VirtualClock
+
+
+class CountingClock(VirtualClock):
+    """
+    Virtuelle Uhr, die die Wartezyklen des Vorhersage-Threads zählt.
+    """
+
+    def __init__(self, speed, start):
+        super().__init__(speed, start)
+        self.wait_cycles = 0
+
+    def wait(self, event, timeout):
+        self.wait_cycles += 1
+        return super().wait(event, timeout)
+
+
+def run_replay(speed, hours, start, seed=None):
+    """
+    :return: Dictionary mit Kennzahlen des Replays
+    """
+    clock = CountingClock(speed, start)
+    mqtt_client = MQTTClient(clock=clock)
+    simulator = SensorDataSimulator(mqtt_client, clock=clock, seed=seed)
+
+    clears = []
+    original_clear_data = mqtt_client.clear_data
+
+    def counting_clear_data(clear_time):
+        clears.append(clear_time)
+        original_clear_data(clear_time)
+
+    mqtt_client.clear_data = counting_clear_data
+
+    records = [0]
+    original_update = simulator.update_sensor_data
+
+    def update_and_ingest(*args):
+        original_update(*args)
+        records[0] += 1
+        # Nebenwirkungen von on_message nachbilden
+        mqtt_client.collect_data(mqtt_client.combined_data)
+        mqtt_client.check_and_clear_data()
+
+    simulator.update_sensor_data = update_and_ingest
+
+    end = start + timedelta(hours=hours)
+    tracemalloc.start()
+    started = time.perf_counter()
+    simulator.start_simulation()
+    while clock.now() < end:
+        time.sleep(0.05)
+    simulator.running = False
+    wall_time = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mqtt_client.stop()
+    return {
+        "virtual_hours": hours,
+        "wall_seconds": round(wall_time, 2),
+        "records": records[0],
+        "clears": len(clears),
+        "prediction_cycles": max(clock.wait_cycles - 1, 0),
+        "data_points": len(mqtt_client.data_points),
+        "peak_memory_mb": round(peak_memory / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--speed", type=float, default=1000)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument(
+        "--start",
+        default=None,
+        help="Virtueller Startzeitpunkt (ISO), Standard: heute 00:00",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed für reproduzierbare Messwerte"
+    )
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    start = (
+        datetime.fromisoformat(args.start)
+        if args.start
+        else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    )
+    result = run_replay(args.speed, args.hours, start, args.seed)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+    # Vorhersage-Thread des MQTT-Clients beenden lassen
+    for thread in threading.enumerate():
+        if thread is not threading.main_thread() and not thread.daemon:
+            thread.join(timeout=1)
+
+
+if __name__ == "__main__":
+    main()
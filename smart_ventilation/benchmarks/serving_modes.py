@@ -0,0 +1,154 @@
+"""
+Lasttest zum Vergleich des synchronen (Flask/Gunicorn) und des asynchronen
+(ASGI/Uvicorn) Servermodus.
+
+Beide Server müssen laufen, z. B.:
+    gunicorn --workers 4 --bind 0.0.0.0:8000 application:app
+    uvicorn asgi_application:app --port 8001 --workers 4
+
+Aufruf:
+    python -m benchmarks.serving_modes \
+        --target sync=http://127.0.0.1:8000 --target async=http://127.0.0.1:8001 \
+        --workers 4 --concurrency 8 32 128 --duration 20
+
+Pro Ziel und Parallelität werden Durchsatz, Latenzen und die mittlere Anzahl
+gleichzeitig gehaltener Verbindungen pro Worker (Little's Law: Durchsatz mal
+mittlere Latenz, geteilt durch die Worker-Anzahl) ausgegeben. Der Wert enthält
+auch Anfragen, die noch in der Accept-Queue warten. Ein synchroner Worker
+bearbeitet davon höchstens eine gleichzeitig, bei langsamen Endpunkten (z. B.
+``--path /future_data/<timestamp>``) bricht deshalb sein Durchsatz ein,
+während der asynchrone Modus alle gehaltenen Verbindungen parallel bedient.
+"""
+
+import argparse
+import base64
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_PATHS = ["/latest_data", "/sensor_data", "/plots_data"]
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_load(base_url, paths, concurrency, duration, headers):
+    """
+    Sendet für die angegebene Dauer mit ``concurrency`` Threads Anfragen an
+    die Pfade (reihum) und misst die Latenz jeder Anfrage.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        local_latencies = []
+        local_errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            url = base_url + paths[i % len(paths)]
+            i += 1
+            request = urllib.request.Request(url, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=max(duration, 30)) as r:
+                    r.read()
+                local_latencies.append(time.perf_counter() - start)
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=client, args=(n,)) for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+
+    return latencies, errors[0], wall_time
+
+
+def summarize(name, concurrency, workers, latencies, errors, wall_time):
+    throughput = len(latencies) / wall_time if wall_time else 0.0
+    mean_latency = statistics.fmean(latencies) if latencies else 0.0
+    return {
+        "target": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(throughput, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+        "connections_per_worker": round(throughput * mean_latency / workers, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        help="Name=URL des Servers, mehrfach angebbar",
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument(
+        "--path",
+        action="append",
+        help="Zu testende Pfade (Standard: /latest_data, /sensor_data, /plots_data)",
+    )
+    parser.add_argument(
+        "--auth",
+        default="admin:HJ|*fS1i",
+        help="Basic-Auth-Anmeldedaten für /future_data",
+    )
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    headers = {
+        "Authorization": "Basic "
+        + base64.b64encode(args.auth.encode("utf-8")).decode("ascii")
+    }
+    paths = args.path or DEFAULT_PATHS
+
+    results = []
+    for target in args.target:
+        name, _, base_url = target.partition("=")
+        for concurrency in args.concurrency:
+            latencies, errors, wall_time = run_load(
+                base_url.rstrip("/"), paths, concurrency, args.duration, headers
+            )
+            result = summarize(
+                name, concurrency, args.workers, latencies, errors, wall_time
+            )
+            results.append(result)
+            print(
+                f"{name:>8} c={concurrency:<4} {result['throughput_rps']:>8} req/s "
+                f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                f"Fehler={errors} Verbindungen/Worker={result['connections_per_worker']}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Vergleicht die Erzeugung simulierter Messwerte für viele Räume: ein Aufruf
+von ``random.uniform`` pro Wert und Raum (bisheriges Verfahren) gegen
+``SensorDataSimulator.generate_batch`` mit vorab erzeugten NumPy-Rauschblöcken.
+Prüft außerdem, dass Läufe mit gleichem Seed identisch sind.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.simulator_noise --rooms 10 100 1000 10000
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import numpy as np
+
+from sensor_data_simulator import SensorDataSimulator
+
+
+def scalar_reading(temperature, co2, humidity):
+    """
+    Bisherige Berechnung aus ``update_sensor_data`` mit einzelnen Zufallswerten.
+    """
+    temperature = round(temperature + random.uniform(-0.5, 0.5), 1)
+    co2 = round(max(400, min(2000, co2 + random.uniform(-10, 10))))
+    humidity = round(max(40, min(80, humidity + random.uniform(-2, 2))), 1)
+    tvoc = round(max(0, (co2 - 400) / 100 + random.uniform(-0.5, 0.5)), 1)
+    ambient_temp = round(temperature + random.uniform(-5, 2), 1)
+    return temperature, co2, humidity, tvoc, ambient_temp
+
+
+def time_per_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rooms", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    simulator = SensorDataSimulator(mqtt_client=None, seed=args.seed)
+
+    first = SensorDataSimulator(mqtt_client=None, seed=args.seed).generate_batch(50, rooms=20)
+    second = SensorDataSimulator(mqtt_client=None, seed=args.seed).generate_batch(50, rooms=20)
+    reproducible = all(np.array_equal(first[key], second[key]) for key in first)
+    print(f"Reproduzierbar mit Seed {args.seed}: {reproducible}")
+
+    temperature = simulator.temperature_data['temperature']
+    co2 = simulator.co2_data['co2']
+    humidity = simulator.humidity_data['humidity']
+
+    for rooms in args.rooms:
+        def scalar_tick():
+            for room in range(rooms):
+                scalar_reading(temperature[room % len(temperature)], co2[room % len(co2)],
+                               humidity[room % len(humidity)])
+
+        def batch_tick():
+            simulator.generate_batch(1, rooms)
+
+        scalar = time_per_call(scalar_tick, args.ticks)
+        batch = time_per_call(batch_tick, args.ticks)
+        print(
+            f"{rooms:>6} Räume: einzeln {scalar * 1000:8.3f} ms/Tick, "
+            f"Block {batch * 1000:8.3f} ms/Tick, Faktor {scalar / batch:6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
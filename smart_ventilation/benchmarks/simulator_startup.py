@@ -0,0 +1,48 @@
+"""
+Misst die Startzeit von ``SensorDataSimulator`` (Laden der Datensätze).
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.simulator_startup --repeat 5
+"""
+
+import argparse
+import logging
+import statistics
+import time
+
+from sensor_data_simulator import SensorDataSimulator
+
+
+def measure_startup(repeat):
+    """
+    :return: Liste der Startzeiten in Sekunden
+    """
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        simulator = SensorDataSimulator(mqtt_client=None)
+        durations.append(time.perf_counter() - started)
+    lengths = {
+        "temperature": len(simulator.temperature_data["time"]),
+        "co2": len(simulator.co2_data["time"]),
+        "humidity": len(simulator.humidity_data["time"]),
+    }
+    return durations, lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    durations, lengths = measure_startup(args.repeat)
+    print(
+        f"Startzeit: Median {statistics.median(durations) * 1000:.1f} ms, "
+        f"Minimum {min(durations) * 1000:.1f} ms ({args.repeat} Läufe), "
+        f"Datenpunkte: {lengths}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Vergleicht Speicherbedarf und Laufzeit von ``read_data`` + ``prepare_data``
+mit ``prepare_data_streaming`` auf einer synthetischen mehrjährigen
+Messreihe (CO2-Sensor minütlich, Temperatursensor alle 15 Minuten) und prüft,
+dass beide Verfahren denselben Datensatz liefern.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.streaming_prepare --days 730
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from models.models import prepare_data, read_data
+from models.streaming import prepare_data_streaming
+
+
+def write_sensor_csv(path, start, periods, freq, columns, dev_eui, rng):
+    """
+    Schreibt eine CSV-Datei im Format der ChirpStack-Exporte.
+    """
+    times = pd.date_range(start, periods=periods, freq=freq, tz="UTC")
+    # Sekundenbruchteile wie in den echten Exporten
+    times = times + pd.to_timedelta(rng.uniform(0, 59, periods), unit="s")
+    df = pd.DataFrame({"time": times.strftime("%Y-%m-%d %H:%M:%S.%f+00")})
+    df["dev_eui"] = dev_eui
+    for column, (low, high) in columns.items():
+        df[column] = rng.uniform(low, high, periods).round(1)
+    df.to_csv(path, index=False)
+
+
+def synthetic_sources(directory, days, rng):
+    """
+    Erzeugt je zwei CO2- und Temperaturdateien (ältere und neuere Hälfte).
+
+    :return: Tuple (CO2-Dateien, Temperaturdateien), jeweils ältere zuerst
+    """
+    half = days // 2
+    co2_columns = {"co2": (400, 2000), "humidity": (30, 70), "temperature": (16, 28)}
+    temp_columns = {"temperature": (-5, 30)}
+    co2_paths, temp_paths = [], []
+    for part, start_day in (("older", 0), ("last", half)):
+        start = pd.Timestamp("2022-08-01") + pd.Timedelta(days=start_day)
+        length = half if part == "older" else days - half
+        co2_path = os.path.join(directory, f"co2_{part}.csv")
+        temp_path = os.path.join(directory, f"temp_{part}.csv")
+        write_sensor_csv(co2_path, start, length * 1440, "min", co2_columns, "0004a30b01045883", rng)
+        write_sensor_csv(temp_path, start, length * 96, "15min", temp_columns, "647fda000000aa92", rng)
+        co2_paths.append(co2_path)
+        temp_paths.append(temp_path)
+    return co2_paths, temp_paths
+
+
+def measure(function, *args, **kwargs):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--chunksize", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        co2_paths, temp_paths = synthetic_sources(directory, args.days, rng)
+        rows = sum(len(pd.read_csv(path, usecols=["time"])) for path in co2_paths + temp_paths)
+        print(f"{args.days} Tage, {rows} Quellzeilen")
+
+        reference, seconds, peak = measure(
+            lambda: prepare_data(
+                *read_data(co2_paths[1], co2_paths[0], temp_paths[1], temp_paths[0])
+            )
+        )
+        print(f"read_data + prepare_data: {seconds:6.2f}s, Spitze {peak:7.1f} MB")
+
+        streamed, seconds, peak = measure(
+            prepare_data_streaming, co2_paths, temp_paths, chunksize=args.chunksize
+        )
+        print(f"prepare_data_streaming:   {seconds:6.2f}s, Spitze {peak:7.1f} MB")
+
+        pd.testing.assert_frame_equal(reference, streamed)
+        print(f"Identisches Ergebnis: {len(streamed)} Zeilen")
+
+
+if __name__ == "__main__":
+    main()
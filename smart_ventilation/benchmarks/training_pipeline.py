@@ -0,0 +1,318 @@
+"""
+Misst Laufzeit und Spitzenspeicher jeder Funktion der Trainingspipeline in
+``models/models.py`` auf synthetischen Messreihen in 1-, 10- und 100-facher
+Größe der mitgelieferten Datensätze und vergleicht die Ergebnisse mit einer
+gespeicherten Basislinie.
+
+Die synthetischen Quelldateien werden einmal pro Faktor in ``--data-directory``
+erzeugt und bei weiteren Läufen wiederverwendet. Jeder Schritt wird einmal
+zum Aufwärmen ausgeführt und danach ``--repeat``-mal ohne tracemalloc
+gemessen; verglichen wird der Median. Der Spitzenspeicher wird in einem
+weiteren Durchlauf mit tracemalloc gemessen (``--no-memory`` überspringt ihn).
+Stammt die Basislinie von einem anderen Rechner (CPUs, Architektur, Python,
+pandas), wird nicht verglichen.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python -m benchmarks.training_pipeline --scales 1 10 100
+    python -m benchmarks.training_pipeline --scales 1 10 --save-baseline
+"""
+
+import argparse
+import copy
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.host import comparable, host_info
+from benchmarks.streaming_prepare import write_sensor_csv
+from models.models import (
+    logistic_regression_model,
+    merge_data,
+    prepare_data,
+    prepare_main_dataset,
+    prepare_outdoor_data,
+    random_forest_model,
+    read_data,
+    training_dataset,
+)
+from models.streaming import prepare_data_streaming
+
+BASELINE_PATH = os.path.join("benchmarks", "baselines", "training_pipeline.json")
+
+# Zeilen und Messintervall der mitgelieferten Datensätze (Faktor 1)
+BASE_SOURCES = {
+    "co2": (47677, "min"),  # je Datei, 10c_co2_last_30_days.csv
+    "temp_last": (3025, "15min"),
+    "temp_older": (32750, "15min"),
+    "outdoor": (13200, "h"),
+    "main_dataset": (6086, "450s"),
+}
+
+# Alle Messreihen enden zum selben Zeitpunkt und überlappen dadurch
+END = pd.Timestamp("2024-06-03 12:00")
+
+
+def write_outdoor_txt(path, periods, rng):
+    """
+    Schreibt Stundenwerte im Format der DWD-Datei outdoor_temperature.txt.
+    """
+    times = pd.date_range(end=END.floor("h"), periods=periods, freq="h")
+    df = pd.DataFrame(
+        {
+            "STATIONS_ID": 3987,
+            "MESS_DATUM": times.strftime("%Y%m%d%H"),
+            "QN_9": 3,
+            "TT_TU": rng.uniform(-5, 30, periods).round(1),
+            "RF_TU": rng.uniform(40, 100, periods).round(1),
+            "eor": "eor",
+        }
+    )
+    df.to_csv(path, sep=";", index=False)
+
+
+def write_main_dataset(path, periods, freq, rng):
+    """
+    Schreibt den Hauptdatensatz im Format von dataset.xlsx.
+    """
+    times = pd.date_range(end=END, periods=periods, freq=freq)
+    times = times + pd.to_timedelta(rng.uniform(0, 59, periods).round(), unit="s")
+    df = pd.DataFrame(
+        {
+            "Time": times,
+            "Temperature - Milesight Modul A 018": rng.uniform(16, 28, periods).round(1),
+            "CO2 - Milesight Modul A 018": rng.uniform(400, 2000, periods).round(),
+            "TVOC - Milesight Modul A 018": rng.uniform(50, 500, periods).round(),
+            "Humidity - Milesight Modul A 018": rng.uniform(30, 70, periods).round(1),
+            "Outdoor Temperature": rng.uniform(-5, 30, periods).round(1),
+        }
+    )
+    df.to_excel(path, index=False)
+
+
+def synthetic_sources(directory, scale, seed=0):
+    """
+    Erzeugt (oder verwendet) die Quelldateien für einen Größenfaktor.
+
+    :return: Dictionary mit den Pfaden in der Reihenfolge von DATASET_PATHS
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        "co2_last_30_days_path": os.path.join(directory, "co2_last.csv"),
+        "co2_older_30_days_path": os.path.join(directory, "co2_older.csv"),
+        "temp_last_30_days_path": os.path.join(directory, "temp_last.csv"),
+        "temp_older_30_days_path": os.path.join(directory, "temp_older.csv"),
+        "outdoor_temp_path": os.path.join(directory, "outdoor_temperature.txt"),
+        "main_dataset_path": os.path.join(directory, "dataset.xlsx"),
+    }
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+
+    rng = np.random.default_rng(seed)
+    co2_rows, co2_freq = BASE_SOURCES["co2"]
+    co2_rows *= scale
+    co2_columns = {"co2": (400, 2000), "humidity": (30, 70), "temperature": (16, 28)}
+    temp_columns = {"temperature": (-5, 30)}
+    step = pd.Timedelta(co2_freq) if co2_freq[0].isdigit() else pd.Timedelta(1, co2_freq)
+
+    last_start = END - step * co2_rows
+    older_start = last_start - step * co2_rows
+    write_sensor_csv(paths["co2_older_30_days_path"], older_start, co2_rows, co2_freq,
+                     co2_columns, "0004a30b01045883", rng)
+    write_sensor_csv(paths["co2_last_30_days_path"], last_start, co2_rows, co2_freq,
+                     co2_columns, "0004a30b01045883", rng)
+
+    # Außentemperatursensor: neuere Datei am Ende, ältere davor
+    last_rows = BASE_SOURCES["temp_last"][0] * scale
+    older_rows = BASE_SOURCES["temp_older"][0] * scale
+    temp_step = pd.Timedelta(minutes=15)
+    temp_last_start = END - temp_step * last_rows
+    write_sensor_csv(paths["temp_last_30_days_path"], temp_last_start, last_rows, "15min",
+                     temp_columns, "647fda000000aa92", rng)
+    write_sensor_csv(paths["temp_older_30_days_path"], temp_last_start - temp_step * older_rows,
+                     older_rows, "15min", temp_columns, "647fda000000aa92", rng)
+
+    write_outdoor_txt(paths["outdoor_temp_path"], BASE_SOURCES["outdoor"][0] * scale, rng)
+    main_rows, main_freq = BASE_SOURCES["main_dataset"]
+    write_main_dataset(paths["main_dataset_path"], main_rows * scale, main_freq, rng)
+    return paths
+
+
+def pipeline_steps(paths):
+    """
+    Schritte der Pipeline: (Name, Eingabeschritte, Funktion). Die Funktion
+    erhält Kopien der Ergebnisse der Eingabeschritte, da einige Funktionen
+    ihre Eingaben verändern.
+    """
+    csv_paths = [
+        paths["co2_last_30_days_path"],
+        paths["co2_older_30_days_path"],
+        paths["temp_last_30_days_path"],
+        paths["temp_older_30_days_path"],
+    ]
+    return [
+        ("read_data", [], lambda: read_data(*csv_paths)),
+        ("prepare_data", ["read_data"], lambda frames: prepare_data(*frames)),
+        (
+            "prepare_data_streaming",
+            [],
+            lambda: prepare_data_streaming(
+                [csv_paths[1], csv_paths[0]], [csv_paths[3], csv_paths[2]]
+            ),
+        ),
+        ("prepare_outdoor_data", [], lambda: prepare_outdoor_data(paths["outdoor_temp_path"])),
+        ("prepare_main_dataset", [], lambda: prepare_main_dataset(paths["main_dataset_path"])),
+        (
+            "merge_data",
+            ["prepare_data", "prepare_outdoor_data", "prepare_main_dataset"],
+            merge_data,
+        ),
+        ("training_dataset", ["merge_data"], training_dataset),
+        ("logistic_regression_model", ["training_dataset"], logistic_regression_model),
+        ("random_forest_model", ["training_dataset"], random_forest_model),
+    ]
+
+
+def output_rows(result):
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, tuple):
+        return sum(len(part) for part in result)
+    return None
+
+
+def run_scale(paths, memory=True, repeat=3):
+    """
+    Führt alle Schritte aus und misst Laufzeit und Spitzenspeicher.
+
+    :param repeat: Anzahl gemessener Aufrufe pro Schritt nach dem Aufwärmen
+    :return: Dictionary Schritt -> Kennzahlen (``seconds`` ist der Median)
+    """
+    results = {}
+    measurements = {}
+    for name, inputs, function in pipeline_steps(paths):
+        # Ausgaben der Modellfunktionen (z. B. Klassenverteilung) unterdrücken
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            arguments = [copy.deepcopy(results[input_name]) for input_name in inputs]
+            results[name] = function(*arguments)
+
+            timings = []
+            for _ in range(repeat):
+                arguments = [copy.deepcopy(results[input_name]) for input_name in inputs]
+                gc.collect()
+                started = time.perf_counter()
+                function(*arguments)
+                timings.append(time.perf_counter() - started)
+            seconds = statistics.median(timings)
+
+            peak_mb = None
+            if memory:
+                arguments = [copy.deepcopy(results[input_name]) for input_name in inputs]
+                tracemalloc.start()
+                function(*arguments)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                peak_mb = round(peak / 1024 / 1024, 1)
+
+        measurements[name] = {
+            "seconds": round(seconds, 3),
+            "min_seconds": round(min(timings), 3),
+            "peak_mb": peak_mb,
+            "rows": output_rows(results[name]),
+        }
+        print(
+            f"  {name:<28}{seconds:>9.3f}s"
+            + (f"{peak_mb:>10.1f} MB" if peak_mb is not None else "")
+            + (f"{measurements[name]['rows']:>12} Zeilen" if measurements[name]["rows"] else "")
+        )
+    return measurements
+
+
+def compare(results, baseline, threshold, min_seconds=0.05):
+    """
+    Vergleicht die Ergebnisse mit der Basislinie.
+
+    :param threshold: erlaubte relative Verschlechterung (0.25 = 25 %)
+    :param min_seconds: kleinere Laufzeitunterschiede werden ignoriert
+    :return: Liste der Regressionen als Strings
+    """
+    regressions = []
+    print(f"\nVergleich mit Basislinie (Schwelle {threshold:.0%}):")
+    for scale, steps in results.items():
+        for name, current in steps.items():
+            previous = baseline.get("results", {}).get(scale, {}).get(name)
+            if previous is None:
+                continue
+            time_ratio = current["seconds"] / max(previous["seconds"], 1e-9)
+            line = f"  {scale:>4}x {name:<28}Zeit {time_ratio:6.2f}x"
+            slower = (
+                time_ratio > 1 + threshold
+                and current["seconds"] - previous["seconds"] > min_seconds
+            )
+            bigger = False
+            if current["peak_mb"] is not None and previous.get("peak_mb"):
+                memory_ratio = current["peak_mb"] / previous["peak_mb"]
+                line += f"  Speicher {memory_ratio:6.2f}x"
+                bigger = memory_ratio > 1 + threshold and current["peak_mb"] - previous["peak_mb"] > 1
+            if slower or bigger:
+                line += "  REGRESSION"
+                regressions.append(f"{scale}x {name}")
+            print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--data-directory", default=os.path.join("benchmarks", "data"))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="Ergebnisse zusätzlich als JSON speichern")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=3, help="gemessene Aufrufe pro Schritt")
+    parser.add_argument("--no-memory", action="store_true")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {}
+    for scale in args.scales:
+        started = time.perf_counter()
+        paths = synthetic_sources(os.path.join(args.data_directory, f"scale_{scale}"), scale)
+        print(f"Faktor {scale}x (Daten bereit nach {time.perf_counter() - started:.1f}s):")
+        results[str(scale)] = run_scale(paths, memory=not args.no_memory, repeat=args.repeat)
+
+    report = host_info()
+    report["repeat"] = args.repeat
+    report["statistic"] = "median"
+    report["results"] = results
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        if comparable(baseline):
+            regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Basislinie gespeichert in {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} Regression(en): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
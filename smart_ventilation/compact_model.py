@@ -0,0 +1,255 @@
+"""
+Kompaktes Modellformat ohne Pickle.
+
+Von den trainierten sklearn-/imblearn-Pipelines werden nur die für die
+Vorhersage nötigen Parameter gespeichert: Mittelwerte des Imputers, Mittelwerte
+und Skalen des StandardScalers, Koeffizienten der logistischen Regression bzw.
+die Knoten aller Bäume eines Random Forests. Die Datei ist ein .npz-Archiv
+(reine numpy-Arrays) mit versionierten Metadaten als JSON.
+
+Zum Laden und Vorhersagen wird nur numpy benötigt; sklearn und imblearn werden
+weder beim Export noch beim Laden importiert.
+
+Export vorhandener Modelle (im Verzeichnis smart_ventilation):
+    python compact_model.py models/Logistic_Regression.pkl models/Random_Forest.pkl
+"""
+
+import json
+import sys
+
+import numpy as np
+
+FORMAT_NAME = "smart-ventilation-model"
+FORMAT_VERSION = 1
+
+# Schritte, die nur beim Training wirken (z. B. SMOTE) besitzen fit_resample
+SAMPLER_METHOD = "fit_resample"
+
+
+def _step_arrays(index, step):
+    """
+    Liefert Beschreibung und Arrays eines Vorverarbeitungsschritts.
+
+    :param index: Position des Schritts in der Pipeline
+    :param step: angepasster Transformer
+    :return: Tuple (Beschreibung als dict, dict mit Arrays)
+    """
+    kind = type(step).__name__
+    if kind == "SimpleImputer":
+        statistics = np.asarray(step.statistics_, dtype=float)
+        missing_values = step.missing_values
+        if not (isinstance(missing_values, float) and np.isnan(missing_values)):
+            raise ValueError("SimpleImputer: nur missing_values=np.nan wird unterstützt")
+        if step.add_indicator:
+            raise ValueError("SimpleImputer: add_indicator wird nicht unterstützt")
+        if np.isnan(statistics).any() and not step.keep_empty_features:
+            raise ValueError("SimpleImputer: leere Merkmale werden nicht unterstützt")
+        name = f"step{index}_statistics"
+        return {"type": "impute", "statistics": name}, {name: statistics}
+
+    if kind == "StandardScaler":
+        n_features = step.n_features_in_
+        mean = step.mean_ if step.with_mean else None
+        scale = step.scale_ if step.with_std else None
+        mean_name = f"step{index}_mean"
+        scale_name = f"step{index}_scale"
+        arrays = {
+            mean_name: np.zeros(n_features) if mean is None else np.asarray(mean, dtype=float),
+            scale_name: np.ones(n_features) if scale is None else np.asarray(scale, dtype=float),
+        }
+        return {"type": "scale", "mean": mean_name, "scale": scale_name}, arrays
+
+    raise ValueError(f"Nicht unterstützter Vorverarbeitungsschritt: {kind}")
+
+
+def _estimator_arrays(estimator):
+    """
+    Liefert Beschreibung und Arrays des abschließenden Schätzers.
+    """
+    kind = type(estimator).__name__
+    if hasattr(estimator, "coef_") and hasattr(estimator, "classes_"):
+        return {"type": "linear_classifier", "estimator": kind}, {
+            "coef": np.asarray(estimator.coef_, dtype=float),
+            "intercept": np.asarray(estimator.intercept_, dtype=float),
+            "classes": np.asarray(estimator.classes_),
+        }
+
+    if hasattr(estimator, "estimators_") and hasattr(estimator.estimators_[0], "tree_"):
+        if getattr(estimator, "n_outputs_", 1) != 1:
+            raise ValueError(f"{kind}: nur eine Zielgröße wird unterstützt")
+        trees = [tree.tree_ for tree in estimator.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        children_left, children_right, feature, threshold, value = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            leaf = tree.children_left == -1
+            children_left.append(np.where(leaf, -1, tree.children_left + offset))
+            children_right.append(np.where(leaf, -1, tree.children_right + offset))
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            value.append(tree.value[:, 0, :])
+
+        arrays = {
+            "roots": offsets[:-1].astype(np.int64),
+            "children_left": np.concatenate(children_left).astype(np.int64),
+            "children_right": np.concatenate(children_right).astype(np.int64),
+            "feature": np.concatenate(feature).astype(np.int64),
+            "threshold": np.concatenate(threshold).astype(np.float64),
+            "value": np.concatenate(value).astype(np.float64),
+        }
+        if hasattr(estimator, "classes_"):
+            arrays["classes"] = np.asarray(estimator.classes_)
+            return {"type": "forest_classifier", "estimator": kind}, arrays
+        return {"type": "forest_regressor", "estimator": kind}, arrays
+
+    raise ValueError(f"Nicht unterstützter Schätzer: {kind}")
+
+
+def export_model(model, path):
+    """
+    Schreibt ein trainiertes Modell (Pipeline oder einzelner Schätzer) im
+    kompakten Format.
+
+    :param model: angepasste sklearn-/imblearn-Pipeline oder Schätzer
+    :param path: Zieldatei (.npz)
+    """
+    steps = list(model.steps) if hasattr(model, "steps") else [(None, model)]
+    *transformers, (_, estimator) = steps
+
+    meta = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "n_features": int(getattr(model, "n_features_in_", estimator.n_features_in_)),
+        "steps": [],
+    }
+    feature_names = getattr(transformers[0][1] if transformers else estimator, "feature_names_in_", None)
+    if feature_names is not None:
+        meta["feature_names"] = [str(name) for name in feature_names]
+
+    arrays = {}
+    for index, (_, step) in enumerate(transformers):
+        if step is None or step == "passthrough" or hasattr(step, SAMPLER_METHOD):
+            continue
+        description, step_arrays = _step_arrays(index, step)
+        meta["steps"].append(description)
+        arrays.update(step_arrays)
+
+    meta["estimator"], estimator_arrays = _estimator_arrays(estimator)
+    arrays.update(estimator_arrays)
+
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    with open(path, "wb") as file:
+        np.savez_compressed(file, **arrays)
+
+
+def load_model(path):
+    """
+    Lädt ein Modell im kompakten Format.
+
+    :param path: Datei (.npz)
+    :return: CompactModel
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    meta = json.loads(arrays.pop("meta").tobytes().decode("utf-8"))
+    if meta.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path}: kein Modell im kompakten Format")
+    if meta.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(
+            f"{path}: Formatversion {meta['version']} wird nicht unterstützt (maximal {FORMAT_VERSION})"
+        )
+    return CompactModel(meta, arrays)
+
+
+class CompactModel:
+    """
+    Vorhersage mit den Parametern eines exportierten Modells, nur mit numpy.
+
+    Bietet predict (und für Klassifikatoren predict_proba) mit denselben
+    Ergebnissen wie die ursprüngliche Pipeline.
+    """
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.arrays = arrays
+        self.n_features_in_ = meta["n_features"]
+        self.kind = meta["estimator"]["type"]
+        if "classes" in arrays:
+            self.classes_ = arrays["classes"]
+
+    def _preprocess(self, X):
+        X = np.array(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Erwartet {self.n_features_in_} Merkmale, erhalten: {X.shape}"
+            )
+        for step in self.meta["steps"]:
+            if step["type"] == "impute":
+                statistics = self.arrays[step["statistics"]]
+                missing = np.isnan(X)
+                X[missing] = np.broadcast_to(statistics, X.shape)[missing]
+            elif step["type"] == "scale":
+                X = (X - self.arrays[step["mean"]]) / self.arrays[step["scale"]]
+        return X
+
+    def _leaves(self, X):
+        """
+        Verfolgt alle Stichproben gleichzeitig durch alle Bäume.
+
+        :return: Array (Stichproben, Bäume) mit dem Index des erreichten Blatts
+        """
+        # Die Bäume vergleichen wie sklearn mit float32-Werten
+        X = X.astype(np.float32)
+        left = self.arrays["children_left"]
+        right = self.arrays["children_right"]
+        feature = self.arrays["feature"]
+        threshold = self.arrays["threshold"]
+
+        node = np.tile(self.arrays["roots"], (len(X), 1))
+        rows = np.arange(len(X))[:, None]
+        while True:
+            inner = left[node] != -1
+            if not inner.any():
+                return node
+            go_left = X[rows, feature[node]] <= threshold[node]
+            node = np.where(inner, np.where(go_left, left[node], right[node]), node)
+
+    def predict_proba(self, X):
+        X = self._preprocess(X)
+        if self.kind == "linear_classifier":
+            scores = X @ self.arrays["coef"].T + self.arrays["intercept"]
+            if scores.shape[1] == 1:
+                positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+                return np.column_stack([1.0 - positive, positive])
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return scores / scores.sum(axis=1, keepdims=True)
+        if self.kind == "forest_classifier":
+            value = self.arrays["value"][self._leaves(X)]
+            value = value / value.sum(axis=2, keepdims=True)
+            return value.mean(axis=1)
+        raise AttributeError(f"{self.kind} bietet kein predict_proba")
+
+    def predict(self, X):
+        if self.kind == "forest_regressor":
+            leaves = self._leaves(self._preprocess(X))
+            return self.arrays["value"][leaves, 0].mean(axis=1)
+        if self.kind == "linear_classifier":
+            X = self._preprocess(X)
+            scores = X @ self.arrays["coef"].T + self.arrays["intercept"]
+            if scores.shape[1] == 1:
+                return self.classes_[(scores[:, 0] > 0).astype(int)]
+            return self.classes_[scores.argmax(axis=1)]
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def main(paths):
+    # joblib nur für den Export aus .pkl-Dateien
+    import joblib
+
+    for path in paths:
+        target = path[: -len(".pkl")] + ".npz" if path.endswith(".pkl") else f"{path}.npz"
+        export_model(joblib.load(path), target)
+        print(f"{path} exportiert nach {target}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
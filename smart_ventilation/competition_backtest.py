@@ -0,0 +1,261 @@
+"""
+Backtest alternativer Bewertungsprofile des Klassen-Wettbewerbs über
+historische Sensordaten (``datasets/10c_co2_*.csv``).
+
+Die CSV-Dateien werden einmal eingelesen und auf ein Minutenraster mit
+NumPy-Spalten der Form (Minuten, Teams, 3) gebracht. Jedes Sensorgerät
+(``dev_eui``) ist ein Team; zusätzlich können - wie auf der Live-Seite -
+zeitversetzte virtuelle Teams gebildet werden. Die Profile werden parallel
+auf allen Kernen bewertet und pro Profil Kennzahlen zur Stabilität der
+Rangfolge ausgegeben.
+
+Aufruf (im Verzeichnis smart_ventilation):
+    python competition_backtest.py --offset 60 --offset 1440 --output backtest.json
+    python competition_backtest.py --profiles profiles.json
+
+``profiles.json`` enthält eine Liste von Profil-Abweichungen, z. B.
+``[{"name": "mehr Luft", "air_quality_weight": 0.6, "energy_weight": 0.2, "temperature_weight": 0.2}]``.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from competition_scoring import DEFAULT_PROFILE, READING_COLUMNS, make_profile, score_teams
+
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_CSV_PATTERN = "datasets/10c_co2_*.csv"
+
+# Wird in jedem Worker-Prozess einmal gesetzt (siehe _init_worker)
+_history = {}
+
+
+def load_history(paths, offsets=(), max_gap=15):
+    """
+    Liest die CSV-Dateien einmal ein und erzeugt ein Minutenraster.
+
+    :param paths: Liste der CSV-Dateien mit den Spalten time, dev_eui, co2, humidity, temperature
+    :param offsets: Zeitversätze in Minuten für virtuelle Teams (auf Basis des ersten Geräts)
+    :param max_gap: Lücken bis zu dieser Länge (Minuten) werden mit dem letzten Wert gefüllt
+    :return: Tuple (Minuten als datetime64-Array, Teamnamen, Messwerte (Minuten, Teams, 3))
+    """
+    frames = [
+        pd.read_csv(path, usecols=["time", "dev_eui", *READING_COLUMNS]) for path in paths
+    ]
+    data = pd.concat(frames, ignore_index=True)
+    data["time"] = pd.to_datetime(data["time"], format="ISO8601", utc=True).dt.floor("min")
+
+    # Pro Minute und Gerät mitteln, danach Geräte als Spalten
+    per_minute = data.groupby(["time", "dev_eui"])[list(READING_COLUMNS)].mean().unstack("dev_eui")
+    full_range = pd.date_range(per_minute.index.min(), per_minute.index.max(), freq="min")
+    per_minute = per_minute.reindex(full_range).ffill(limit=max_gap)
+
+    devices = list(per_minute.columns.get_level_values("dev_eui").unique())
+    columns = [per_minute.xs(device, axis=1, level="dev_eui")[list(READING_COLUMNS)] for device in devices]
+    team_names = [f"Gerät {device}" for device in devices]
+
+    # Virtuelle Teams: erstes Gerät, um ``offset`` Minuten zeitversetzt
+    for offset in offsets:
+        columns.append(columns[0].shift(offset))
+        team_names.append(f"Gerät {devices[0]} (-{offset} min)")
+
+    readings = np.stack([column.to_numpy(dtype=float) for column in columns], axis=1)
+    complete = ~np.isnan(readings).any(axis=(1, 2))
+    minutes = full_range.tz_localize(None).to_numpy()[complete]
+    return minutes, team_names, readings[complete]
+
+
+def _init_worker(minutes, readings, baseline_ranks):
+    _history["minutes"] = minutes
+    _history["readings"] = readings
+    _history["baseline_ranks"] = baseline_ranks
+
+
+def leader_per_minute(ranks):
+    """
+    :param ranks: Ränge der Form (Minuten, Teams)
+    :return: Index des alleinigen Führenden pro Minute, -1 bei Gleichstand
+    """
+    leaders = ranks == 1
+    return np.where(leaders.sum(axis=1) == 1, leaders.argmax(axis=1), -1)
+
+
+def ranking_statistics(minutes, total, ranks, baseline_ranks):
+    """
+    Kennzahlen zur Stabilität der Rangfolge eines Profils.
+
+    :param minutes: datetime64-Array der Minuten
+    :param total: Gesamtpunktzahlen der Form (Minuten, Teams)
+    :param ranks: Ränge der Form (Minuten, Teams)
+    :param baseline_ranks: Ränge des Standardprofils zum Vergleich
+    :return: Dictionary mit Kennzahlen
+    """
+    leaders = leader_per_minute(ranks)
+    decided = leaders >= 0
+    decided_leaders = leaders[decided]
+
+    # Führungswechsel zwischen aufeinanderfolgenden entschiedenen Minuten
+    changes = np.count_nonzero(decided_leaders[1:] != decided_leaders[:-1])
+    run_lengths = np.diff(np.flatnonzero(np.diff(decided_leaders, prepend=-2, append=-2)))
+
+    # Tagessieger anhand der mittleren Tagespunktzahl
+    days = minutes.astype("datetime64[D]")
+    day_keys, day_index = np.unique(days, return_inverse=True)
+    day_sums = np.zeros((len(day_keys), total.shape[1]))
+    np.add.at(day_sums, day_index, total)
+    day_counts = np.bincount(day_index, minlength=len(day_keys))[:, None]
+    day_winners = np.argmax(day_sums / day_counts, axis=1)
+
+    num_teams = total.shape[1]
+    return {
+        "minutes": int(len(minutes)),
+        "mean_score": np.round(total.mean(axis=0), 2).tolist(),
+        "win_share": np.round(
+            np.bincount(decided_leaders, minlength=num_teams) / max(len(leaders), 1), 4
+        ).tolist(),
+        "tie_share": round(float(1 - decided.mean()), 4) if len(leaders) else 0.0,
+        "lead_changes": int(changes),
+        "lead_changes_per_day": round(changes / max(len(day_keys), 1), 2),
+        "mean_lead_minutes": round(float(run_lengths.mean()), 1) if len(run_lengths) else 0.0,
+        "unchanged_ranking_share": (
+            round(float((ranks[1:] == ranks[:-1]).all(axis=1).mean()), 4)
+            if len(ranks) > 1
+            else 1.0
+        ),
+        "agreement_with_default": round(
+            float((ranks == baseline_ranks).all(axis=1).mean()), 4
+        ),
+        "daily_wins": np.bincount(day_winners, minlength=num_teams).tolist(),
+    }
+
+
+def backtest_profile(profile):
+    """
+    Bewertet alle Minuten mit einem Profil (läuft in einem Worker-Prozess).
+    """
+    started = time.perf_counter()
+    scores = score_teams(_history["readings"], profile)
+    statistics = ranking_statistics(
+        _history["minutes"],
+        scores["total_score"],
+        scores["rank"],
+        _history["baseline_ranks"],
+    )
+    statistics["profile"] = profile["name"]
+    statistics["seconds"] = round(time.perf_counter() - started, 3)
+    return statistics
+
+
+def default_profiles():
+    """
+    Standardprofil und ein Raster alternativer Gewichtungen.
+    """
+    profiles = [dict(DEFAULT_PROFILE)]
+    for energy_weight in (0.15, 0.25, 0.35):
+        for air_quality_weight in (0.4, 0.5, 0.6):
+            temperature_weight = round(1 - energy_weight - air_quality_weight, 2)
+            if (energy_weight, air_quality_weight) == (0.25, 0.5):
+                continue
+            profiles.append(
+                make_profile(
+                    name=f"e{energy_weight}-a{air_quality_weight}-t{temperature_weight}",
+                    energy_weight=energy_weight,
+                    air_quality_weight=air_quality_weight,
+                    temperature_weight=temperature_weight,
+                )
+            )
+    return profiles
+
+
+def load_profiles(path):
+    """
+    Lädt Profil-Abweichungen aus einer JSON-Datei. Das Standardprofil wird
+    immer als erstes Profil bewertet.
+    """
+    with open(path, "r") as file:
+        overrides = json.load(file)
+    profiles = [dict(DEFAULT_PROFILE)]
+    for i, override in enumerate(overrides):
+        override.setdefault("name", f"profil-{i + 1}")
+        profiles.append(make_profile(**override))
+    return profiles
+
+
+def run_backtest(minutes, readings, profiles, processes=None):
+    """
+    Bewertet alle Profile parallel.
+
+    :return: Liste der Kennzahlen pro Profil in der Reihenfolge der Profile
+    """
+    baseline_ranks = score_teams(readings, DEFAULT_PROFILE)["rank"]
+    with Pool(
+        processes=processes,
+        initializer=_init_worker,
+        initargs=(minutes, readings, baseline_ranks),
+    ) as pool:
+        return pool.map(backtest_profile, profiles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--csv",
+        action="append",
+        help=f"CSV-Datei(en) mit historischen Daten (Standard: {DEFAULT_CSV_PATTERN})",
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        action="append",
+        default=[],
+        help="Zeitversatz in Minuten für ein virtuelles Team, mehrfach angebbar",
+    )
+    parser.add_argument("--max-gap", type=int, default=15)
+    parser.add_argument("--profiles", help="JSON-Datei mit Profil-Abweichungen")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    paths = args.csv or sorted(glob.glob(DEFAULT_CSV_PATTERN))
+    if not paths:
+        raise SystemExit(f"Keine CSV-Dateien gefunden: {DEFAULT_CSV_PATTERN}")
+
+    started = time.perf_counter()
+    minutes, team_names, readings = load_history(paths, args.offset, args.max_gap)
+    logging.info(
+        f"{len(minutes)} Minuten für {len(team_names)} Teams aus {len(paths)} Datei(en) "
+        f"in {time.perf_counter() - started:.2f}s geladen"
+    )
+
+    profiles = load_profiles(args.profiles) if args.profiles else default_profiles()
+    started = time.perf_counter()
+    results = run_backtest(minutes, readings, profiles, args.processes)
+    logging.info(f"{len(profiles)} Profile in {time.perf_counter() - started:.2f}s bewertet")
+
+    for i, name in enumerate(team_names):
+        print(f"Team {i}: {name}")
+    for result in results:
+        print(
+            f"{result['profile']:>20}  Siege/Minute={result['win_share']} "
+            f"Gleichstand={result['tie_share']} Führungswechsel/Tag={result['lead_changes_per_day']} "
+            f"Führung Ø {result['mean_lead_minutes']} min "
+            f"unverändert={result['unchanged_ranking_share']} "
+            f"wie Standard={result['agreement_with_default']} Tagessiege={result['daily_wins']}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"teams": team_names, "paths": paths, "results": results}, file, indent=2)
+        logging.info(f"Ergebnisse gespeichert in {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Vektorisierte Bewertung des Klassen-Wettbewerbs.
+
+Die Messwerte aller Teams werden als Matrix übergeben (letzte Achse:
+``READING_COLUMNS``), sodass Energie-, Luftqualitäts- und Temperaturwerte,
+Gesamtpunktzahl und Rang für beliebig viele Teams (und optional viele
+Zeitpunkte in vorangestellten Achsen) in einem Durchlauf berechnet werden.
+"""
+
+import numpy as np
+
+# Spalten der Messwert-Matrix
+READING_COLUMNS = ("temperature", "co2", "humidity")
+TEMPERATURE, CO2, HUMIDITY = range(len(READING_COLUMNS))
+
+# Bisherige Formeln aus team_competition() als Standardprofil
+DEFAULT_PROFILE = {
+    "name": "default",
+    # Kennzahlen aus den Messwerten
+    "co2_baseline": 400.0,
+    "energy_base": 2.0,
+    "energy_ppm_divisor": 800.0,
+    "energy_min": 2.0,
+    "energy_max": 4.0,
+    "air_quality_ppm_divisor": 40.0,
+    "air_quality_min": 60.0,
+    "air_quality_max": 95.0,
+    "optimal_temperature": 20.0,
+    # Punkte aus den Kennzahlen
+    "energy_score_slope": 20.0,
+    "energy_score_floor": 60.0,
+    "temperature_score_slope": 10.0,
+    "temperature_score_floor": 70.0,
+    # Gewichtete Summe: Luftqualität ist wichtiger
+    "energy_weight": 0.25,
+    "air_quality_weight": 0.5,
+    "temperature_weight": 0.25,
+}
+
+
+def make_profile(**overrides):
+    """
+    Erstellt ein Bewertungsprofil auf Basis des Standardprofils.
+
+    :param overrides: abweichende Parameter, z. B. ``air_quality_weight=0.6``
+    :return: Profil als Dictionary
+    """
+    unknown = set(overrides) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"Unbekannte Profilparameter: {sorted(unknown)}")
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(overrides)
+    return profile
+
+
+def metrics_from_readings(readings, profile=DEFAULT_PROFILE):
+    """
+    Berechnet Energieverbrauch, Luftqualität und Temperaturabweichung.
+
+    :param readings: Array der Form (..., Teams, 3) mit Temperatur, CO2, Feuchtigkeit
+    :param profile: Bewertungsprofil
+    :return: Tuple (energy_consumption, air_quality_score, temperature_deviation)
+    """
+    readings = np.asarray(readings, dtype=float)
+    co2_excess = readings[..., CO2] - profile["co2_baseline"]
+
+    energy_consumption = np.round(
+        np.clip(
+            profile["energy_base"] + co2_excess / profile["energy_ppm_divisor"],
+            profile["energy_min"],
+            profile["energy_max"],
+        ),
+        2,
+    )
+    air_quality_score = np.round(
+        np.clip(
+            100 - co2_excess / profile["air_quality_ppm_divisor"],
+            profile["air_quality_min"],
+            profile["air_quality_max"],
+        ),
+        1,
+    )
+    temperature_deviation = np.round(
+        np.abs(readings[..., TEMPERATURE] - profile["optimal_temperature"]), 1
+    )
+    return energy_consumption, air_quality_score, temperature_deviation
+
+
+def total_scores(
+    energy_consumption, air_quality_score, temperature_deviation, profile=DEFAULT_PROFILE
+):
+    """
+    Berechnet die gewichtete Gesamtpunktzahl aus den Kennzahlen.
+
+    :return: Array der Gesamtpunktzahlen, auf eine Nachkommastelle gerundet
+    """
+    energy_score = np.maximum(
+        profile["energy_score_floor"],
+        100 - (np.asarray(energy_consumption) - profile["energy_min"])
+        * profile["energy_score_slope"],
+    )
+    temp_score = np.maximum(
+        profile["temperature_score_floor"],
+        100 - np.asarray(temperature_deviation) * profile["temperature_score_slope"],
+    )
+    total = (
+        energy_score * profile["energy_weight"]
+        + np.asarray(air_quality_score) * profile["air_quality_weight"]
+        + temp_score * profile["temperature_weight"]
+    )
+    return np.round(total, 1)
+
+
+def rank_scores(scores):
+    """
+    Rangfolge entlang der letzten Achse (1 = bester Wert). Gleiche Punktzahlen
+    erhalten denselben Rang.
+
+    :param scores: Array der Form (..., Teams)
+    :return: Ränge als Integer-Array derselben Form
+    """
+    scores = np.asarray(scores)
+    return (scores[..., None, :] > scores[..., :, None]).sum(axis=-1) + 1
+
+
+def score_teams(readings, profile=DEFAULT_PROFILE):
+    """
+    Bewertet alle Teams in einem vektorisierten Durchlauf.
+
+    :param readings: Array der Form (..., Teams, 3) mit Temperatur, CO2, Feuchtigkeit
+    :param profile: Bewertungsprofil
+    :return: Dictionary mit Arrays der Form (..., Teams)
+    """
+    energy, air_quality, temp_deviation = metrics_from_readings(readings, profile)
+    total = total_scores(energy, air_quality, temp_deviation, profile)
+    return {
+        "energy_consumption": energy,
+        "air_quality_score": air_quality,
+        "temperature_deviation": temp_deviation,
+        "total_score": total,
+        "rank": rank_scores(total),
+    }
+
+
+def team_results(team_names, scores):
+    """
+    Wandelt die Arrays eines einzelnen Zeitpunkts in eine Liste von
+    Dictionaries pro Team um (für Templates und JSON).
+
+    :param team_names: Namen der Teams in Zeilenreihenfolge
+    :param scores: Ergebnis von ``score_teams`` für die Form (Teams,)
+    """
+    return [
+        {
+            "name": name,
+            "energy_consumption": float(scores["energy_consumption"][i]),
+            "air_quality_score": float(scores["air_quality_score"][i]),
+            "temperature_deviation": float(scores["temperature_deviation"][i]),
+            "total_score": float(scores["total_score"][i]),
+            "rank": int(scores["rank"][i]),
+        }
+        for i, name in enumerate(team_names)
+    ]
+
+
+def determine_winner(results):
+    """
+    :param results: Ergebnis von ``team_results``
+    :return: Name des Gewinnerteams oder "Unentschieden" bei gleicher Höchstpunktzahl
+    """
+    leaders = [team["name"] for team in results if team["rank"] == 1]
+    if len(leaders) != 1:
+        return "Unentschieden"
+    return leaders[0]
@@ -0,0 +1,122 @@
+import logging
+import re
+import sqlite3
+
+# Tabellen der PostgreSQL-Datenbank, soweit sie von der Anwendung verwendet werden
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS classroom_environmental_data (
+        timestamp TEXT,
+        co2_values REAL,
+        temperature REAL,
+        humidity REAL,
+        classroom_number TEXT
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS classroom_environmental_data_timestamp
+    ON classroom_environmental_data (timestamp)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS feedback_tabelle (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        temperature REAL,
+        humidity REAL,
+        co2 REAL,
+        timestamp TEXT,
+        outdoor_temperature REAL,
+        accurate_prediction INTEGER
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS feedback_tabelle_timestamp
+    ON feedback_tabelle (timestamp)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS environmental_data_analysis (
+        timestamp TEXT,
+        current_co2 REAL,
+        future_co2 REAL,
+        co2_change REAL,
+        current_temperature REAL,
+        future_temperature REAL,
+        temperature_change REAL,
+        current_humidity REAL,
+        future_humidity REAL,
+        humidity_change REAL,
+        decision TEXT
+    )
+    """,
+]
+
+# PostgreSQL-Syntax der Abfragen in SQLite-Syntax übersetzen
+_CAST_TIMESTAMP = re.compile(r"CAST\(%s AS timestamp\)", re.IGNORECASE)
+
+
+def translate_query(query):
+    """
+    Übersetzt eine psycopg2-Abfrage in SQLite-Syntax (Platzhalter ``%s`` -> ``?``).
+    """
+    return _CAST_TIMESTAMP.sub("?", query).replace("%s", "?")
+
+
+class LocalCursor:
+    """
+    Cursor mit der von der Anwendung genutzten psycopg2-Schnittstelle.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, query, params=()):
+        params = tuple(
+            value.isoformat(sep=" ") if hasattr(value, "isoformat") else value
+            for value in params
+        )
+        self.cursor.execute(translate_query(query), params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+
+class LocalConnection:
+    """
+    SQLite-Verbindung mit der von der Anwendung genutzten psycopg2-Schnittstelle.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def cursor(self):
+        return LocalCursor(self.connection.cursor())
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+
+def connect_local_database(path=":memory:"):
+    """
+    Stellt eine SQLite-Verbindung als Ersatz für die PostgreSQL-Datenbank her
+    (für Last- und Replay-Tests ohne Datenbankserver) und legt die Tabellen an.
+
+    :param path: Pfad zur SQLite-Datei oder ":memory:"
+    :return: Das Connection-Objekt
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    for statement in SCHEMA:
+        connection.execute(statement)
+    connection.commit()
+    logging.info(f"Lokale Ersatzdatenbank bereit: {path}")
+    return LocalConnection(connection)
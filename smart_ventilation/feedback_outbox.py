@@ -0,0 +1,301 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_http_session(pool_size=4, retries=3, backoff_factor=0.5):
+    """
+    Erstellt eine requests-Session mit Connection-Pool, Keep-Alive und
+    automatischen Wiederholungen mit exponentiellem Backoff.
+
+    :param pool_size: Anzahl der Verbindungen im Pool
+    :param retries: Maximale Anzahl an Wiederholungen pro Anfrage
+    :param backoff_factor: Basis für die Wartezeit zwischen den Wiederholungen
+    :return: konfigurierte requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class FeedbackOutbox:
+    """
+    Dauerhafte lokale Warteschlange (SQLite) für Benutzerfeedback.
+
+    Der Request-Handler legt das Feedback nur in der Outbox ab und antwortet
+    sofort. Ein Hintergrund-Thread leitet die Einträge stapelweise über eine
+    gepoolte HTTP-Session an die API weiter. Ist die API nicht erreichbar,
+    bleiben die Einträge erhalten und werden mit wachsendem Abstand erneut
+    gesendet.
+
+    Mehrere Gunicorn-Worker können dieselbe Datei nutzen: Einträge werden vor
+    dem Senden für eine begrenzte Zeit von einem Worker reserviert.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        api_url,
+        headers,
+        session=None,
+        batch_size=20,
+        interval=10,
+        max_backoff=300,
+        lease_seconds=120,
+        on_sent=None,
+    ):
+        """
+        :param db_path: Pfad zur SQLite-Datei der Outbox
+        :param api_url: Ziel-URL der API
+        :param headers: HTTP-Header für die API (API-Schlüssel, Content-Type)
+        :param session: optionale requests.Session, sonst wird eine gepoolte Session erstellt
+        :param batch_size: Anzahl der Einträge pro Durchlauf
+        :param interval: Abstand zwischen den Durchläufen in Sekunden
+        :param max_backoff: Maximaler Abstand in Sekunden, wenn die API ausfällt
+        :param lease_seconds: Reservierungsdauer eines Eintrags für einen Worker
+        :param on_sent: optionale Funktion, die nach erfolgreichem Senden mit dem
+                        Feedback aufgerufen wird (z. B. MQTTClient.store_feedback_data)
+        """
+        self.db_path = db_path
+        self.api_url = api_url
+        self.headers = headers
+        self.session = session or create_http_session()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.on_sent = on_sent
+        self.worker_id = str(uuid.uuid4())
+        self.running = False
+        self.wake_event = threading.Event()
+        self.thread = None
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_table()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _create_table(self):
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feedback_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    claimed_by TEXT,
+                    claimed_until REAL
+                )
+                """
+            )
+
+    def enqueue(self, feedback_data):
+        """
+        Legt ein Feedback in der Outbox ab und weckt den Sende-Thread.
+
+        :param feedback_data: Feedback als JSON-serialisierbares Dictionary
+        """
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO feedback_outbox (payload, created_at) VALUES (?, ?)",
+                (json.dumps(feedback_data), time.time()),
+            )
+        self.wake_event.set()
+
+    def pending_count(self):
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM feedback_outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def _claim_batch(self):
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.isolation_level = None
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    """
+                    UPDATE feedback_outbox
+                    SET claimed_by = ?, claimed_until = ?
+                    WHERE id IN (
+                        SELECT id FROM feedback_outbox
+                        WHERE status = 'pending'
+                        AND (claimed_until IS NULL OR claimed_until < ?)
+                        ORDER BY id
+                        LIMIT ?
+                    )
+                    """,
+                    (self.worker_id, now + self.lease_seconds, now, self.batch_size),
+                )
+                rows = connection.execute(
+                    """
+                    SELECT id, payload FROM feedback_outbox
+                    WHERE claimed_by = ? AND status = 'pending'
+                    ORDER BY id
+                    """,
+                    (self.worker_id,),
+                ).fetchall()
+                connection.execute("COMMIT")
+                return rows
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    def flush(self):
+        """
+        Sendet einen Stapel ausstehender Einträge an die API. Bricht beim ersten
+        Verbindungs- oder Serverfehler ab, damit die übrigen Einträge später
+        erneut versucht werden.
+
+        :return: Tuple (Anzahl gesendeter Einträge, True wenn die API erreichbar war)
+        """
+        rows = self._claim_batch()
+        if not rows:
+            return 0, True
+
+        sent_ids = []
+        sent_payloads = []
+        rejected = []
+        failed = None
+        for row_id, payload in rows:
+            try:
+                response = self.session.post(
+                    self.api_url,
+                    headers=self.headers,
+                    data=payload,
+                    timeout=10,
+                )
+            except requests.RequestException as e:
+                failed = (row_id, str(e))
+                break
+
+            if 200 <= response.status_code < 300:
+                sent_ids.append(row_id)
+                sent_payloads.append(payload)
+            elif 400 <= response.status_code < 500 and response.status_code != 429:
+                # Dauerhaft abgelehnt, nicht erneut senden
+                rejected.append((f"{response.status_code}: {response.text}", row_id))
+            else:
+                failed = (row_id, f"{response.status_code}: {response.text}")
+                break
+
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "DELETE FROM feedback_outbox WHERE id = ?",
+                [(row_id,) for row_id in sent_ids],
+            )
+            connection.executemany(
+                """
+                UPDATE feedback_outbox
+                SET status = 'rejected', last_error = ?, attempts = attempts + 1
+                WHERE id = ?
+                """,
+                rejected,
+            )
+            if failed is not None:
+                connection.execute(
+                    """
+                    UPDATE feedback_outbox
+                    SET attempts = attempts + 1, last_error = ?
+                    WHERE id = ?
+                    """,
+                    (failed[1], failed[0]),
+                )
+            # Reservierung der nicht bearbeiteten Einträge aufheben
+            connection.execute(
+                """
+                UPDATE feedback_outbox
+                SET claimed_by = NULL, claimed_until = NULL
+                WHERE claimed_by = ?
+                """,
+                (self.worker_id,),
+            )
+
+        if rejected:
+            logging.error(
+                f"FeedbackOutbox: {len(rejected)} Feedback-Einträge wurden von der API abgelehnt"
+            )
+        if failed is not None:
+            logging.warning(
+                f"FeedbackOutbox: API nicht erreichbar, Einträge bleiben in der Outbox: {failed[1]}"
+            )
+        if sent_ids:
+            logging.info(f"FeedbackOutbox: {len(sent_ids)} Feedback-Einträge gesendet")
+            if self.on_sent:
+                for payload in sent_payloads:
+                    try:
+                        self.on_sent(json.loads(payload))
+                    except Exception as e:
+                        logging.error(
+                            f"FeedbackOutbox: Fehler bei der Weiterverarbeitung eines gesendeten Feedbacks: {e}"
+                        )
+        return len(sent_ids), failed is None
+
+    def run(self):
+        """
+        Sendet ausstehende Einträge periodisch oder sobald neues Feedback eintrifft.
+        """
+        delay = self.interval
+        while self.running:
+            self.wake_event.wait(delay)
+            self.wake_event.clear()
+            if not self.running:
+                break
+            try:
+                while True:
+                    sent, reachable = self.flush()
+                    if not reachable or sent < self.batch_size:
+                        break
+                delay = self.interval if reachable else min(delay * 2, self.max_backoff)
+            except Exception as e:
+                logging.error(f"FeedbackOutbox: Fehler beim Senden der Outbox: {e}")
+                delay = min(delay * 2, self.max_backoff)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(
+            target=self.run, name="feedback-outbox", daemon=True
+        )
+        self.thread.start()
+        # Einträge aus früheren Läufen sofort senden
+        self.wake_event.set()
+        logging.info("FeedbackOutbox gestartet")
+
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+        if self.thread:
+            self.thread.join()
+        self.session.close()
+        logging.info("FeedbackOutbox gestoppt")
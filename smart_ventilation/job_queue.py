@@ -0,0 +1,169 @@
+import base64
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    Ein Hintergrundauftrag mit Status und Ergebnis.
+    """
+
+    def __init__(self, job_id, kind, key):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.status = "pending"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        """
+        Gibt den Auftrag als JSON-serialisierbares Dictionary zurück.
+        """
+        return {
+            "id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class BackgroundJobQueue:
+    """
+    Führt langsame Berechnungen in einem Thread-Pool aus, damit Seiten sofort
+    gerendert werden können. Aufträge derselben Art mit demselben Schlüssel
+    (z. B. demselben Zeitstempel) werden zusammengelegt, sodass beliebig viele
+    wartende Clients sich einen Auftrag teilen.
+
+    Die Auftrags-ID enthält Art und Schlüssel. Fragt ein Client eine ID bei
+    einem Worker-Prozess an, der den Auftrag nicht kennt, wird er dort neu
+    angelegt, statt mit 404 zu antworten.
+
+    Warten bereits ``max_pending`` Aufträge auf einen freien Thread, werden
+    neue Aufträge abgelehnt (Status "rejected"); ein späteres ``submit`` oder
+    ``get`` mit derselben ID legt den Auftrag erneut an. Clients sollen es
+    nach ``retry_after`` Sekunden erneut versuchen.
+    """
+
+    def __init__(self, max_workers=2, result_ttl=600, max_pending=10, retry_after=30):
+        """
+        :param max_workers: Anzahl paralleler Hintergrund-Threads
+        :param result_ttl: Aufbewahrungsdauer abgeschlossener Aufträge in Sekunden
+        :param max_pending: maximale Anzahl auf einen Thread wartender Aufträge
+        :param retry_after: empfohlene Wartezeit in Sekunden nach einer Ablehnung
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="background-job"
+        )
+        self.result_ttl = result_ttl
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.handlers = {}
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def register(self, kind, handler):
+        """
+        Registriert die Funktion, die Aufträge einer Art berechnet.
+
+        :param kind: Name der Auftragsart, z. B. "future_data"
+        :param handler: Funktion, die den Schlüssel erhält und das Ergebnis liefert
+        """
+        self.handlers[kind] = handler
+
+    @staticmethod
+    def make_job_id(kind, key):
+        encoded_key = base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+        return f"{kind}.{encoded_key.rstrip('=')}"
+
+    @staticmethod
+    def parse_job_id(job_id):
+        kind, _, encoded_key = job_id.partition(".")
+        padding = "=" * (-len(encoded_key) % 4)
+        key = base64.urlsafe_b64decode(encoded_key + padding).decode("utf-8")
+        return kind, key
+
+    def submit(self, kind, key):
+        """
+        Legt einen Auftrag an oder gibt den bereits laufenden bzw. abgeschlossenen
+        Auftrag für denselben Schlüssel zurück.
+
+        :return: ID des Auftrags
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unbekannte Auftragsart: {kind}")
+
+        job_id = self.make_job_id(kind, key)
+        with self.lock:
+            self._purge_expired()
+            job = self.jobs.get(job_id)
+            if job is not None and job.status not in ("failed", "rejected"):
+                return job_id
+
+            job = Job(job_id, kind, key)
+            self.jobs[job_id] = job
+            pending = sum(1 for other in self.jobs.values() if other.status == "pending")
+            if pending > self.max_pending:
+                job.status = "rejected"
+                job.error = "Zu viele wartende Aufträge, bitte später erneut versuchen"
+                job.finished = time.time()
+
+        if job.status == "rejected":
+            logging.warning(f"Hintergrundauftrag {job_id} abgelehnt: {pending - 1} Aufträge warten")
+            return job_id
+
+        self.executor.submit(self._run, job)
+        logging.info(f"Hintergrundauftrag {job_id} für {key} gestartet")
+        return job_id
+
+    def get(self, job_id):
+        """
+        Gibt den Auftrag zur ID zurück. Unbekannte, aber gültige IDs und
+        abgelehnte Aufträge werden neu angelegt.
+
+        :return: Job oder None, wenn die ID ungültig ist
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is not None and job.status != "rejected":
+            return job
+
+        try:
+            kind, key = self.parse_job_id(job_id)
+        except Exception:
+            return None
+        if kind not in self.handlers:
+            return None
+
+        self.submit(kind, key)
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job):
+        job.status = "running"
+        try:
+            job.result = self.handlers[job.kind](job.key)
+            job.status = "done"
+        except Exception as e:
+            logging.error(f"Hintergrundauftrag {job.id} fehlgeschlagen: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.finished is not None and now - job.finished > self.result_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,174 @@
+"""
+Eingebetteter MQTT-Broker-Ersatz für Last- und Replay-Tests.
+
+``LocalBroker`` verteilt veröffentlichte Nachrichten im selben Prozess an alle
+passenden Abonnements (inklusive ``+``/``#``-Platzhaltern). ``LocalBrokerClient``
+bildet die von ``MQTTClient`` genutzte Teilmenge der paho-Client-Schnittstelle
+nach und ruft ``on_message`` wie paho aus einem eigenen Netzwerk-Thread auf.
+Damit durchläuft jede Nachricht denselben Weg wie im Betrieb: JSON-Dekodierung,
+Topic-Routing, Datensammlung und Löschprüfung.
+
+Beispiel:
+    broker = LocalBroker()
+    mqtt_client = MQTTClient(client=broker.client())
+    mqtt_client.initialize()
+    broker.publish(topic, json.dumps(payload))
+"""
+
+import logging
+import queue
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+
+class LocalMessage:
+    """
+    Nachricht mit den Attributen einer paho ``MQTTMessage``.
+    """
+
+    __slots__ = ("topic", "payload", "qos", "retain", "timestamp")
+
+    def __init__(self, topic, payload, qos=0, retain=False):
+        self.topic = topic
+        self.payload = payload if isinstance(payload, bytes) else str(payload).encode()
+        self.qos = qos
+        self.retain = retain
+        self.timestamp = time.perf_counter()
+
+
+class LocalBroker:
+    """
+    Verteilt Nachrichten an die Abonnements der verbundenen Clients.
+    """
+
+    def __init__(self):
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        self.published = 0
+
+    def client(self):
+        """
+        :return: neuer, mit diesem Broker verbundener Client
+        """
+        return LocalBrokerClient(self)
+
+    def subscribe(self, client, topic):
+        with self.lock:
+            if (topic, client) not in self.subscriptions:
+                self.subscriptions.append((topic, client))
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.subscriptions = [
+                (topic, subscriber)
+                for topic, subscriber in self.subscriptions
+                if subscriber is not client
+            ]
+
+    def publish(self, topic, payload, qos=0, retain=False):
+        """
+        Stellt die Nachricht allen Clients mit passendem Abonnement zu
+        (jedem Client höchstens einmal).
+
+        :return: Anzahl der Empfänger
+        """
+        message = LocalMessage(topic, payload, qos, retain)
+        with self.lock:
+            receivers = {
+                id(client): client
+                for pattern, client in self.subscriptions
+                if mqtt.topic_matches_sub(pattern, topic)
+            }
+            self.published += 1
+        for client in receivers.values():
+            client.deliver(message)
+        return len(receivers)
+
+
+class LocalBrokerClient:
+    """
+    paho-kompatibler Client für ``LocalBroker``. TLS- und Anmeldedaten werden
+    ignoriert, ``connect`` ruft ``on_connect`` direkt auf.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.on_connect = None
+        self.on_message = None
+        self.connected = False
+        self.inbox = queue.Queue()
+        self.loop_thread = None
+        self.running = False
+        self.delivered = 0
+        self.max_backlog = 0
+        # Zeit von der Veröffentlichung bis zum Ende von on_message (Sekunden)
+        self.latencies = []
+
+    def tls_set(self, *args, **kwargs):
+        pass
+
+    def username_pw_set(self, username=None, password=None):
+        pass
+
+    def connect(self, host=None, port=1883, keepalive=60):
+        self.connected = True
+        if self.on_connect:
+            self.on_connect(self, None, {}, 0)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def disconnect(self):
+        self.connected = False
+        self.broker.unsubscribe(self)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def subscribe(self, topic, qos=0):
+        self.broker.subscribe(self, topic)
+        return mqtt.MQTT_ERR_SUCCESS, 0
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.broker.publish(topic, payload, qos, retain)
+        return mqtt.MQTT_ERR_SUCCESS, 0
+
+    def deliver(self, message):
+        self.inbox.put(message)
+        backlog = self.inbox.qsize()
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+
+    def loop_start(self):
+        if self.running:
+            return
+        self.running = True
+        self.loop_thread = threading.Thread(target=self.loop_forever, daemon=True)
+        self.loop_thread.start()
+
+    def loop_stop(self):
+        self.running = False
+        self.inbox.put(None)
+        if self.loop_thread and self.loop_thread is not threading.current_thread():
+            self.loop_thread.join()
+
+    def loop_forever(self):
+        """
+        Stellt Nachrichten nacheinander über ``on_message`` zu, wie der
+        Netzwerk-Thread von paho.
+        """
+        while self.running:
+            message = self.inbox.get()
+            if message is None:
+                break
+            try:
+                if self.on_message:
+                    self.on_message(self, None, message)
+            except Exception as e:
+                logging.error(f"LocalBrokerClient: Fehler in on_message: {e}")
+            self.delivered += 1
+            self.latencies.append(time.perf_counter() - message.timestamp)
+
+    def backlog(self):
+        """
+        :return: Anzahl der noch nicht zugestellten Nachrichten
+        """
+        return self.inbox.qsize()
@@ -0,0 +1,201 @@
+"""
+Logging über eine Warteschlange.
+
+Die Threads des Dienstes (MQTT-Netzwerkthread, Vorhersage, Requests) legen
+Log-Einträge nur in eine Warteschlange; Formatierung und Ausgabe übernimmt ein
+eigener Thread (``QueueListener``). Meldungen werden wie üblich lazy übergeben
+(``logging.info("Wert: %s", wert)``) und erst dort formatiert. Ist die
+Warteschlange voll, werden Einträge verworfen statt den Aufrufer zu blockieren.
+
+Zusätzlich:
+- ``summarize`` kürzt große Strukturen (z. B. ``data_points``) für Log-Meldungen,
+- ``sample_every`` lässt von häufigen Ereignissen nur jedes n-te durch,
+- die Formatter kürzen jede Meldung auf ``max_length`` Zeichen,
+- ``LOG_FORMAT=json`` schreibt eine JSON-Zeile pro Eintrag, inklusive der
+  über ``extra={...}`` übergebenen Felder.
+
+Eingerichtet wird es mit ``logging_from_environment()`` (Umgebungsvariablen
+``LOG_LEVEL``, ``LOG_FORMAT``, ``LOG_MAX_LENGTH``).
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import reprlib
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Felder eines LogRecord, die im JSON-Format nicht als Zusatzfelder gelten
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_summary = reprlib.Repr()
+_summary.maxlist = 3
+_summary.maxdict = 6
+_summary.maxstring = 80
+_summary.maxother = 80
+_summary.maxlevel = 3
+
+_sample_counters = {}
+
+_listener = None
+
+
+def summarize(value):
+    """
+    Kurzfassung eines (möglicherweise großen) Objekts für Log-Meldungen,
+    z. B. ``[{...}, {...}, {...}, ...] (1713 Einträge)``.
+    """
+    text = _summary.repr(value)
+    if isinstance(value, (list, tuple, dict, set)):
+        text += f" ({len(value)} Einträge)"
+    return text
+
+
+def sample_every(key, n):
+    """
+    Gibt für jeden n-ten Aufruf mit demselben Schlüssel True zurück
+    (beim ersten Aufruf immer).
+
+    :param key: Name des Ereignisses
+    :param n: nur jedes n-te Ereignis wird geloggt
+    """
+    counter = _sample_counters.get(key)
+    if counter is None:
+        counter = _sample_counters.setdefault(key, itertools.count())
+    # next() auf itertools.count ist unter dem GIL atomar
+    return next(counter) % n == 0
+
+
+def _truncate(text, max_length):
+    if max_length and len(text) > max_length:
+        return f"{text[:max_length]}… (+{len(text) - max_length} Zeichen)"
+    return text
+
+
+class TruncatingFormatter(logging.Formatter):
+    def __init__(self, fmt=TEXT_FORMAT, max_length=2000):
+        super().__init__(fmt)
+        self.max_length = max_length
+
+    def formatMessage(self, record):
+        record.message = _truncate(record.message, self.max_length)
+        return super().formatMessage(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Eine JSON-Zeile pro Eintrag mit Zeit, Level, Logger, Thread, Meldung und
+    den Zusatzfeldern aus ``extra``.
+    """
+
+    def __init__(self, max_length=2000):
+        super().__init__()
+        self.max_length = max_length
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": _truncate(record.getMessage(), self.max_length),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, der nicht blockiert und die Formatierung dem Listener
+    überlässt.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Der Eintrag bleibt im selben Prozess; Meldung und Argumente werden
+        # erst im Listener zusammengesetzt. Ausnahmen werden sofort in Text
+        # umgewandelt, da sich der Traceback noch ändern kann.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=logging.INFO, log_format="text", max_length=2000, queue_size=10000, stream=None):
+    """
+    Richtet das Root-Logging über eine Warteschlange ein und ersetzt bisherige
+    Handler (z. B. aus ``logging.basicConfig``).
+
+    :param level: Log-Level des Root-Loggers
+    :param log_format: "text" oder "json"
+    :param max_length: maximale Länge einer Meldung in Zeichen
+    :param queue_size: maximale Anzahl wartender Einträge
+    :param stream: Ausgabestrom (Standard: sys.stderr)
+    :return: der Queue-Handler
+    """
+    global _listener
+    stop_logging()
+
+    if log_format == "json":
+        formatter = JsonFormatter(max_length)
+    else:
+        formatter = TruncatingFormatter(TEXT_FORMAT, max_length)
+    output = logging.StreamHandler(stream)
+    output.setFormatter(formatter)
+
+    log_queue = queue.Queue(queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def logging_from_environment():
+    """
+    Richtet das Logging anhand der Umgebungsvariablen ``LOG_LEVEL``
+    (Standard INFO), ``LOG_FORMAT`` ("text" oder "json") und
+    ``LOG_MAX_LENGTH`` (Zeichen pro Meldung, Standard 2000) ein.
+    """
+    return configure_logging(
+        level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+        log_format=os.environ.get("LOG_FORMAT", "text"),
+        max_length=int(os.environ.get("LOG_MAX_LENGTH", 2000)),
+    )
+
+
+def stop_logging():
+    """
+    Schreibt alle wartenden Einträge und beendet den Listener-Thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,251 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+
+import joblib
+import pandas as pd
+
+# Parquet benötigt pyarrow; ohne pyarrow werden die DataFrames als Pickle gespeichert
+try:
+    import pyarrow  # noqa: F401
+
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+
+def code_hash(function):
+    """
+    Berechnet den SHA-256-Hash des Quelltexts einer Funktion (Codeversion).
+
+    Parameter:
+    function (callable): Die Funktion.
+
+    Rückgabewert:
+    (str): Hexadezimaler Hash.
+    """
+    return hashlib.sha256(inspect.getsource(function).encode()).hexdigest()
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    Berechnet den SHA-256-Hash des Dateiinhalts.
+
+    Parameter:
+    path (str): Pfad zur Datei.
+
+    Rückgabewert:
+    (str): Hexadezimaler Hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Spaltenorientierter Cache für Zwischenergebnisse der Datenaufbereitung.
+
+    Jeder Eintrag ist über den Namen des Schritts, die Hashes der Quelldateien,
+    optionale Parameter, die Codeversion und die Schlüssel vorheriger Schritte
+    adressiert. Ändert sich eine davon, ändert sich der Schlüssel und der
+    Schritt wird neu berechnet. DataFrames werden spaltenorientiert gespeichert,
+    andere Ergebnisse (z. B. trainierte Modelle) mit joblib.
+    """
+
+    def __init__(self, directory="datasets/cache", enabled=True):
+        """
+        Parameter:
+        directory (str): Verzeichnis der Cache-Dateien.
+        enabled (bool): False, um jeden Schritt neu zu berechnen.
+        """
+        self.directory = directory
+        self.enabled = enabled
+        self.hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def source_hash(self, path):
+        """
+        Hash einer Quelldatei, pro Lauf nur einmal berechnet.
+        """
+        key = os.path.abspath(path)
+        if key not in self.hashes:
+            self.hashes[key] = file_hash(path)
+        return self.hashes[key]
+
+    def key(self, stage, sources=(), params=None, code=(), inputs=()):
+        """
+        Schlüssel eines Schritts aus Name, Quelldateien, Parametern,
+        Codeversion der Funktionen und Schlüsseln der Eingabeschritte.
+        """
+        payload = json.dumps(
+            {
+                "stage": stage,
+                "sources": [self.source_hash(path) for path in sources],
+                "params": params or {},
+                "code": [code_hash(function) for function in code],
+                "inputs": list(inputs),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return f"{stage}-{hashlib.sha256(payload.encode()).hexdigest()[:16]}"
+
+    def path(self, key, frame=True):
+        if not frame:
+            return os.path.join(self.directory, f"{key}.joblib")
+        extension = "parquet" if CACHE_FORMAT == "parquet" else "pkl"
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def load(self, key):
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        if not os.path.exists(path):
+            path = self.path(key, frame=False)
+            if not os.path.exists(path):
+                return None
+        try:
+            if path.endswith(".joblib"):
+                return joblib.load(path)
+            if CACHE_FORMAT == "parquet":
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception as e:
+            logging.error(f"Fehler beim Lesen des Cache-Eintrags {path}: {e}")
+            return None
+
+    def save(self, key, value):
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        frame = isinstance(value, pd.DataFrame)
+        path = self.path(key, frame)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            if not frame:
+                joblib.dump(value, tmp_path)
+            elif CACHE_FORMAT == "parquet":
+                value.to_parquet(tmp_path, index=False)
+            else:
+                value.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"Fehler beim Schreiben des Cache-Eintrags {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class Stage:
+    """
+    Benannter Schritt einer StagePipeline.
+    """
+
+    def __init__(self, name, compute, inputs=(), sources=(), code=(), params=None):
+        """
+        Parameter:
+        name (str): Name des Schritts.
+        compute (callable): Funktion, die mit den Ergebnissen der Eingabeschritte
+            (in der Reihenfolge von inputs) aufgerufen wird.
+        inputs (list): Namen der Eingabeschritte.
+        sources (list): Quelldateien, die der Schritt selbst liest.
+        code (list): Funktionen, deren Quelltext die Codeversion bestimmt.
+        params (dict): weitere Parameter, die das Ergebnis beeinflussen.
+        """
+        self.name = name
+        self.compute = compute
+        self.inputs = list(inputs)
+        self.sources = list(sources)
+        self.code = list(code)
+        self.params = params
+
+
+class StagePipeline:
+    """
+    Führt benannte Schritte mit Cache aus. Der Schlüssel eines Schritts hängt
+    nur von den Schlüsseln seiner Eingabeschritte ab, nicht von deren
+    Ergebnissen. Ein Schritt im Cache wird daher geladen, ohne dass seine
+    Eingabeschritte berechnet oder geladen werden.
+    """
+
+    def __init__(self, stages, cache):
+        """
+        Parameter:
+        stages (list): Liste von Stage-Objekten.
+        cache (DatasetCache): Cache der Ergebnisse.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache = cache
+        self.keys = {}
+        self.results = {}
+        self.report = []
+
+    def key(self, name):
+        if name not in self.keys:
+            stage = self.stages[name]
+            self.keys[name] = self.cache.key(
+                name,
+                stage.sources,
+                stage.params,
+                stage.code,
+                [self.key(input_name) for input_name in stage.inputs],
+            )
+        return self.keys[name]
+
+    def run(self, name):
+        """
+        Gibt das Ergebnis eines Schritts zurück, aus dem Cache oder berechnet.
+
+        Parameter:
+        name (str): Name des Schritts.
+
+        Rückgabewert:
+        Das Ergebnis des Schritts.
+        """
+        if name in self.results:
+            return self.results[name]
+
+        stage = self.stages[name]
+        key = self.key(name)
+        started = time.perf_counter()
+        value = self.cache.load(key)
+        if value is not None:
+            self.cache.hits += 1
+            status = "Cache"
+        else:
+            self.cache.misses += 1
+            arguments = [self.run(input_name) for input_name in stage.inputs]
+            started = time.perf_counter()
+            value = stage.compute(*arguments)
+            self.cache.save(key, value)
+            status = "berechnet"
+
+        self.report.append(
+            {
+                "stage": name,
+                "status": status,
+                "seconds": round(time.perf_counter() - started, 3),
+                "key": key,
+            }
+        )
+        self.results[name] = value
+        return value
+
+    def print_report(self):
+        """
+        Gibt Laufzeit und Cache-Status jedes Schritts aus. Schritte, deren
+        Ergebnis nicht benötigt wurde, werden als übersprungen aufgeführt.
+        """
+        executed = {entry["stage"] for entry in self.report}
+        print(f"{'Schritt':<24}{'Status':<14}{'Sekunden':>10}")
+        for entry in self.report:
+            print(f"{entry['stage']:<24}{entry['status']:<14}{entry['seconds']:>10.3f}")
+        for name in self.stages:
+            if name not in executed:
+                print(f"{name:<24}{'übersprungen':<14}{'-':>10}")
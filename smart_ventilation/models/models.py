@@ -7,9 +7,32 @@ from sklearn.pipeline import Pipeline
 from imblearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 import pandas as pd
+import numpy as np
+import argparse
 import joblib
 import os
 
+from models.dataset_cache import DatasetCache, Stage, StagePipeline
+from models.streaming import load_day, prepare_data_streaming, spill_by_day
+from compact_model import export_model
+from time_join import as_datetime64, asof_indexer, asof_join, floor_to_minute
+
+# Quelldateien der Trainingsdaten (relativ zum Verzeichnis smart_ventilation)
+DATASET_PATHS = {
+    "co2_last_30_days_path": "datasets/10c_co2_last_30_days.csv",
+    "co2_older_30_days_path": "datasets/10c_co2_older_30_days.csv",
+    "temp_last_30_days_path": "datasets/10c_temp_last_30_days.csv",
+    "temp_older_30_days_path": "datasets/10c_temp_older_30_days.csv",
+    "outdoor_temp_path": "datasets/outdoor_temperature.txt",
+    "main_dataset_path": "datasets/dataset.xlsx",
+}
+
+# Ein Stundenwert der Außentemperatur gilt für die folgende Stunde
+OUTDOOR_TOLERANCE = pd.Timedelta(minutes=59)
+
+# TVOC-Werte im Hauptdatensatz liegen etwa alle 5 bis 10 Minuten vor
+TVOC_TOLERANCE = pd.Timedelta(minutes=10)
+
 
 def read_data(
     co2_last_30_days_path,
@@ -63,9 +86,7 @@ def prepare_data(
         df_temp_last_30_days,
         df_temp_older_30_days,
     ]:
-        df["time"] = pd.to_datetime(df["time"], format="ISO8601").dt.strftime(
-            "%d/%m/%Y %H:%M"
-        )
+        df["time"] = floor_to_minute(df["time"])
         df.drop(columns=["dev_eui"], inplace=True)
 
     merged_df1 = pd.concat(
@@ -93,12 +114,6 @@ def prepare_outdoor_data(outdoor_temp_path):
     df_outdoor_temp["MESS_DATUM"] = pd.to_datetime(
         df_outdoor_temp["MESS_DATUM"], format="%Y%m%d%H"
     )
-    df_outdoor_temp["MESS_DATUM"] = df_outdoor_temp["MESS_DATUM"].dt.strftime(
-        "%d/%m/%Y %H:%M"
-    )
-    df_outdoor_temp["MESS_DATUM"] = pd.to_datetime(
-        df_outdoor_temp["MESS_DATUM"], format="%d/%m/%Y %H:%M"
-    )
     return df_outdoor_temp
 
 
@@ -127,34 +142,37 @@ def prepare_main_dataset(main_dataset_path):
     return data_set_ml
 
 
-def merge_data(merged_df, df_outdoor_temp, data_set_ml, output_path):
+def merge_data(merged_df, df_outdoor_temp, data_set_ml, output_path=None):
     """
     Führt die vorbereiteten CO2-, Temperatur- und Außentemperaturdaten zusammen und fügt TVOC-Daten hinzu.
+    Außentemperatur und TVOC werden per As-of-Join zugeordnet (jede Zeile bleibt genau einmal erhalten):
+    die Außentemperatur der laufenden Stunde und der zeitlich nächste TVOC-Wert innerhalb von TVOC_TOLERANCE.
+    Mit output_path wird das Ergebnis zusätzlich als Excel-Datei exportiert.
     """
     merged_df.rename(columns={"time": "timestamp"}, inplace=True)
-    merged_df["timestamp"] = pd.to_datetime(
-        merged_df["timestamp"], format="%d/%m/%Y %H:%M"
+    merged_df["timestamp"] = pd.to_datetime(merged_df["timestamp"])
+
+    merged_data = asof_join(
+        merged_df,
+        df_outdoor_temp,
+        "timestamp",
+        "MESS_DATUM",
+        ["TT_TU"],
+        direction="backward",
+        tolerance=OUTDOOR_TOLERANCE,
     )
-
-    start_date = merged_df["timestamp"].min()
-    end_date = merged_df["timestamp"].max()
-    filtered_df = df_outdoor_temp[
-        (df_outdoor_temp["MESS_DATUM"] >= start_date)
-        & (df_outdoor_temp["MESS_DATUM"] <= end_date)
-    ]
-    filtered_df = filtered_df[["MESS_DATUM", "TT_TU"]]
-
-    merged_df["Time_hour"] = merged_df["timestamp"].dt.floor("h")
-    merged_data = pd.merge(
-        merged_df, filtered_df, left_on="Time_hour", right_on="MESS_DATUM", how="left"
-    )
-    merged_data.drop(columns=["Time_hour", "MESS_DATUM"], inplace=True)
     merged_data.rename(columns={"TT_TU": "ambient_temp"}, inplace=True)
 
-    data_set_ml["timestamp"] = pd.to_datetime(data_set_ml["timestamp"])
-    merged_data = pd.merge(
-        merged_data, data_set_ml[["timestamp", "tvoc"]], on="timestamp", how="left"
+    merged_data = asof_join(
+        merged_data,
+        data_set_ml[["timestamp", "tvoc"]].dropna(),
+        "timestamp",
+        "timestamp",
+        ["tvoc"],
+        direction="nearest",
+        tolerance=TVOC_TOLERANCE,
     )
+    # Zeiträume ohne TVOC-Messung innerhalb der Toleranz auffüllen
     if merged_data["tvoc"].isna().any():
         merged_data["tvoc"] = merged_data["tvoc"].ffill().bfill()
 
@@ -168,7 +186,8 @@ def merge_data(merged_df, df_outdoor_temp, data_set_ml, output_path):
         (merged_data["ambient_temp"] < 0) | (merged_data["ambient_temp"] > 31.2),
         "ambient_temp",
     ] = median_temp
-    merged_data.to_excel(output_path, index=False)
+    if output_path:
+        merged_data.to_excel(output_path, index=False)
 
     return merged_data
 
@@ -276,6 +295,49 @@ def logistic_regression_model(final_dataset):
     return pipeline
 
 
+def calculate_duration_open(final_dataset, co2_limit=1000, temp_limit=21):
+    """
+    Berechnet die Öffnungsdauer auf Grundlage von CO2-Werten und Innentemperatur
+    als Spaltenoperation.
+
+    Parameter:
+    final_dataset (DataFrame): Datensatz mit den Spalten co2 und temperature.
+    co2_limit (float): CO2-Grenzwert in ppm.
+    temp_limit (float): Temperaturgrenzwert in °C.
+
+    Rückgabewert:
+    (ndarray): Öffnungsdauer pro Zeile.
+    """
+    co2 = final_dataset["co2"].to_numpy(dtype=float)
+    temperature = final_dataset["temperature"].to_numpy(dtype=float)
+    return np.where(co2 > co2_limit, (co2 - co2_limit) / 45, 0.0) + np.where(
+        temperature > temp_limit, temperature - temp_limit * 1.05, 0.0
+    )
+
+
+def leading_two_digits(values):
+    """
+    Kürzt ganzzahlig abgeschnittene Werte auf ihre ersten beiden Zeichen,
+    wie int(str(int(value))[:2]) (bei negativen Werten zählt das Vorzeichen mit).
+
+    Parameter:
+    values (array-like): Vorhersagen.
+
+    Rückgabewert:
+    (ndarray): Gekürzte ganze Zahlen.
+    """
+    truncated = np.trunc(np.asarray(values, dtype=float)).astype(np.int64)
+    magnitude = np.abs(truncated)
+    # Anzahl der Ziffern (0 hat eine Ziffer)
+    digits = np.maximum(
+        np.searchsorted(10 ** np.arange(19, dtype=np.int64), magnitude, side="right"), 1
+    )
+    # Positive Werte behalten zwei Ziffern, negative nur eine (das Minus belegt ein Zeichen)
+    kept = np.where(truncated < 0, 1, 2)
+    shortened = magnitude // 10 ** np.maximum(digits - kept, 0)
+    return np.where(truncated < 0, -shortened, shortened)
+
+
 def random_forest_model(final_dataset):
     # Sicherstellen, dass die Merkmale in der richtigen Reihenfolge sind
     feature_order = ["co2", "temperature"]
@@ -286,19 +348,10 @@ def random_forest_model(final_dataset):
     final_dataset["day_of_week"] = final_dataset["timestamp"].dt.dayofweek
     final_dataset["month"] = final_dataset["timestamp"].dt.month
 
-    co2_limit = 1000
-    temp_limit = 21
-
     # Dauer auf Grundlage von CO2-Werten und Innentemperatur berechnen
-    def calculate_duration(row):
-        duration = 0
-        if row["co2"] > co2_limit:
-            duration += (row["co2"] - co2_limit) / 45
-        if row["temperature"] > temp_limit:
-            duration += row["temperature"] - temp_limit * 1.05
-        return duration
-
-    final_dataset["duration_open"] = final_dataset.apply(calculate_duration, axis=1)
+    final_dataset["duration_open"] = calculate_duration_open(
+        final_dataset, co2_limit=1000, temp_limit=21
+    )
 
     X = final_dataset[feature_order]
     y = final_dataset["duration_open"].values
@@ -321,14 +374,15 @@ def random_forest_model(final_dataset):
 
     # Vorhersagen machen
     y_pred = model.predict(X_test)
-    y_pred = [int(str(int(pred))[:2]) for pred in y_pred]
+    y_pred = leading_two_digits(y_pred)
 
     return model
 
 
 def save_models(models, directory):
     """
-    Speichert die trainierten Modelle in einem angegebenen Verzeichnis ab.
+    Speichert die trainierten Modelle in einem angegebenen Verzeichnis ab,
+    jeweils als Pickle (.pkl) und im kompakten Format für die Anwendung (.npz).
 
     Parameter:
     models (dict): Ein Wörterbuch mit den trainierten Modellen.
@@ -339,79 +393,209 @@ def save_models(models, directory):
     for name, model in models.items():
         filename = f"{directory}/{name.replace(' ', '_')}.pkl"
         joblib.dump(model, filename)
+        export_model(model, filename[: -len(".pkl")] + ".npz")
         print(f"{name} gepsichert in {filename}")
 
 
-def main(
+def training_pipeline(
     co2_last_30_days_path,
     co2_older_30_days_path,
     temp_last_30_days_path,
     temp_older_30_days_path,
     outdoor_temp_path,
     main_dataset_path,
-    final_dataset_path,
-    models_directory,
+    cache,
+    streaming=False,
+    chunksize=100000,
 ):
     """
-    Hauptfunktion, die alle Schritte der Datenvorbereitung, des Feature Engineerings und der Modellierung durchführt.
-    """
+    Beschreibt die Trainingspipeline als benannte Schritte. Jeder Schritt wird
+    über die Quelldateien, den Quelltext seiner Funktionen und die Schlüssel
+    seiner Eingabeschritte im Cache adressiert. Ändert sich z. B. nur ein
+    Hyperparameter in random_forest_model, wird nur der Schritt
+    random_forest neu berechnet.
 
-    (
-        df_co2_last_30_days,
-        df_co2_older_30_days,
-        df_temp_last_30_days,
-        df_temp_older_30_days,
-    ) = read_data(
+    Mit streaming=True ersetzt prepare_data_streaming die Schritte read_data
+    und prepare_data: Die CSV-Dateien werden in Blöcken von chunksize Zeilen
+    gelesen und tageweise zusammengeführt, mit identischem Ergebnis.
+
+    Rückgabewert:
+    (StagePipeline): Die Pipeline.
+    """
+    csv_paths = [
         co2_last_30_days_path,
         co2_older_30_days_path,
         temp_last_30_days_path,
         temp_older_30_days_path,
-    )
-
-    merged_df = prepare_data(
-        df_co2_last_30_days,
-        df_co2_older_30_days,
-        df_temp_last_30_days,
-        df_temp_older_30_days,
-    )
-
-    df_outdoor_temp = prepare_outdoor_data(outdoor_temp_path)
+    ]
 
-    data_set_ml = prepare_main_dataset(main_dataset_path)
+    if streaming:
+        prepare_stages = [
+            Stage(
+                "prepare_data",
+                lambda: prepare_data_streaming(
+                    [co2_older_30_days_path, co2_last_30_days_path],
+                    [temp_older_30_days_path, temp_last_30_days_path],
+                    chunksize=chunksize,
+                ),
+                sources=csv_paths,
+                code=[prepare_data_streaming, spill_by_day, load_day, floor_to_minute],
+            ),
+        ]
+    else:
+        prepare_stages = [
+            Stage(
+                "read_data",
+                lambda: read_data(*csv_paths),
+                sources=csv_paths,
+                code=[read_data],
+            ),
+            Stage(
+                "prepare_data",
+                lambda frames: prepare_data(*frames),
+                inputs=["read_data"],
+                code=[prepare_data, floor_to_minute],
+            ),
+        ]
 
-    merged_data = merge_data(
-        merged_df, df_outdoor_temp, data_set_ml, final_dataset_path
+    return StagePipeline(
+        prepare_stages
+        + [
+            Stage(
+                "prepare_outdoor_data",
+                lambda: prepare_outdoor_data(outdoor_temp_path),
+                sources=[outdoor_temp_path],
+                code=[prepare_outdoor_data],
+            ),
+            Stage(
+                "prepare_main_dataset",
+                lambda: prepare_main_dataset(main_dataset_path),
+                sources=[main_dataset_path],
+                code=[prepare_main_dataset],
+            ),
+            Stage(
+                "merge_data",
+                merge_data,
+                inputs=["prepare_data", "prepare_outdoor_data", "prepare_main_dataset"],
+                code=[merge_data, asof_join, asof_indexer, as_datetime64],
+                params={
+                    "outdoor_tolerance": OUTDOOR_TOLERANCE,
+                    "tvoc_tolerance": TVOC_TOLERANCE,
+                },
+            ),
+            Stage(
+                "feature_engineering",
+                training_dataset,
+                inputs=["merge_data"],
+                code=[training_dataset, feature_engineering],
+            ),
+            Stage(
+                "logistic_regression",
+                logistic_regression_model,
+                inputs=["feature_engineering"],
+                code=[logistic_regression_model],
+            ),
+            Stage(
+                "random_forest",
+                random_forest_model,
+                inputs=["feature_engineering"],
+                code=[random_forest_model, calculate_duration_open, leading_two_digits],
+            ),
+        ],
+        cache,
     )
 
-    final_dataset = pd.read_excel(final_dataset_path)
+
+def training_dataset(merged_data):
+    """
+    Bereitet den zusammengeführten Datensatz für das Training vor
+    (fehlende Werte, zeitliche Merkmale, Zielvariable open_window).
+    """
+    final_dataset = merged_data.copy()
 
     final_dataset["timestamp"] = pd.to_datetime(final_dataset["timestamp"])
 
     final_dataset = final_dataset.ffill().dropna()
 
-    final_dataset = feature_engineering(final_dataset)
+    return feature_engineering(final_dataset)
+
+
+def main(
+    co2_last_30_days_path,
+    co2_older_30_days_path,
+    temp_last_30_days_path,
+    temp_older_30_days_path,
+    outdoor_temp_path,
+    main_dataset_path,
+    final_dataset_path,
+    models_directory,
+    cache_directory="datasets/cache",
+    use_cache=True,
+    export_excel=False,
+    streaming=False,
+    chunksize=100000,
+):
+    """
+    Hauptfunktion, die alle Schritte der Datenvorbereitung, des Feature Engineerings und der Modellierung durchführt.
+    Der zusammengeführte Datensatz wird nur mit export_excel=True als Excel-Datei (final_dataset_path) exportiert.
+    Mit streaming=True werden die CSV-Dateien blockweise verarbeitet (siehe training_pipeline).
+    """
+    cache = DatasetCache(cache_directory, enabled=use_cache)
 
-    log_model = logistic_regression_model(final_dataset)
+    pipeline = training_pipeline(
+        co2_last_30_days_path,
+        co2_older_30_days_path,
+        temp_last_30_days_path,
+        temp_older_30_days_path,
+        outdoor_temp_path,
+        main_dataset_path,
+        cache,
+        streaming=streaming,
+        chunksize=chunksize,
+    )
 
-    rf_model = random_forest_model(final_dataset)
+    if export_excel:
+        pipeline.run("merge_data").to_excel(final_dataset_path, index=False)
+        print(f"Datensatz exportiert nach {final_dataset_path}")
 
     models = {
-        "Logistic Regression": log_model,
-        "Random Forest": rf_model,
+        "Logistic Regression": pipeline.run("logistic_regression"),
+        "Random Forest": pipeline.run("random_forest"),
     }
 
+    pipeline.print_report()
+    print(f"Pipeline-Cache: {cache.hits} Treffer, {cache.misses} neu berechnet")
+
     save_models(models, models_directory)
 
 
 if __name__ == "__main__":
+    # Aufruf im Verzeichnis smart_ventilation: python -m models.models
+    parser = argparse.ArgumentParser(description="Trainiert die Modelle.")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Alle Zwischenschritte neu berechnen"
+    )
+    parser.add_argument(
+        "--export-excel",
+        action="store_true",
+        help="Zusammengeführten Datensatz als datasets/final_dataset.xlsx exportieren",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="CSV-Dateien blockweise und tageweise verarbeiten (begrenzter Speicher)",
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=100000, help="Zeilen pro Block im Streaming-Modus"
+    )
+    args = parser.parse_args()
 
     main(
-        co2_last_30_days_path="datasets/10c_co2_last_30_days.csv",
-        co2_older_30_days_path="datasets/10c_co2_older_30_days.csv",
-        temp_last_30_days_path="datasets/10c_temp_last_30_days.csv",
-        temp_older_30_days_path="datasets/10c_temp_older_30_days.csv",
-        outdoor_temp_path="datasets/outdoor_temperature.txt",
-        main_dataset_path="datasets/dataset.xlsx",
+        **DATASET_PATHS,
         final_dataset_path="datasets/final_dataset.xlsx",
         models_directory="models",
+        use_cache=not args.no_cache,
+        export_excel=args.export_excel,
+        streaming=args.streaming,
+        chunksize=args.chunksize,
     )
@@ -0,0 +1,96 @@
+import os
+import tempfile
+from collections import defaultdict
+
+import pandas as pd
+
+from time_join import floor_to_minute
+
+# Abstand der Reihenfolge-Schlüssel zwischen zwei Quelldateien derselben Seite
+ORDER_STRIDE = 10**12
+
+
+def spill_by_day(paths, directory, chunksize):
+    """
+    Liest CSV-Dateien in Blöcken und legt die Zeilen nach Tag getrennt ab.
+
+    Wie in prepare_data wird die Zeitspalte auf Minuten gerundet und dev_eui
+    entfernt. Jede Zeile erhält in _order ihre Position in der Verkettung der
+    Dateien, damit die ursprüngliche Reihenfolge wiederhergestellt werden kann.
+
+    Parameter:
+    paths (list): CSV-Dateien in der Reihenfolge von pd.concat in prepare_data.
+    directory (str): Verzeichnis für die Tagesblöcke.
+    chunksize (int): Zeilen pro gelesenem Block.
+
+    Rückgabewert:
+    (dict): Tag (YYYY-MM-DD) -> Liste der Dateien mit den Zeilen dieses Tages.
+    """
+    parts = defaultdict(list)
+    for source_index, path in enumerate(paths):
+        for chunk_index, chunk in enumerate(pd.read_csv(path, chunksize=chunksize)):
+            chunk["time"] = floor_to_minute(chunk["time"])
+            chunk.drop(columns=["dev_eui"], inplace=True)
+            chunk["_order"] = source_index * ORDER_STRIDE + chunk.index
+            for day, part in chunk.groupby(chunk["time"].dt.normalize(), sort=False):
+                day = day.strftime("%Y-%m-%d")
+                part_path = os.path.join(
+                    directory, f"{day}-{source_index}-{chunk_index}.pkl"
+                )
+                part.to_pickle(part_path)
+                parts[day].append(part_path)
+    return parts
+
+
+def load_day(part_paths):
+    day = pd.concat([pd.read_pickle(path) for path in part_paths], ignore_index=True)
+    return day.sort_values("_order", kind="stable")
+
+
+def prepare_data_streaming(
+    co2_paths, temp_paths, chunksize=100000, spill_directory=None
+):
+    """
+    Speichersparende Variante von read_data und prepare_data. Die Quelldateien
+    werden blockweise gelesen, nach Tagen aufgeteilt und tageweise
+    zusammengeführt, sodass nie mehr als ein Block bzw. ein Tag der Quelldaten
+    im Speicher liegt. Das Ergebnis ist identisch mit prepare_data
+    (Zeilen, Spalten und Reihenfolge).
+
+    Parameter:
+    co2_paths (list): CO2-Dateien, zuerst die älteren Daten.
+    temp_paths (list): Temperaturdateien, zuerst die älteren Daten.
+    chunksize (int): Zeilen pro gelesenem Block.
+    spill_directory (str): Verzeichnis für die Tagesblöcke (Standard: temporäres Verzeichnis).
+
+    Rückgabewert:
+    merged_df (DataFrame): Der zusammengeführte DataFrame.
+    """
+    with tempfile.TemporaryDirectory(dir=spill_directory) as directory:
+        co2_directory = os.path.join(directory, "co2")
+        temp_directory = os.path.join(directory, "temp")
+        os.makedirs(co2_directory)
+        os.makedirs(temp_directory)
+        co2_parts = spill_by_day(co2_paths, co2_directory, chunksize)
+        temp_parts = spill_by_day(temp_paths, temp_directory, chunksize)
+
+        # Der Schlüssel enthält das Datum, daher treffen sich nur Zeilen desselben Tages
+        merged_days = []
+        for day in sorted(co2_parts.keys() & temp_parts.keys()):
+            temperature = load_day(temp_parts[day]).drop(columns=["_order"])
+            merged_days.append(
+                pd.merge(
+                    load_day(co2_parts[day]),
+                    temperature,
+                    on="time",
+                    suffixes=("", "_dup"),
+                )
+            )
+
+    if not merged_days:
+        return pd.DataFrame(columns=["time", "co2", "humidity", "temperature"])
+
+    merged_df = pd.concat(merged_days, ignore_index=True)
+    merged_df.sort_values("_order", kind="stable", inplace=True)
+    merged_df.drop(columns=["temperature_dup", "_order"], inplace=True)
+    return merged_df.reset_index(drop=True)
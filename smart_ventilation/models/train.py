@@ -0,0 +1,382 @@
+"""
+Paralleles Training mit Hyperparameter-Suche für die Lüftungsmodelle.
+
+Für jedes Zielmodell werden alle Konfigurationen des Parameterrasters per
+Kreuzvalidierung in einem Prozesspool bewertet. Ergebnisse werden pro
+Konfiguration (Datensatz, Parameter, Kreuzvalidierung) zwischengespeichert,
+sodass bei einem erneuten Lauf nur neue Konfigurationen berechnet werden.
+Die beste Konfiguration pro Ziel wird auf dem Trainingsteil neu trainiert,
+auf dem Testteil bewertet und nach models/ übernommen.
+
+Aufruf im Verzeichnis smart_ventilation:
+    python -m models.train --jobs 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from imblearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    mean_absolute_error,
+    r2_score,
+    roc_auc_score,
+)
+from sklearn.model_selection import (
+    KFold,
+    ParameterGrid,
+    StratifiedKFold,
+    cross_validate,
+    train_test_split,
+)
+from sklearn.preprocessing import StandardScaler
+
+from models.dataset_cache import DatasetCache
+from models.models import (
+    DATASET_PATHS,
+    calculate_duration_open,
+    save_models,
+    training_pipeline,
+)
+
+# Version der Konfigurationslogik; erhöhen, wenn sich build_* ändert
+TRAINING_VERSION = 1
+
+
+def build_logistic_regression(params):
+    """
+    Pipeline wie in logistic_regression_model, mit variablen Hyperparametern.
+    """
+    steps = [
+        ("imputer", SimpleImputer(strategy="mean")),
+        ("scaler", StandardScaler()),
+    ]
+    if params["smote"]:
+        steps.append(("smote", SMOTE(sampling_strategy="auto", random_state=42)))
+    steps.append(
+        (
+            "model",
+            LogisticRegression(
+                C=params["C"],
+                class_weight=params["class_weight"],
+                random_state=42,
+                max_iter=1000,
+            ),
+        )
+    )
+    return Pipeline(steps=steps)
+
+
+def build_random_forest(params):
+    """
+    Pipeline wie in random_forest_model, mit variablen Hyperparametern.
+    """
+    return Pipeline(
+        steps=[
+            ("scaler", StandardScaler()),
+            (
+                "regressor",
+                RandomForestRegressor(
+                    n_estimators=params["n_estimators"],
+                    max_depth=params["max_depth"],
+                    min_samples_leaf=params["min_samples_leaf"],
+                    random_state=20,
+                    n_jobs=1,
+                ),
+            ),
+        ]
+    )
+
+
+def open_window_data(final_dataset):
+    X = final_dataset[
+        [
+            "co2",
+            "temperature",
+            "humidity",
+            "tvoc",
+            "ambient_temp",
+            "hour",
+            "day_of_week",
+            "month",
+        ]
+    ]
+    return X, final_dataset["open_window"]
+
+
+def duration_open_data(final_dataset):
+    final_dataset = final_dataset.dropna()
+    X = final_dataset[["co2", "temperature"]]
+    y = pd.Series(calculate_duration_open(final_dataset), index=final_dataset.index)
+    return X, y
+
+
+# Zielmodelle: Name (= Dateiname in models/), Daten, Raster und Bewertung.
+# Die bisherigen festen Hyperparameter sind jeweils Teil des Rasters.
+TARGETS = {
+    "Logistic Regression": {
+        "task": "classification",
+        "data": open_window_data,
+        "build": build_logistic_regression,
+        "grid": {
+            "C": [0.01, 0.1, 1.0, 10.0],
+            "class_weight": ["balanced", None],
+            "smote": [True, False],
+        },
+        "scoring": "f1",
+        "test_size": 0.3,
+        "random_state": 42,
+    },
+    "Random Forest": {
+        "task": "regression",
+        "data": duration_open_data,
+        "build": build_random_forest,
+        "grid": {
+            "n_estimators": [20, 50, 100],
+            "max_depth": [None, 8, 16],
+            "min_samples_leaf": [1, 5],
+        },
+        "scoring": "neg_mean_absolute_error",
+        "test_size": 0.3,
+        "random_state": 20,
+    },
+}
+
+# Wird in jedem Worker-Prozess einmal gesetzt (siehe _init_worker)
+_splits = {}
+
+
+def _init_worker(splits):
+    _splits.update(splits)
+
+
+def dataset_hash(X, y):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def configuration_key(target_name, params, data_hash, folds):
+    payload = json.dumps(
+        {
+            "target": target_name,
+            "params": params,
+            "data": data_hash,
+            "folds": folds,
+            "version": TRAINING_VERSION,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def cross_validation(target):
+    if target["task"] == "classification":
+        return StratifiedKFold(n_splits=5, shuffle=True, random_state=target["random_state"])
+    return KFold(n_splits=5, shuffle=True, random_state=target["random_state"])
+
+
+def evaluate_configuration(target_name, params):
+    """
+    Kreuzvalidierung einer Konfiguration (läuft in einem Worker-Prozess).
+
+    Rückgabewert:
+    (dict): Parameter, mittlere Bewertung, Standardabweichung und Laufzeit.
+    """
+    target = TARGETS[target_name]
+    X_train, y_train = _splits[target_name]
+    started = time.perf_counter()
+    scores = cross_validate(
+        target["build"](params),
+        X_train,
+        y_train,
+        cv=cross_validation(target),
+        scoring=target["scoring"],
+        n_jobs=1,
+    )["test_score"]
+    return {
+        "params": params,
+        "mean_score": float(np.mean(scores)),
+        "std_score": float(np.std(scores)),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def holdout_metrics(target, model, X_test, y_test):
+    """
+    Kennzahlen der besten Konfiguration auf dem Testteil.
+    """
+    y_pred = model.predict(X_test)
+    if target["task"] == "classification":
+        metrics = {
+            "accuracy": accuracy_score(y_test, y_pred),
+            "f1": f1_score(y_test, y_pred),
+        }
+        if hasattr(model, "predict_proba") and len(np.unique(y_test)) > 1:
+            metrics["roc_auc"] = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    else:
+        metrics = {
+            "mae": mean_absolute_error(y_test, y_pred),
+            "r2": r2_score(y_test, y_pred),
+        }
+    return {name: round(float(value), 4) for name, value in metrics.items()}
+
+
+def train(final_dataset, jobs, cache_directory, models_directory, promote=True):
+    """
+    Bewertet alle Konfigurationen, trainiert die beste pro Ziel neu und
+    übernimmt sie nach models_directory.
+
+    Rückgabewert:
+    (dict): Bericht mit Ergebnissen pro Ziel.
+    """
+    os.makedirs(cache_directory, exist_ok=True)
+    splits = {}
+    tests = {}
+    pending = []
+    results = {name: [] for name in TARGETS}
+    data_hashes = {}
+
+    for name, target in TARGETS.items():
+        X, y = target["data"](final_dataset)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X,
+            y,
+            test_size=target["test_size"],
+            random_state=target["random_state"],
+            stratify=y if target["task"] == "classification" else None,
+        )
+        splits[name] = (X_train, y_train)
+        tests[name] = (X_test, y_test)
+        data_hashes[name] = dataset_hash(X, y)
+
+        for params in ParameterGrid(target["grid"]):
+            key = configuration_key(name, params, data_hashes[name], 5)
+            path = os.path.join(cache_directory, f"{key}.json")
+            if os.path.exists(path):
+                with open(path, "r") as file:
+                    results[name].append(dict(json.load(file), cached=True))
+            else:
+                pending.append((name, params, path))
+
+    started = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(splits,)
+        ) as pool:
+            futures = [
+                (name, path, pool.submit(evaluate_configuration, name, params))
+                for name, params, path in pending
+            ]
+            for name, path, future in futures:
+                result = future.result()
+                with open(path, "w") as file:
+                    json.dump(result, file)
+                results[name].append(dict(result, cached=False))
+    search_seconds = round(time.perf_counter() - started, 2)
+
+    report = {
+        "search_seconds": search_seconds,
+        "evaluated": len(pending),
+        "cached": sum(len(r) for r in results.values()) - len(pending),
+        "targets": {},
+    }
+    promoted = {}
+    for name, target in TARGETS.items():
+        ranked = sorted(results[name], key=lambda r: r["mean_score"], reverse=True)
+        best = ranked[0]
+
+        # Bestes Modell einmal pro Konfiguration trainieren und zwischenspeichern
+        key = configuration_key(name, best["params"], data_hashes[name], 5)
+        model_path = os.path.join(cache_directory, f"{key}.pkl")
+        if os.path.exists(model_path):
+            model = joblib.load(model_path)
+        else:
+            X_train, y_train = splits[name]
+            model = target["build"](best["params"])
+            model.fit(X_train, y_train)
+            joblib.dump(model, model_path)
+
+        X_test, y_test = tests[name]
+        report["targets"][name] = {
+            "scoring": target["scoring"],
+            "best_params": best["params"],
+            "cv_mean_score": round(best["mean_score"], 4),
+            "cv_std_score": round(best["std_score"], 4),
+            "holdout": holdout_metrics(target, model, X_test, y_test),
+            "configurations": [
+                {
+                    "params": r["params"],
+                    "mean_score": round(r["mean_score"], 4),
+                    "std_score": round(r["std_score"], 4),
+                }
+                for r in ranked
+            ],
+        }
+        promoted[name] = model
+
+    if promote:
+        save_models(promoted, models_directory)
+    report["promoted"] = promote
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paralleles Training mit Hyperparameter-Suche.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--cache-directory", default="models/cache")
+    parser.add_argument("--models-directory", default="models")
+    parser.add_argument("--report", default="models/training_report.json")
+    parser.add_argument(
+        "--no-promote",
+        action="store_true",
+        help="Beste Modelle nicht nach models/ übernehmen",
+    )
+    for name, default in DATASET_PATHS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default=default)
+    args = parser.parse_args()
+
+    dataset_cache = DatasetCache(os.path.join("datasets", "cache"))
+    final_dataset = training_pipeline(
+        *(getattr(args, name) for name in DATASET_PATHS), dataset_cache
+    ).run("feature_engineering")
+
+    report = train(
+        final_dataset,
+        args.jobs,
+        args.cache_directory,
+        args.models_directory,
+        promote=not args.no_promote,
+    )
+    with open(args.report, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(
+        f"{report['evaluated']} Konfigurationen bewertet, {report['cached']} aus dem Cache, "
+        f"Suche {report['search_seconds']}s"
+    )
+    for name, result in report["targets"].items():
+        print(
+            f"{name}: beste Parameter {result['best_params']}, "
+            f"CV {result['scoring']}={result['cv_mean_score']} ± {result['cv_std_score']}, "
+            f"Test {result['holdout']}"
+        )
+    print(f"Bericht gespeichert in {args.report}")
+
+
+if __name__ == "__main__":
+    main()
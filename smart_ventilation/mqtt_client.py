@@ -1,18 +1,32 @@
-import time
 import psycopg2
 import pytz
 from db.database_connection import load_config, connect_to_database
 import paho.mqtt.client as mqtt
 import pandas as pd
+import numpy as np
 import threading
+import time
 import uuid
 import copy
 import joblib
 import json
 import logging
+import os
 import datetime as dt
 from datetime import datetime, timedelta
 from api_config_loader import load_api_config
+from virtual_clock import SystemClock
+from compact_model import load_model
+from log_setup import sample_every, summarize
+from service_metrics import (
+    DB_SECONDS,
+    MESSAGES_INGESTED,
+    ON_MESSAGE_SECONDS,
+    PREDICTION_SECONDS,
+    REGISTRY,
+    InstrumentedLock,
+)
+from time_join import as_datetime64, asof_indexer
 
 # Pfad zu YAML-Konfigurationsdatei
 config_file_path = "api_config.yaml"
@@ -27,6 +41,27 @@ CLOUD_SERVICE_URL = api_config["CLOUD_SERVICE_URL"]
 USERNAME = api_config["USERNAME"]
 PASSWORD = api_config["PASSWORD"]
 
+# ChirpStack-Anwendung des Klassenraums
+APPLICATION_ID = "f4994b60-cc34-4cb5-b77c-dc9a5f9de541"
+
+# Maximaler Abstand zwischen Vorhersagezeitpunkt und zugeordnetem Messwert der
+# Sensoren mit eigenem Sendeintervall (TVOC alle 10, Außentemperatur alle 15 Minuten)
+READING_TOLERANCES = {
+    "tvoc": pd.Timedelta(minutes=15),
+    "ambient_temp": pd.Timedelta(minutes=30),
+}
+
+# Vollständige Datenpunkte des Hauptsensors werden nur bei jeder n-ten
+# Nachricht geloggt (bei 1 Nachricht pro Minute etwa zweimal pro Stunde)
+DATA_POINT_LOG_EVERY = 30
+
+# Modelle der periodischen Vorhersage, Pfade ohne Dateiendung. Bevorzugt wird
+# das kompakte Format (.npz, nur numpy), sonst das Pickle (.pkl, sklearn).
+MODEL_PATHS = {
+    "Logistic Regression": "models/Logistic_Regression",
+    "Random Forest": "models/Random_Forest",
+}
+
 
 class MQTTClient:
     """
@@ -34,45 +69,58 @@ class MQTTClient:
     periodisch Vorhersagen trifft und die Daten speichert.
     """
 
-    def __init__(self):
+    def __init__(
+        self, clock=None, client=None, application_id=APPLICATION_ID, conn=None
+    ):
         """
         Initialisiert den MQTT-Client und lädt die Modelle.
         Startet auch Threads zur periodischen Vorhersage und Datenlöschung.
+
+        :param clock: Uhr für Zeitstempel und Wartezeiten (Standard: Systemuhr,
+                      für den Replay-Modus eine VirtualClock)
+        :param client: paho-kompatibler Client, z. B. ``LocalBrokerClient`` für
+                       Lasttests (Standard: paho-Client mit TLS zum Cloud-Broker)
+        :param application_id: ChirpStack-Anwendung der abonnierten Topics,
+                               ``"+"`` für alle Anwendungen (mehrere Klassenräume)
+        :param conn: Datenbankverbindung, z. B. ``connect_local_database()`` für
+                     Lasttests (Standard: PostgreSQL aus ``db_config.yaml``)
         """
+        self.clock = clock or SystemClock()
+        self.application_id = application_id
         try:
-            self.client = mqtt.Client()
-            self.client.tls_set()
-            self.client.username_pw_set(username=USERNAME, password=PASSWORD)
+            if client is None:
+                client = mqtt.Client()
+                client.tls_set()
+                client.username_pw_set(username=USERNAME, password=PASSWORD)
+            self.client = client
             self.client.on_connect = self.on_connect
             self.client.on_message = self.on_message
             self.parameters = {}
             self.latest_predictions = {}
             self.combined_data = {}
             self.data_points = []
+            # Messwerte mit Zeitstempel (UTC) für die zeitliche Zuordnung
+            self.timed_readings = {key: [] for key in READING_TOLERANCES}
             self.thread_alive = True
             self.predictions_cleared = False
 
             self.prediction_event = threading.Event()
             self.prediction_thread = threading.Thread(
-                target=self.run_periodic_predictions
+                target=self.run_periodic_predictions, name="prediction"
             )
             self.prediction_thread.start()
-            self.data_lock = threading.Lock()
+            self.data_lock = InstrumentedLock("data_lock")
+            self.last_prediction_at = None
+            self.register_metrics()
             self.first_time = None
             self.first_topic_data = []
             self.latest_time = None
-            self.last_clear_date = datetime.now().replace(
+            self.last_clear_date = self.clock.now().replace(
                 minute=0, second=0, microsecond=0
             )
-            self.conn = connect_to_database(db)
+            self.conn = conn if conn is not None else connect_to_database(db)
 
-            logistic_regression_model = joblib.load("models/Logistic_Regression.pkl")
-            random_forest_model = joblib.load("models/Random_Forest.pkl")
-
-            self.models = {
-                "Logistic Regression": logistic_regression_model,
-                "Random Forest": random_forest_model,
-            }
+            self.models = self.load_models()
         except Exception as e:
             logging.error(f"Fehler bei der Initialisierung: {e}")
 
@@ -91,7 +139,7 @@ class MQTTClient:
 
             # Für Uhrzeit und TVOC
             self.client.subscribe(
-                "application/f4994b60-cc34-4cb5-b77c-dc9a5f9de541/device/24e124707c481005/event/up"
+                f"application/{self.application_id}/device/24e124707c481005/event/up"
             )
 
             # Für Co2, Temperatur, etc. 
@@ -100,12 +148,12 @@ class MQTTClient:
             #)
 
             self.client.subscribe(
-                "application/f4994b60-cc34-4cb5-b77c-dc9a5f9de541/device/0004a30b01045883/event/up"
+                f"application/{self.application_id}/device/0004a30b01045883/event/up"
             )
 
             # Für Außentemperaturen
             self.client.subscribe(
-                "application/f4994b60-cc34-4cb5-b77c-dc9a5f9de541/device/647fda000000aa92/event/up"
+                f"application/{self.application_id}/device/647fda000000aa92/event/up"
             )
 
             if not self.prediction_thread.is_alive():
@@ -123,8 +171,10 @@ class MQTTClient:
         :param userdata: Benutzerdaten
         :param msg: empfangene Nachricht
         """
+        started = time.perf_counter()
         try:
             topic = msg.topic
+            MESSAGES_INGESTED.inc((topic,))
             payload = json.loads(msg.payload.decode())
 
             def adjust_and_format_time(raw_time):
@@ -140,7 +190,7 @@ class MQTTClient:
             if topic.endswith("0004a30b01045883/event/up"):
                 formatted_time = adjust_and_format_time(payload["time"])
                 self.latest_time = formatted_time
-                logging.info(f"self.latest_time: {self.latest_time}")
+                logging.debug("latest_time: %s", self.latest_time)
                 humidity_values = payload["object"].get("humidity")
                 temperature_values = payload["object"].get("temperature")
                 co2_values = payload["object"].get("co2")
@@ -182,7 +232,8 @@ class MQTTClient:
                 }
 
                 if all(value is not None for value in data_point.values()):
-                    logging.info(f"data_point is {data_point}")
+                    if sample_every("on_message.data_point", DATA_POINT_LOG_EVERY):
+                        logging.info("data_point is %s", data_point)
                     self.store_first_topic_data(data_point)
             else:
                 formatted_time = self.latest_time
@@ -194,6 +245,7 @@ class MQTTClient:
                     self.combined_data.setdefault("tvoc", []).append(
                         round(tvoc_value, 2)
                     )
+                    self.record_reading("tvoc", payload.get("time"), tvoc_value)
 
             elif topic.endswith("647fda000000aa92/event/up"):
                 ambient_temp_value = payload["object"].get("ambient_temp")
@@ -202,6 +254,9 @@ class MQTTClient:
                     self.combined_data.setdefault("ambient_temp", []).append(
                         round(ambient_temp_value, 2)
                     )
+                    self.record_reading(
+                        "ambient_temp", payload.get("time"), ambient_temp_value
+                    )
 
             if (
                 formatted_time is not None
@@ -219,6 +274,41 @@ class MQTTClient:
 
         except Exception as e:
             logging.error(f"on_message: Fehler beim Empfangen der Nachricht: {e}")
+        finally:
+            ON_MESSAGE_SECONDS.observe(time.perf_counter() - started, (msg.topic,))
+
+    def record_reading(self, key, raw_time, value):
+        """
+        Speichert einen Messwert mit seinem Zeitstempel aus der Nachricht.
+
+        :param key: "tvoc" oder "ambient_temp"
+        :param raw_time: Zeitstempel der Nachricht (ISO 8601)
+        :param value: Messwert
+        """
+        if raw_time is not None:
+            with self.data_lock:
+                self.timed_readings[key].append((raw_time, round(value, 2)))
+
+    def reading_at(self, key, time):
+        """
+        Gibt den zeitlich nächsten Messwert innerhalb von READING_TOLERANCES zurück.
+
+        :param key: "tvoc" oder "ambient_temp"
+        :param time: Zeitpunkt (mit Zeitzone)
+        :return: Messwert oder None, wenn keiner in der Nähe liegt
+        """
+        with self.data_lock:
+            readings = list(self.timed_readings[key])
+        if not readings:
+            return None
+        times = as_datetime64([raw_time for raw_time, _ in readings])
+        order = np.argsort(times, kind="stable")
+        index = asof_indexer(
+            [time], times[order], direction="nearest", tolerance=READING_TOLERANCES[key]
+        )[0]
+        if index < 0:
+            return None
+        return readings[order[index]][1]
 
     def collect_data(self, combined_data):
         with self.data_lock:
@@ -252,17 +342,18 @@ class MQTTClient:
                         if key not in data:
                             data[key] = None
                     self.data_points.append(data)
-                    logging.debug(f"Gesammelter Datenpunkt: {data}")
 
             except Exception as e:
                 logging.error(
                     f"collect_data: Unerwarteter Fehler bei der Datensammlung: {e}"
                 )
                 logging.error(
-                    f"collect_data: Inhalt der kombinierten Daten: {combined_data}"
+                    "collect_data: Inhalt der kombinierten Daten: %s",
+                    summarize(combined_data),
                 )
                 logging.error(
-                    f"collect_data: Inhalt der Datenpunkte: {self.data_points}"
+                    "collect_data: Inhalt der Datenpunkte: %s",
+                    summarize(self.data_points),
                 )
 
     def run_periodic_predictions(self):
@@ -271,7 +362,7 @@ class MQTTClient:
         """
         while self.thread_alive:
             # 10 Minuten warten
-            self.prediction_event.wait(600)
+            self.clock.wait(self.prediction_event, 600)
             if not self.thread_alive:
                 break
             self.prediction_event.clear()
@@ -283,6 +374,7 @@ class MQTTClient:
                 continue
 
             if self.data_points:
+                started = time.perf_counter()
                 try:
                     # Deep Kopie der Datenpunkte erstellen
                     data_points_copy = copy.deepcopy(self.data_points)
@@ -299,6 +391,16 @@ class MQTTClient:
                     avg_data["avg_time"] = avg_time.timestamp()
                     logging.info("Vorbereitung der Durchschnittsdaten erfolgreich.")
 
+                    # TVOC und Außentemperatur zeitlich statt nach Position zuordnen
+                    # (die Zeitstempel in data_points sind Berliner Ortszeit)
+                    local_time = avg_time.tz_localize(
+                        "Europe/Berlin", ambiguous=True, nonexistent="shift_forward"
+                    )
+                    for key in READING_TOLERANCES:
+                        value = self.reading_at(key, local_time)
+                        if value is not None:
+                            avg_data[key] = value
+
                     avg_data["hour"] = avg_time.hour
                     avg_data["day_of_week"] = avg_time.dayofweek
                     avg_data["month"] = avg_time.month
@@ -347,10 +449,13 @@ class MQTTClient:
                         else:
                             predictions[name] = model.predict(features_array)[0]
 
+                    PREDICTION_SECONDS.observe(time.perf_counter() - started)
+                    self.last_prediction_at = self.clock.now()
+
                     self.combined_data["predictions"] = predictions
                     self.latest_predictions = predictions
                     self.latest_predictions["prediction_time"] = (
-                        datetime.now().strftime("%H:%M")
+                        self.clock.now().strftime("%H:%M")
                     )
                     logging.info(f"latest predictions are: {self.latest_predictions}")
                     self.predictions_cleared = False
@@ -374,13 +479,16 @@ class MQTTClient:
 
     def check_and_clear_data(self):
         try:
-            current_time = datetime.now()
-            logging.info(f"aktuelle Zeit: {current_time}")
-            logging.info(f"self.last_clear_data: {self.last_clear_date}")
+            current_time = self.clock.now()
+            logging.debug(
+                "aktuelle Zeit: %s, last_clear_date: %s",
+                current_time,
+                self.last_clear_date,
+            )
 
             if current_time >= self.last_clear_date + timedelta(hours=1):
                 next_clear_date = self.last_clear_date + timedelta(hours=1)
-                logging.info(f"next_clear_date {next_clear_date}")
+                logging.info("next_clear_date %s", next_clear_date)
 
                 self.clear_data(next_clear_date)
                 self.last_clear_date = next_clear_date
@@ -397,6 +505,8 @@ class MQTTClient:
             with self.data_lock:
                 self.data_points.clear()
                 self.combined_data.clear()
+                for readings in self.timed_readings.values():
+                    readings.clear()
                 self.latest_predictions.clear()
                 logging.info(f"Daten um {clear_time.strftime('%H:%M Uhr')} gelöscht")
         except Exception as e:
@@ -409,7 +519,7 @@ class MQTTClient:
         try:
             self.thread_alive = True
             self.prediction_thread = threading.Thread(
-                target=self.run_periodic_predictions
+                target=self.run_periodic_predictions, name="prediction"
             )
             self.prediction_thread.start()
 
@@ -491,6 +601,33 @@ class MQTTClient:
             logging.error(f"Fehler beim Abrufen der Staggered-Sensordaten: {e}")
             return None
 
+    def get_recent_readings(self, count):
+        """
+        Gibt die letzten Messwerte für Temperatur, CO2 und Feuchtigkeit zurück,
+        neuester Zeitpunkt zuerst. Das Lock wird dabei nur einmal genommen.
+
+        :param count: Maximale Anzahl an Zeitpunkten
+        :return: Liste von Dictionaries (kann kürzer als count oder leer sein)
+        """
+        try:
+            with self.data_lock:
+                temperatures = self.combined_data.get("temperature", [])
+                co2_values = self.combined_data.get("co2", [])
+                humidities = self.combined_data.get("humidity", [])
+                available = min(len(temperatures), len(co2_values))
+
+                return [
+                    {
+                        "temperature": temperatures[-i],
+                        "co2": co2_values[-i],
+                        "humidity": humidities[-i] if len(humidities) >= i else None,
+                    }
+                    for i in range(1, min(count, available) + 1)
+                ]
+        except Exception as e:
+            logging.error(f"Fehler beim Abrufen der letzten Messwerte: {e}")
+            return []
+
     def store_first_topic_data(self, data_point):
         """
         Speichert die Sensordaten aus dem ersten Thema in der PostgreSQL-Datenbank
@@ -509,6 +646,7 @@ class MQTTClient:
                         humidity, classroom_number)
                         VALUES (%s, %s, %s, %s, %s)
                     """
+                    started = time.perf_counter()
                     cursor.execute(
                         query,
                         (
@@ -519,7 +657,13 @@ class MQTTClient:
                             "10c",
                         ),
                     )
-                self.conn.commit()
+                    self.conn.commit()
+                    DB_SECONDS.observe(
+                        time.perf_counter() - started,
+                        ("insert", "classroom_environmental_data"),
+                    )
+                else:
+                    self.conn.commit()
 
                 # Datenpunkt löschen, um Speicherplatz freizugeben
                 data_point = None
@@ -562,6 +706,7 @@ class MQTTClient:
                         (temperature, humidity, co2, timestamp, outdoor_temperature, accurate_prediction)
                         VALUES (%s, %s, %s, %s, %s, %s)
                     """
+                    started = time.perf_counter()
                     cursor.execute(
                         query,
                         (
@@ -574,6 +719,9 @@ class MQTTClient:
                         ),
                     )
                     self.conn.commit()
+                    DB_SECONDS.observe(
+                        time.perf_counter() - started, ("insert", "feedback_tabelle")
+                    )
                 else:
                     logging.error(
                         "Nicht alle erforderlichen Daten sind vorhanden im feedback_data"
@@ -618,9 +766,14 @@ class MQTTClient:
                 """
 
                 logging.info(f"Abfrage mit Zeitstempel ausführen:{timestamp}")
+                started = time.perf_counter()
                 cursor.execute(query, (timestamp,))
 
                 result = cursor.fetchone()
+                DB_SECONDS.observe(
+                    time.perf_counter() - started,
+                    ("select", "classroom_environmental_data"),
+                )
                 logging.info(f"Abfrage erfolgreich, Daten abgerufen:{result}")
 
                 # Aufbereitung des Ergebnisses in einem Format, das der erwarteten Ausgabe entspricht
@@ -718,85 +871,93 @@ class MQTTClient:
         """
         Hilfsfunktion zum Abrufen von Daten auf der Grundlage eines Zeitstempels,
         unter Berücksichtigung der nächsten 10 Minuten.
-        Ruft Daten aus der PostgreSQL-Datenbank ab und berechnet den Durchschnitt der Werte
+        Ruft Daten aus der PostgreSQL-Datenbank ab und berechnet den Durchschnitt der Werte.
+        Das Lock wird nur während der einzelnen Abfragen gehalten, nicht während
+        der Wartezeit, damit die Datensammlung nicht blockiert wird.
         """
-        with self.data_lock:
-            cursor = self.conn.cursor()
-            try:
-                logging.info(f"Abruf zukünftiger Daten ab dem Zeitstempel: {timestamp}")
-
-                query = """
-                    SELECT 
-                        AVG(co2_values) as co2_values,
-                        AVG(temperature) as temperature,
-                        AVG(humidity) as humidity
-                    FROM classroom_environmental_data
-                    WHERE timestamp > CAST(%s AS timestamp);
-                """
-
-                max_attempts = 30  # Maximum number of polling attempts (30 attempts every 10 seconds equals 5 minutes)
-                wait_time = 10  # Wait time between attempts in seconds
-                result = None
-
-                for attempt in range(max_attempts):
-                    logging.info(
-                        f"Abfrageversuch {attempt + 1} mit Zeitstempel: {timestamp}"
-                    )
-                    cursor.execute(query, (timestamp,))
-                    result = cursor.fetchone()
-                    logging.info(f"Abfrageergebnis: {result}")
-
-                    if result and any(val is not None for val in result):
-                        break
-
-                    logging.info(f"Keine Daten verfügbar, warte {wait_time} Sekunden.")
-                    time.sleep(wait_time)
+        try:
+            logging.info(f"Abruf zukünftiger Daten ab dem Zeitstempel: {timestamp}")
 
-                if result:
-                    averaged_data = {
-                        "timestamp": timestamp,
-                        "co2_values": (
-                            float(result[0]) if result[0] is not None else None
-                        ),
-                        "temperature": (
-                            float(result[1]) if result[1] is not None else None
-                        ),
-                        "humidity": float(result[2]) if result[2] is not None else None,
-                    }
-                else:
-                    averaged_data = {
-                        "timestamp": timestamp,
-                        "co2_values": None,
-                        "temperature": None,
-                        "humidity": None,
-                    }
+            query = """
+                SELECT 
+                    AVG(co2_values) as co2_values,
+                    AVG(temperature) as temperature,
+                    AVG(humidity) as humidity
+                FROM classroom_environmental_data
+                WHERE timestamp > CAST(%s AS timestamp);
+            """
 
-                return averaged_data
+            max_attempts = 30  # Maximum number of polling attempts (30 attempts every 10 seconds equals 5 minutes)
+            wait_time = 10  # Wait time between attempts in seconds
+            result = None
 
-            except psycopg2.OperationalError as e:
-                logging.error(
-                    f"fetch_future_data: Datenbankverbindungsfehler beim Abrufen von Zukunftsdaten: {e}"
+            for attempt in range(max_attempts):
+                logging.info(
+                    f"Abfrageversuch {attempt + 1} mit Zeitstempel: {timestamp}"
                 )
-                self.reconnect_db()
-                return {
+                with self.data_lock:
+                    cursor = self.conn.cursor()
+                    try:
+                        started = time.perf_counter()
+                        cursor.execute(query, (timestamp,))
+                        result = cursor.fetchone()
+                        DB_SECONDS.observe(
+                            time.perf_counter() - started,
+                            ("select", "classroom_environmental_data"),
+                        )
+                    finally:
+                        cursor.close()
+                logging.info(f"Abfrageergebnis: {result}")
+
+                if result and any(val is not None for val in result):
+                    break
+
+                logging.info(f"Keine Daten verfügbar, warte {wait_time} Sekunden.")
+                self.clock.sleep(wait_time)
+
+            if result:
+                averaged_data = {
                     "timestamp": timestamp,
-                    "co2_values": None,
-                    "temperature": None,
-                    "humidity": None,
+                    "co2_values": (
+                        float(result[0]) if result[0] is not None else None
+                    ),
+                    "temperature": (
+                        float(result[1]) if result[1] is not None else None
+                    ),
+                    "humidity": float(result[2]) if result[2] is not None else None,
                 }
-
-            except Exception as e:
-                logging.error(
-                    f"fetch_future_data: Fehler beim Abrufen von Zukunftsdaten aus der Datenbank: {e}"
-                )
-                return {
+            else:
+                averaged_data = {
                     "timestamp": timestamp,
                     "co2_values": None,
                     "temperature": None,
                     "humidity": None,
                 }
-            finally:
-                cursor.close()
+
+            return averaged_data
+
+        except psycopg2.OperationalError as e:
+            logging.error(
+                f"fetch_future_data: Datenbankverbindungsfehler beim Abrufen von Zukunftsdaten: {e}"
+            )
+            self.reconnect_db()
+            return {
+                "timestamp": timestamp,
+                "co2_values": None,
+                "temperature": None,
+                "humidity": None,
+            }
+
+        except Exception as e:
+            logging.error(
+                f"fetch_future_data: Fehler beim Abrufen von Zukunftsdaten aus der Datenbank: {e}"
+            )
+            return {
+                "timestamp": timestamp,
+                "co2_values": None,
+                "temperature": None,
+                "humidity": None,
+            }
 
     def save_analysis_data(
         self,
@@ -829,7 +990,7 @@ class MQTTClient:
 
             logging.info(f"Statistische Auswertungen werden gespeichert!")
 
-            timestamp = datetime.now()
+            timestamp = self.clock.now()
 
             values = (
                 timestamp,
@@ -845,9 +1006,13 @@ class MQTTClient:
                 decision,
             )
 
+            started = time.perf_counter()
             cursor.execute(query, values)
 
             self.conn.commit()
+            DB_SECONDS.observe(
+                time.perf_counter() - started, ("insert", "environmental_data_analysis")
+            )
 
             cursor.close()
 
@@ -872,6 +1037,7 @@ class MQTTClient:
         """
         try:
             self.thread_alive = False
+            self.prediction_event.set()
             self.client.loop_stop()
             self.client.disconnect()
         except Exception as e:
@@ -891,6 +1057,68 @@ class MQTTClient:
                 f"reconnect_db: Fehler beim Neuherstellen der Datenbankverbindung: {e}"
             )
 
+    def register_metrics(self, registry=REGISTRY):
+        """
+        Registriert die Gauges dieses Clients (Puffergrößen und Alter der
+        letzten Vorhersage). Sie werden erst beim Abruf von /metrics berechnet.
+        """
+        registry.gauge(
+            "smart_ventilation_combined_data_length",
+            "Anzahl der Einträge pro Liste in combined_data",
+            lambda: {
+                (key,): len(values)
+                for key, values in list(self.combined_data.items())
+                if isinstance(values, list)
+            },
+            ["key"],
+        )
+        registry.gauge(
+            "smart_ventilation_data_points",
+            "Anzahl der gesammelten Datenpunkte in data_points",
+            lambda: len(self.data_points),
+        )
+        registry.gauge(
+            "smart_ventilation_prediction_age_seconds",
+            "Sekunden seit der letzten erfolgreichen Vorhersage (NaN, wenn noch keine)",
+            lambda: (
+                (self.clock.now() - self.last_prediction_at).total_seconds()
+                if self.last_prediction_at is not None
+                else None
+            ),
+        )
+
+    def load_models(self, model_paths=MODEL_PATHS):
+        """
+        Lädt die Modelle der periodischen Vorhersage. Liegt ein Modell im
+        kompakten Format vor, werden weder sklearn noch imblearn importiert.
+
+        :param model_paths: Name -> Pfad ohne Dateiendung
+        :return: Dictionary Name -> Modell
+        """
+        models = {}
+        for name, path in model_paths.items():
+            try:
+                if os.path.exists(f"{path}.npz"):
+                    models[name] = load_model(f"{path}.npz")
+                else:
+                    models[name] = joblib.load(f"{path}.pkl")
+                logging.info(f"Modell '{name}' geladen")
+            except Exception as e:
+                logging.error(f"Fehler beim Laden des Modells '{name}': {e}")
+        return models
+
+    def set_model(self, name, model):
+        """
+        Fügt ein Modell für die periodische Vorhersage hinzu oder ersetzt es.
+        Das Dictionary wird als Ganzes ersetzt, damit eine laufende Vorhersage
+        nicht während der Iteration verändert wird.
+
+        :param name: Name des Modells in den Vorhersagen
+        :param model: Modell mit ``predict``
+        """
+        self.models = {**self.models, name: model}
+        logging.info(f"Modell '{name}' für die Vorhersage übernommen")
+
     def clear_predictions(self):
         try:
             logging.info("Die alten Vorhersagen werden gelöscht!")
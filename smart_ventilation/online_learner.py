@@ -0,0 +1,397 @@
+import copy
+import fcntl
+import logging
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import psycopg2
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from db.local_database import LocalConnection
+
+# Merkmalsreihenfolge der Vorhersage in MQTTClient.run_periodic_predictions
+MODEL_FEATURES = [
+    "co2",
+    "temperature",
+    "humidity",
+    "tvoc",
+    "ambient_temp",
+    "hour",
+    "day_of_week",
+    "month",
+]
+
+# feedback_tabelle enthält keinen TVOC-Wert, das Online-Modell verwendet ihn nicht
+FEEDBACK_COLUMNS = [
+    MODEL_FEATURES.index(feature) for feature in MODEL_FEATURES if feature != "tvoc"
+]
+
+CLASSES = np.array([0, 1])
+
+# Die Leseposition ist die fortlaufende id der Zeile (nicht der Zeitstempel:
+# Feedback zur selben Messminute kann jederzeit nachträglich eintreffen)
+FEEDBACK_QUERY = """
+    SELECT id, temperature, humidity, co2, timestamp, outdoor_temperature, accurate_prediction
+    FROM feedback_tabelle
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+# Bestehende PostgreSQL-Tabellen erhalten die id-Spalte (mit Index) beim
+# ersten Start; vorhandene Zeilen werden dabei durchnummeriert
+FEEDBACK_ID_EXISTS_QUERY = """
+    SELECT 1 FROM information_schema.columns
+    WHERE table_name = 'feedback_tabelle' AND column_name = 'id'
+"""
+FEEDBACK_ID_MIGRATION = [
+    "ALTER TABLE feedback_tabelle ADD COLUMN id BIGSERIAL",
+    "CREATE INDEX IF NOT EXISTS feedback_tabelle_id ON feedback_tabelle (id)",
+]
+
+LAST_ID_QUERY = "SELECT COALESCE(MAX(id), 0) FROM feedback_tabelle"
+
+
+def feedback_matrix(rows):
+    """
+    Wandelt Zeilen aus feedback_tabelle in Merkmale und Zielwerte um.
+
+    :param rows: Liste von Tupeln (id, temperature, humidity, co2, timestamp,
+                 outdoor_temperature, accurate_prediction)
+    :return: Tuple (Merkmale in der Reihenfolge MODEL_FEATURES, Zielwerte)
+    """
+    _, temperature, humidity, co2, timestamps, ambient_temp, open_window = zip(*rows)
+    timestamps = pd.DatetimeIndex(pd.to_datetime(list(timestamps)))
+    X = np.column_stack(
+        [
+            co2,
+            temperature,
+            humidity,
+            np.full(len(rows), np.nan),
+            ambient_temp,
+            timestamps.hour,
+            timestamps.dayofweek,
+            timestamps.month,
+        ]
+    ).astype(float)
+    y = np.asarray(open_window, dtype=int)
+    return X, y
+
+
+class OnlineFeedbackModel:
+    """
+    Logistische Regression, die mit partial_fit stapelweise aus Feedback lernt.
+
+    Erwartet dieselben Merkmale wie die Modelle in MQTTClient.models und kann
+    daher direkt in die periodische Vorhersage übernommen werden.
+    """
+
+    def __init__(self, alpha=0.0001, random_state=42):
+        self.scaler = StandardScaler()
+        self.classifier = SGDClassifier(
+            loss="log_loss", alpha=alpha, random_state=random_state
+        )
+        self.samples = 0
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=float)[:, FEEDBACK_COLUMNS]
+        self.scaler.partial_fit(X)
+        self.classifier.partial_fit(self.scaler.transform(X), y, classes=CLASSES)
+        self.samples += len(y)
+        return self
+
+    def _transform(self, X):
+        return self.scaler.transform(np.asarray(X, dtype=float)[:, FEEDBACK_COLUMNS])
+
+    def predict(self, X):
+        return self.classifier.predict(self._transform(X))
+
+    def predict_proba(self, X):
+        return self.classifier.predict_proba(self._transform(X))
+
+
+class OnlineFeedbackLearner:
+    """
+    Hintergrund-Thread, der neue Zeilen aus feedback_tabelle in kleinen Stapeln
+    liest und ein OnlineFeedbackModel damit weitertrainiert.
+
+    Die Position in der Tabelle (id der zuletzt gelernten Zeile) wird zusammen
+    mit dem Modell gespeichert, sodass nach einem Neustart nur neue Zeilen
+    gelernt werden. Das Modell wird periodisch als .pkl veröffentlicht.
+
+    Mit mehreren gunicorn-Workern lernt nur der Prozess, der die Sperrdatei
+    ``<state_path>.lock`` hält. Die anderen laden das veröffentlichte Modell,
+    sobald sich model_path ändert, und übernehmen die Sperre, wenn der
+    lernende Prozess endet.
+    """
+
+    def __init__(
+        self,
+        connect,
+        model_path="models/Online_Logistic_Regression.pkl",
+        state_path="models/online_learner_state.pkl",
+        batch_size=64,
+        interval=60,
+        publish_interval=600,
+        on_publish=None,
+    ):
+        """
+        :param connect: Funktion ohne Parameter, die eine Datenbankverbindung liefert
+        :param model_path: Pfad, unter dem das Modell veröffentlicht wird
+        :param state_path: Pfad für Modell und Leseposition
+        :param batch_size: Anzahl der Feedback-Zeilen pro partial_fit
+        :param interval: Abstand zwischen den Abfragen in Sekunden
+        :param publish_interval: Mindestabstand zwischen zwei Veröffentlichungen in Sekunden
+        :param on_publish: optionale Funktion, die mit dem veröffentlichten Modell
+                           aufgerufen wird (z. B. MQTTClient.set_model)
+        """
+        self.connect = connect
+        self.model_path = model_path
+        self.state_path = state_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.publish_interval = publish_interval
+        self.on_publish = on_publish
+
+        self.model = OnlineFeedbackModel()
+        # None: Position unbekannt (Zustand aus dem alten Format), siehe fetch_batch
+        self.last_id = 0
+        self.unpublished = 0
+        self.last_publish = 0.0
+        self.lock_file = None
+        self.published_mtime = None
+        self.conn = None
+        self.running = False
+        self.wake_event = threading.Event()
+        self.thread = None
+        self.load_state()
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            state = joblib.load(self.state_path)
+            self.model = state["model"]
+            if "last_id" in state:
+                self.last_id = state["last_id"]
+            else:
+                # Alte Position (Zeitstempel und Anzahl) lässt sich keiner id
+                # zuordnen: ab dem aktuellen Tabellenende weiterlernen
+                self.last_id = None
+                logging.warning(
+                    "OnlineFeedbackLearner: Leseposition im alten Format, es wird ab den nächsten neuen Zeilen gelernt"
+                )
+            logging.info(
+                f"OnlineFeedbackLearner: Zustand geladen ({self.model.samples} Feedback-Zeilen gelernt)"
+            )
+        except Exception as e:
+            logging.error(f"OnlineFeedbackLearner: Fehler beim Laden des Zustands: {e}")
+
+    def _dump(self, obj, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+
+    def save_state(self):
+        self._dump(
+            {
+                "model": self.model,
+                "last_id": self.last_id,
+            },
+            self.state_path,
+        )
+
+    def open_connection(self):
+        self.conn = self.connect()
+        if not isinstance(self.conn, LocalConnection):
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(FEEDBACK_ID_EXISTS_QUERY)
+                if cursor.fetchone() is None:
+                    for statement in FEEDBACK_ID_MIGRATION:
+                        cursor.execute(statement)
+                    logging.info("OnlineFeedbackLearner: Spalte id in feedback_tabelle angelegt")
+                self.conn.commit()
+            finally:
+                cursor.close()
+
+    def fetch_batch(self):
+        """
+        Liest die nächsten batch_size Zeilen hinter der gespeicherten Position.
+        """
+        if self.conn is None:
+            self.open_connection()
+        cursor = self.conn.cursor()
+        try:
+            if self.last_id is None:
+                cursor.execute(LAST_ID_QUERY)
+                self.last_id = cursor.fetchone()[0]
+            cursor.execute(FEEDBACK_QUERY, (self.last_id, self.batch_size))
+            rows = cursor.fetchall()
+            # Lesetransaktion beenden
+            self.conn.commit()
+            return rows
+        finally:
+            cursor.close()
+
+    def learn_once(self):
+        """
+        Lernt einen Stapel neuer Feedback-Zeilen.
+
+        :return: Anzahl der gelernten Zeilen
+        """
+        rows = self.fetch_batch()
+        if not rows:
+            return 0
+
+        X, y = feedback_matrix(rows)
+        self.model.partial_fit(X, y)
+        self.last_id = rows[-1][0]
+        self.unpublished += len(rows)
+        return len(rows)
+
+    def learn_pending(self):
+        """
+        Lernt alle neuen Feedback-Zeilen stapelweise und speichert danach
+        Modell und Leseposition.
+
+        :return: Anzahl der gelernten Zeilen
+        """
+        learned = 0
+        while True:
+            count = self.learn_once()
+            learned += count
+            if count < self.batch_size:
+                break
+        if learned:
+            self.save_state()
+        return learned
+
+    def publish(self):
+        """
+        Veröffentlicht eine Kopie des aktuellen Modells unter model_path. Die
+        Vorhersage erhält die Kopie, da self.model weiter trainiert wird.
+        """
+        snapshot = copy.deepcopy(self.model)
+        self._dump(snapshot, self.model_path)
+        self.unpublished = 0
+        self.last_publish = time.monotonic()
+        if self.on_publish:
+            self.on_publish(snapshot)
+        logging.info(
+            f"OnlineFeedbackLearner: Modell veröffentlicht ({self.model.samples} Feedback-Zeilen)"
+        )
+
+    def acquire_lock(self):
+        """
+        Versucht, die Sperrdatei neben state_path zu sperren (ohne zu warten).
+        Die Sperre gilt bis zum Ende des Prozesses bzw. bis stop().
+
+        :return: True, wenn dieser Prozess lernen darf
+        """
+        if self.lock_file is not None:
+            return True
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(f"{self.state_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        # Zustand des bisher lernenden Prozesses übernehmen
+        self.load_state()
+        logging.info(f"OnlineFeedbackLearner: lernt in Prozess {os.getpid()}")
+        return True
+
+    def release_lock(self):
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+    def reload_published(self):
+        """
+        Übernimmt das von einem anderen Prozess veröffentlichte Modell, wenn
+        sich model_path seit dem letzten Aufruf geändert hat.
+        """
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            return
+        if mtime == self.published_mtime:
+            return
+        self.published_mtime = mtime
+        model = joblib.load(self.model_path)
+        if self.on_publish:
+            self.on_publish(model)
+
+    def run(self):
+        """
+        Liest neue Feedback-Zeilen periodisch und veröffentlicht das Modell,
+        sobald neue Zeilen gelernt wurden und publish_interval abgelaufen ist.
+        Ohne Sperre wird nur das veröffentlichte Modell nachgeladen.
+        """
+        while self.running:
+            try:
+                if not self.acquire_lock():
+                    self.reload_published()
+                    self.wake_event.wait(self.interval)
+                    self.wake_event.clear()
+                    continue
+                self.learn_pending()
+                if (
+                    self.unpublished
+                    and time.monotonic() - self.last_publish >= self.publish_interval
+                ):
+                    self.publish()
+            except psycopg2.OperationalError as e:
+                logging.error(f"OnlineFeedbackLearner: Datenbankverbindungsfehler: {e}")
+                self.reconnect_db()
+            except Exception as e:
+                logging.error(f"OnlineFeedbackLearner: Fehler beim Lernen aus Feedback: {e}")
+                if self.conn is not None:
+                    self.conn.rollback()
+            self.wake_event.wait(self.interval)
+            self.wake_event.clear()
+
+    def reconnect_db(self):
+        try:
+            if self.conn is not None:
+                self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+
+    def start(self):
+        if self.running:
+            return
+        # Bereits gelerntes Modell sofort bereitstellen
+        if self.model.samples and self.on_publish:
+            self.on_publish(copy.deepcopy(self.model))
+        self.running = True
+        self.thread = threading.Thread(
+            target=self.run, name="online-learner", daemon=True
+        )
+        self.thread.start()
+        logging.info("OnlineFeedbackLearner gestartet")
+
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+        if self.thread:
+            self.thread.join()
+        if self.unpublished:
+            self.publish()
+        self.release_lock()
+        self.reconnect_db()
+        logging.info("OnlineFeedbackLearner gestoppt")
@@ -0,0 +1,128 @@
+"""
+Sampling-Profiler für den laufenden Dienst.
+
+Liest in festen Abständen mit ``sys._current_frames()`` die Stacks aller
+Threads des Prozesses (MQTT-Netzwerkthread, Vorhersage-Thread, Simulator,
+Request-Threads usw.) und zählt gleiche Stacks. Der Dienst wird dabei weder
+instrumentiert noch verlangsamt, abgesehen von den kurzen Momenten, in denen
+eine Stichprobe genommen wird.
+
+Das Ergebnis ist im "collapsed stack"-Format (eine Zeile pro Stack,
+``thread;äußere;...;innere Funktion Anzahl``), das z. B. von flamegraph.pl,
+speedscope oder inferno direkt gelesen wird.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Abstand zwischen zwei Stichproben in Sekunden (100 Hz)
+DEFAULT_INTERVAL = 0.01
+
+# Nur ein Profiling-Lauf pro Prozess gleichzeitig
+_running = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    """
+    Sammelt Stichproben der Stacks aller Threads außer dem eigenen.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, lines=False):
+        """
+        :param interval: Abstand zwischen zwei Stichproben in Sekunden
+        :param lines: Zeilennummern in die Funktionsnamen aufnehmen
+                      (feiner, aber weniger zusammengefasst)
+        """
+        self.interval = interval
+        self.lines = lines
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self._labels = {}
+
+    def _label(self, frame):
+        code = frame.f_code
+        key = (code, frame.f_lineno) if self.lines else code
+        label = self._labels.get(key)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            location = os.path.basename(code.co_filename)
+            if self.lines:
+                location = f"{location}:{frame.f_lineno}"
+            # Das Semikolon trennt im Format die Stackebenen
+            label = f"{name} ({location})".replace(";", ":")
+            self._labels[key] = label
+        return label
+
+    def sample(self, exclude=None):
+        """
+        Nimmt eine Stichprobe der Stacks aller Threads.
+
+        :param exclude: Thread-ID, die ausgelassen wird (der Profiler selbst)
+        """
+        started = time.perf_counter()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            thread_name = names.get(ident, f"thread-{ident}")
+            stack.append(thread_name.replace(";", ":"))
+            stack.reverse()
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+        self.sampling_seconds += time.perf_counter() - started
+
+    def run(self, seconds):
+        """
+        Nimmt für die angegebene Dauer Stichproben im Abstand von interval.
+        """
+        own_thread = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        next_sample = time.monotonic()
+        while next_sample < deadline:
+            self.sample(exclude=own_thread)
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Zu langsam für das Intervall: nicht aufholen, sondern weitermachen
+                next_sample = time.monotonic()
+        return self
+
+    def collapsed(self):
+        """
+        :return: Stacks im collapsed-stack-Format, eine Zeile pro Stack
+        """
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+
+def profile(seconds, interval=DEFAULT_INTERVAL, lines=False):
+    """
+    Profiliert alle Threads des Prozesses für die angegebene Dauer.
+
+    :param seconds: Dauer in Sekunden
+    :param interval: Abstand zwischen zwei Stichproben in Sekunden
+    :param lines: Zeilennummern in die Funktionsnamen aufnehmen
+    :return: SamplingProfiler mit den gesammelten Stacks
+    :raises ProfilerBusyError: wenn bereits ein Lauf aktiv ist
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusyError("Es läuft bereits ein Profiling-Lauf")
+    try:
+        return SamplingProfiler(interval, lines).run(seconds)
+    finally:
+        _running.release()
@@ -1,20 +1,48 @@
 import pandas as pd
-import time
 import threading
 import logging
 from datetime import datetime, timedelta
-import random
 import os
 import numpy as np
 
+from virtual_clock import SystemClock
+
+# Bereiche der gleichverteilten Zufallswerte pro Datenpunkt (Spalten des Rauschblocks)
+NOISE_RANGES = np.array([
+    (-0.5, 0.5),   # Variation Temperatur
+    (18, 24),      # Temperatur ohne Datensatz
+    (-10, 10),     # Variation CO2
+    (400, 801),    # CO2 ohne Datensatz (ganzzahlig 400-800)
+    (-2, 2),       # Variation Feuchtigkeit
+    (45, 65),      # Feuchtigkeit ohne Datensatz
+    (-0.5, 0.5),   # Variation TVOC
+    (-5, 2),       # Abweichung Außentemperatur
+])
+(TEMP_NOISE, TEMP_FALLBACK, CO2_NOISE, CO2_FALLBACK,
+ HUMIDITY_NOISE, HUMIDITY_FALLBACK, TVOC_NOISE, AMBIENT_NOISE) = range(len(NOISE_RANGES))
+
 class SensorDataSimulator:
     """
     Simulator für echte Sensordaten basierend auf vorhandenen CSV-Dateien.
     Liest Daten aus den Datensätzen und simuliert Live-Datenübertragung.
     """
     
-    def __init__(self, mqtt_client):
+    def __init__(self, mqtt_client, clock=None, interval=30, seed=None, noise_block_size=4096):
+        """
+        :param mqtt_client: MQTT-Client, in dessen Daten geschrieben wird
+        :param clock: Uhr für Zeitstempel und Wartezeiten (Standard: die Uhr des MQTT-Clients)
+        :param interval: Abstand zwischen zwei Datenpunkten in (virtuellen) Sekunden
+        :param seed: Startwert des Zufallsgenerators; mit gleichem Seed sind Läufe reproduzierbar
+        :param noise_block_size: Anzahl der Datenpunkte, für die Zufallswerte im Voraus erzeugt werden
+        """
         self.mqtt_client = mqtt_client
+        self.clock = clock or getattr(mqtt_client, 'clock', None) or SystemClock()
+        self.interval = interval
+        self.rng = np.random.default_rng(seed)
+        self.noise_block_size = noise_block_size
+        self.noise_block = np.empty((0, len(NOISE_RANGES)))
+        self.noise_position = 0
+        self.noise_lock = threading.Lock()
         self.running = False
         self.data_thread = None
         
@@ -27,9 +55,9 @@ class SensorDataSimulator:
         self.current_index = 0
         
         # Überprüfe Datenqualität
-        temp_len = len(self.temperature_data)
-        co2_len = len(self.co2_data)
-        humidity_len = len(self.humidity_data)
+        temp_len = self.data_length(self.temperature_data)
+        co2_len = self.data_length(self.co2_data)
+        humidity_len = self.data_length(self.humidity_data)
         
         logging.info(f"Geladene Sensordaten: Temperatur={temp_len}, CO2={co2_len}, Feuchtigkeit={humidity_len}")
         
@@ -41,86 +69,89 @@ class SensorDataSimulator:
             logging.info("Generiere synthetische Sensordaten als Fallback...")
             self.generate_synthetic_data()
     
-    def load_temperature_data(self):
-        """Lädt Temperaturdaten aus der CSV-Datei"""
+    def load_columns(self, file_path, value_columns, label):
+        """
+        Liest eine CSV-Datei einmal ein und gibt die Spalten als NumPy-Arrays zurück.
+
+        :param file_path: Pfad zur CSV-Datei
+        :param value_columns: Namen der Messwert-Spalten
+        :param label: Bezeichnung der Daten für das Logging
+        :return: Dictionary {"time": datetime64-Array, <Spalte>: float-Array}, sortiert nach Zeit,
+                 oder ein leeres Dictionary
+        """
         try:
-            file_path = 'datasets/10c_temp_last_30_days.csv'
             if not os.path.exists(file_path):
-                logging.error(f"Temperatur-Datei nicht gefunden: {file_path}")
-                return []
-                
-            df = pd.read_csv(file_path)
+                logging.error(f"{label}-Datei nicht gefunden: {file_path}")
+                return {}
+
+            df = pd.read_csv(file_path, usecols=['time', *value_columns])
             if df.empty:
-                logging.error("Temperatur-Datei ist leer")
-                return []
-                
-            # Konvertiere Zeitstempel
-            df['time'] = pd.to_datetime(df['time'])
-            # Sortiere nach Zeit
-            df = df.sort_values('time')
-            logging.info(f"Temperaturdaten erfolgreich geladen: {len(df)} Datenpunkte")
-            return df.to_dict('records')
+                logging.error(f"{label}-Datei ist leer")
+                return {}
+
+            # Konvertiere Zeitstempel (UTC) und sortiere nach Zeit
+            times = pd.to_datetime(df['time'], format='ISO8601', utc=True).dt.tz_localize(None).to_numpy()
+            order = np.argsort(times, kind='stable')
+            columns = {'time': times[order]}
+            for column in value_columns:
+                columns[column] = df[column].to_numpy(dtype=float)[order]
+
+            logging.info(f"{label}daten erfolgreich geladen: {len(order)} Datenpunkte")
+            return columns
         except Exception as e:
-            logging.error(f"Fehler beim Laden der Temperaturdaten: {e}")
-            return []
-    
+            logging.error(f"Fehler beim Laden der {label}daten: {e}")
+            return {}
+
+    def load_temperature_data(self):
+        """Lädt Temperaturdaten aus der CSV-Datei"""
+        return self.load_columns('datasets/10c_temp_last_30_days.csv', ['temperature'], 'Temperatur')
+
     def load_co2_data(self):
         """Lädt CO2-Daten aus der CSV-Datei"""
-        try:
-            file_path = 'datasets/10c_co2_last_30_days.csv'
-            if not os.path.exists(file_path):
-                logging.error(f"CO2-Datei nicht gefunden: {file_path}")
-                return []
-                
-            df = pd.read_csv(file_path)
-            if df.empty:
-                logging.error("CO2-Datei ist leer")
-                return []
-                
-            # Konvertiere Zeitstempel
-            df['time'] = pd.to_datetime(df['time'])
-            # Sortiere nach Zeit
-            df = df.sort_values('time')
-            logging.info(f"CO2-Daten erfolgreich geladen: {len(df)} Datenpunkte")
-            return df.to_dict('records')
-        except Exception as e:
-            logging.error(f"Fehler beim Laden der CO2-Daten: {e}")
-            return []
-    
+        return self.load_columns('datasets/10c_co2_last_30_days.csv', ['co2'], 'CO2-')
+
     def load_humidity_data(self):
-        """Lädt Feuchtigkeitsdaten (simuliert basierend auf Temperatur)"""
+        """Lädt Feuchtigkeitsdaten (simuliert basierend auf den bereits geladenen Temperaturdaten)"""
         try:
-            # Verwende Temperaturdaten als Basis für Feuchtigkeit
-            temp_df = pd.read_csv('datasets/10c_temp_last_30_days.csv')
-            temp_df['time'] = pd.to_datetime(temp_df['time'])
-            temp_df = temp_df.sort_values('time')
-            
+            if not self.temperature_data:
+                return {}
+
             # Simuliere Feuchtigkeit basierend auf Temperatur (inverser Zusammenhang)
-            humidity_data = []
-            for _, row in temp_df.iterrows():
-                # Feuchtigkeit zwischen 40-80%, invers zu Temperatur
-                base_humidity = 60
-                temp_factor = (row['temperature'] - 10) / 20  # Normalisiere Temperatur
-                humidity = base_humidity - (temp_factor * 20) + random.uniform(-5, 5)
-                humidity = max(40, min(80, humidity))  # Begrenze auf 40-80%
-                
-                humidity_data.append({
-                    'time': row['time'],
-                    'humidity': round(humidity, 1)
-                })
-            
-            return humidity_data
+            temperature = self.temperature_data['temperature']
+            temp_factor = (temperature - 10) / 20  # Normalisiere Temperatur
+            noise = self.rng.uniform(-5, 5, len(temperature))
+            # Feuchtigkeit zwischen 40-80%, invers zu Temperatur
+            humidity = np.clip(60 - temp_factor * 20 + noise, 40, 80).round(1)
+
+            return {'time': self.temperature_data['time'], 'humidity': humidity}
         except Exception as e:
             logging.error(f"Fehler beim Laden der Feuchtigkeitsdaten: {e}")
-            return []
-    
+            return {}
+
+    @staticmethod
+    def data_length(columns):
+        """Anzahl der Datenpunkte in einem Spalten-Dictionary"""
+        return len(columns['time']) if columns else 0
+
+    @staticmethod
+    def record_at(columns, index):
+        """Datenpunkt ``index`` eines Spalten-Dictionaries als Dictionary oder None"""
+        if index >= SensorDataSimulator.data_length(columns):
+            return None
+        return {
+            key: values[index].item() if values.dtype.kind == 'f' else values[index]
+            for key, values in columns.items()
+        }
+
     def start_simulation(self):
         """Startet die Datensimulation"""
         if self.running:
             return
         
         self.running = True
-        self.data_thread = threading.Thread(target=self.simulate_data_stream)
+        self.data_thread = threading.Thread(
+            target=self.simulate_data_stream, name="sensor-simulator"
+        )
         self.data_thread.daemon = True
         self.data_thread.start()
         logging.info("Sensordaten-Simulation gestartet")
@@ -138,14 +169,14 @@ class SensorDataSimulator:
             try:
                 # Sicherheitscheck: Stelle sicher, dass alle Datenlisten die gleiche Länge haben
                 min_length = min(
-                    len(self.temperature_data),
-                    len(self.co2_data),
-                    len(self.humidity_data)
+                    self.data_length(self.temperature_data),
+                    self.data_length(self.co2_data),
+                    self.data_length(self.humidity_data)
                 )
                 
                 if min_length == 0:
                     logging.error("Keine Sensordaten verfügbar")
-                    time.sleep(30)
+                    self.clock.sleep(30)
                     continue
                 
                 if self.current_index >= min_length:
@@ -155,16 +186,16 @@ class SensorDataSimulator:
                 
                 # Hole aktuelle Daten mit Sicherheitscheck
                 try:
-                    temp_record = self.temperature_data[self.current_index] if self.current_index < len(self.temperature_data) else None
-                    co2_record = self.co2_data[self.current_index] if self.current_index < len(self.co2_data) else None
-                    humidity_record = self.humidity_data[self.current_index] if self.current_index < len(self.humidity_data) else None
+                    temp_record = self.record_at(self.temperature_data, self.current_index)
+                    co2_record = self.record_at(self.co2_data, self.current_index)
+                    humidity_record = self.record_at(self.humidity_data, self.current_index)
                 except IndexError as e:
                     logging.error(f"Index-Fehler bei Datenzugriff: {e}, current_index: {self.current_index}")
                     self.current_index = 0
                     continue
                 
                 # Erstelle aktuellen Zeitstempel
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
+                current_time = self.clock.now().strftime("%Y-%m-%d %H:%M")
                 
                 # Füge Daten zum MQTT-Client hinzu
                 self.update_sensor_data(current_time, temp_record, co2_record, humidity_record)
@@ -172,55 +203,123 @@ class SensorDataSimulator:
                 # Erhöhe Index
                 self.current_index += 1
                 
-                # Warte 30 Sekunden bis zum nächsten Datenpunkt
-                time.sleep(30)
+                # Warte 30 Sekunden (bzw. ``interval``) bis zum nächsten Datenpunkt
+                self.clock.sleep(self.interval)
                 
             except Exception as e:
                 logging.error(f"Fehler in der Datensimulation: {e}")
-                logging.error(f"current_index: {self.current_index}, data_lengths: temp={len(self.temperature_data)}, co2={len(self.co2_data)}, humidity={len(self.humidity_data)}")
-                time.sleep(10)
+                logging.error(f"current_index: {self.current_index}, data_lengths: temp={self.data_length(self.temperature_data)}, co2={self.data_length(self.co2_data)}, humidity={self.data_length(self.humidity_data)}")
+                self.clock.sleep(10)
     
+    def scale_noise(self, uniform):
+        """Skaliert gleichverteilte Werte aus [0, 1) auf die Bereiche in NOISE_RANGES"""
+        return NOISE_RANGES[:, 0] + uniform * (NOISE_RANGES[:, 1] - NOISE_RANGES[:, 0])
+
+    def draw_noise(self, count):
+        """
+        Liefert Zufallswerte für ``count`` Datenpunkte aus einem im Voraus
+        erzeugten Block (Form: (count, len(NOISE_RANGES))).
+        """
+        if count > self.noise_block_size:
+            with self.noise_lock:
+                return self.scale_noise(self.rng.random((count, len(NOISE_RANGES))))
+
+        with self.noise_lock:
+            if self.noise_position + count > len(self.noise_block):
+                self.noise_block = self.scale_noise(
+                    self.rng.random((self.noise_block_size, len(NOISE_RANGES)))
+                )
+                self.noise_position = 0
+            rows = self.noise_block[self.noise_position:self.noise_position + count]
+            self.noise_position += count
+            return rows
+
+    @staticmethod
+    def compute_readings(temperature, co2, humidity, noise):
+        """
+        Berechnet Messwerte mit Variation für beliebig viele Datenpunkte auf einmal.
+        Fehlende Basiswerte (NaN) werden durch Zufallswerte ersetzt.
+
+        :param temperature: Basis-Temperaturen
+        :param co2: Basis-CO2-Werte
+        :param humidity: Basis-Feuchtigkeiten
+        :param noise: Zufallswerte der Form (..., len(NOISE_RANGES)) aus ``draw_noise``
+        :return: Dictionary mit Arrays für temperature, co2, humidity, tvoc, ambient_temp
+        """
+        # Temperatur mit kleiner Variation für Realismus
+        temperature = np.where(
+            np.isnan(temperature),
+            noise[..., TEMP_FALLBACK],
+            temperature + noise[..., TEMP_NOISE],
+        ).round(1)
+
+        # CO2, begrenzt auf realistische Werte
+        co2 = np.where(
+            np.isnan(co2),
+            np.floor(noise[..., CO2_FALLBACK]),
+            np.clip(co2 + noise[..., CO2_NOISE], 400, 2000).round(),
+        )
+
+        # Feuchtigkeit
+        humidity = np.where(
+            np.isnan(humidity),
+            noise[..., HUMIDITY_FALLBACK],
+            np.clip(humidity + noise[..., HUMIDITY_NOISE], 40, 80),
+        ).round(1)
+
+        # TVOC (simuliert, basierend auf CO2)
+        tvoc = np.maximum(0, (co2 - 400) / 100 + noise[..., TVOC_NOISE]).round(1)
+
+        # Außentemperatur (basierend auf Innenraum mit Abweichung)
+        ambient_temp = (temperature + noise[..., AMBIENT_NOISE]).round(1)
+
+        return {
+            'temperature': temperature,
+            'co2': co2,
+            'humidity': humidity,
+            'tvoc': tvoc,
+            'ambient_temp': ambient_temp,
+        }
+
+    def generate_batch(self, count=1, rooms=1):
+        """
+        Erzeugt Messwerte für ``count`` aufeinanderfolgende Datenpunkte von
+        ``rooms`` Räumen in einem Aufruf. Jeder Raum startet an einer anderen
+        Stelle der Datensätze. Der MQTT-Client wird nicht verändert.
+
+        :return: Dictionary mit Arrays der Form (count, rooms)
+        """
+        min_length = min(
+            self.data_length(self.temperature_data),
+            self.data_length(self.co2_data),
+            self.data_length(self.humidity_data)
+        )
+        room_offsets = np.arange(rooms) * max(min_length // rooms, 1)
+        indices = (self.current_index + np.arange(count)[:, None] + room_offsets) % min_length
+        self.current_index = (self.current_index + count) % min_length
+
+        noise = self.draw_noise(count * rooms).reshape(count, rooms, len(NOISE_RANGES))
+        return self.compute_readings(
+            self.temperature_data['temperature'][indices],
+            self.co2_data['co2'][indices],
+            self.humidity_data['humidity'][indices],
+            noise,
+        )
+
     def update_sensor_data(self, current_time, temp_record, co2_record, humidity_record):
         """Aktualisiert die Sensordaten im MQTT-Client"""
         try:
-            # Temperatur
-            if temp_record:
-                temperature = temp_record['temperature']
-                # Füge kleine Variation hinzu für Realismus
-                temperature += random.uniform(-0.5, 0.5)
-                temperature = round(temperature, 1)
-            else:
-                temperature = random.uniform(18, 24)
-                temperature = round(temperature, 1)
-            
-            # CO2
-            if co2_record:
-                co2 = co2_record['co2']
-                # Füge kleine Variation hinzu
-                co2 += random.uniform(-10, 10)
-                co2 = max(400, min(2000, co2))  # Begrenze auf realistische Werte
-                co2 = round(co2)
-            else:
-                co2 = random.randint(400, 800)
-            
-            # Feuchtigkeit
-            if humidity_record:
-                humidity = humidity_record['humidity']
-                # Füge kleine Variation hinzu
-                humidity += random.uniform(-2, 2)
-                humidity = max(40, min(80, humidity))
-                humidity = round(humidity, 1)
-            else:
-                humidity = random.uniform(45, 65)
-                humidity = round(humidity, 1)
-            
-            # TVOC (simuliert, basierend auf CO2)
-            tvoc = max(0, (co2 - 400) / 100 + random.uniform(-0.5, 0.5))
-            tvoc = round(tvoc, 1)
-            
-            # Außentemperatur (basierend auf Innenraum mit Abweichung)
-            ambient_temp = temperature + random.uniform(-5, 2)
-            ambient_temp = round(ambient_temp, 1)
+            readings = self.compute_readings(
+                np.array([temp_record['temperature'] if temp_record else np.nan]),
+                np.array([co2_record['co2'] if co2_record else np.nan]),
+                np.array([humidity_record['humidity'] if humidity_record else np.nan]),
+                self.draw_noise(1),
+            )
+            temperature = readings['temperature'][0].item()
+            co2 = int(readings['co2'][0])
+            humidity = readings['humidity'][0].item()
+            tvoc = readings['tvoc'][0].item()
+            ambient_temp = readings['ambient_temp'][0].item()
             
             # Aktualisiere MQTT-Client-Daten
             with self.mqtt_client.data_lock:
@@ -290,48 +389,39 @@ class SensorDataSimulator:
             logging.info("Generiere 100 synthetische Datenpunkte...")
             
             # Generiere 100 Datenpunkte für die letzten 100 Minuten
-            synthetic_data = []
-            base_time = datetime.now() - timedelta(minutes=100)
-            
-            for i in range(100):
-                # Zeitstempel
-                timestamp = base_time + timedelta(minutes=i)
-                
-                # Realistische Temperatur (18-26°C mit Tagesrhythmus)
-                hour = timestamp.hour
-                base_temp = 22  # Mittlere Temperatur
-                daily_variation = 4 * np.sin((hour - 6) * np.pi / 12)  # Tagesrhythmus
-                temperature = base_temp + daily_variation + random.uniform(-1, 1)
-                
-                # Realistischer CO2 (400-1200 ppm, höher während Schulzeiten)
-                if 8 <= hour <= 16:  # Schulzeit
-                    base_co2 = 600
-                    variation = random.uniform(0, 400)
-                else:  # Nachts/Früh
-                    base_co2 = 400
-                    variation = random.uniform(0, 100)
-                co2 = base_co2 + variation
-                
-                # Realistische Feuchtigkeit (40-70%, invers zu Temperatur)
-                humidity = max(40, min(70, 60 - (temperature - 22) * 2 + random.uniform(-5, 5)))
-                
-                synthetic_data.append({
-                    'time': timestamp,
-                    'temperature': round(temperature, 1),
-                    'co2': round(co2),
-                    'humidity': round(humidity, 1)
-                })
-            
-            # Aktualisiere die Datenlisten
-            self.temperature_data = [{'time': d['time'], 'temperature': d['temperature']} for d in synthetic_data]
-            self.co2_data = [{'time': d['time'], 'co2': d['co2']} for d in synthetic_data]
-            self.humidity_data = [{'time': d['time'], 'humidity': d['humidity']} for d in synthetic_data]
-            
+            num_points = 100
+            rng = self.rng
+            base_time = np.datetime64(self.clock.now() - timedelta(minutes=num_points), 's')
+            times = base_time + np.arange(num_points) * np.timedelta64(1, 'm')
+            hours = (times.astype('datetime64[h]') - times.astype('datetime64[D]')).astype(int)
+
+            # Realistische Temperatur (18-26°C mit Tagesrhythmus)
+            base_temp = 22  # Mittlere Temperatur
+            daily_variation = 4 * np.sin((hours - 6) * np.pi / 12)  # Tagesrhythmus
+            temperature = base_temp + daily_variation + rng.uniform(-1, 1, num_points)
+
+            # Realistischer CO2 (400-1200 ppm, höher während Schulzeiten)
+            school_time = (hours >= 8) & (hours <= 16)
+            co2 = np.where(
+                school_time,
+                600 + rng.uniform(0, 400, num_points),
+                400 + rng.uniform(0, 100, num_points),
+            )
+
+            # Realistische Feuchtigkeit (40-70%, invers zu Temperatur)
+            humidity = np.clip(60 - (temperature - 22) * 2 + rng.uniform(-5, 5, num_points), 40, 70)
+
+            # Aktualisiere die Datenspalten
+            self.temperature_data = {'time': times, 'temperature': temperature.round(1)}
+            self.co2_data = {'time': times, 'co2': co2.round()}
+            self.humidity_data = {'time': times, 'humidity': humidity.round(1)}
+
             logging.info("Synthetische Sensordaten erfolgreich generiert")
             
         except Exception as e:
             logging.error(f"Fehler beim Generieren synthetischer Daten: {e}")
             # Notfall-Fallback: Einfache statische Daten
-            self.temperature_data = [{'time': datetime.now(), 'temperature': 22.0}]
-            self.co2_data = [{'time': datetime.now(), 'co2': 500}]
-            self.humidity_data = [{'time': datetime.now(), 'humidity': 55.0}]
+            now = np.array([np.datetime64(self.clock.now())])
+            self.temperature_data = {'time': now, 'temperature': np.array([22.0])}
+            self.co2_data = {'time': now, 'co2': np.array([500.0])}
+            self.humidity_data = {'time': now, 'humidity': np.array([55.0])}
@@ -0,0 +1,174 @@
+"""
+Framework-unabhängige Logik der lesenden Endpunkte.
+
+Die Funktionen liefern JSON-serialisierbare Daten und werden sowohl von der
+Flask-Anwendung (``application.py``) als auch vom asynchronen Servermodus
+(``asgi_application.py``) verwendet.
+"""
+
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "HJ|*fS1i"
+
+
+def is_valid_basic_auth(auth_header):
+    """
+    Prüft einen Authorization-Header auf gültige Basic-Auth-Anmeldedaten.
+
+    :param auth_header: Wert des Authorization-Headers oder None
+    :return: True, wenn die Anmeldedaten stimmen
+    """
+    if not auth_header:
+        return False
+    auth_type, _, auth_credentials = auth_header.partition(" ")
+    if auth_type.lower() != "basic":
+        return False
+    try:
+        benutzername, _, passwort = (
+            base64.b64decode(auth_credentials).decode("utf-8").partition(":")
+        )
+    except (binascii.Error, UnicodeDecodeError):
+        return False
+    return benutzername == ADMIN_USERNAME and passwort == ADMIN_PASSWORD
+
+
+def latest_data_payload(mqtt_client):
+    """
+    Letzte Messwerte für ``/latest_data``.
+    """
+    return {
+        "time": mqtt_client.latest_time,
+        "humidity": (
+            mqtt_client.combined_data.get("humidity")[-1]
+            if mqtt_client.combined_data.get("humidity")
+            else None
+        ),
+        "temperature": (
+            mqtt_client.combined_data.get("temperature")[-1]
+            if mqtt_client.combined_data.get("temperature")
+            else None
+        ),
+        "co2": (
+            mqtt_client.combined_data.get("co2")[-1]
+            if mqtt_client.combined_data.get("co2")
+            else None
+        ),
+    }
+
+
+def sensor_data_payload(mqtt_client, sensor_simulator):
+    """
+    Aktuelle Sensordaten für ``/sensor_data`` - bevorzugt Live-MQTT-Daten,
+    sonst die Daten des Sensor-Simulators.
+
+    :return: Tuple (Antwort-Dictionary, HTTP-Statuscode)
+    """
+    current_data = mqtt_client.get_current_live_data()
+    data_source = "Live-MQTT"
+
+    if not current_data:
+        current_data = sensor_simulator.get_current_data()
+        data_source = "Sensor-Simulator"
+
+    if current_data:
+        return {
+            "status": "success",
+            "data": current_data,
+            "data_source": data_source,
+            "message": f"Sensordaten geladen von {data_source}",
+        }, 200
+    return {"status": "error", "message": "Keine Sensordaten verfügbar"}, 404
+
+
+def fill_missing_with_last_known(data):
+    """
+    Ersetzt fehlende Werte durch den letzten bekannten Wert.
+    """
+    last_known = None
+    for i in range(len(data)):
+        if data[i] is not None:
+            last_known = data[i]
+        elif last_known is not None:
+            data[i] = last_known
+    return data
+
+
+def plots_payload(sensor_data):
+    """
+    Zeitreihen für die Plots. Wenn Daten wie TVOC oder Außentemperatur später
+    ankommen, wird der letzte bekannte Wert oder None als Platzhalter verwendet.
+
+    :param sensor_data: Liste der gesammelten Datenpunkte
+    :return: Dictionary mit einer Liste pro Messgröße
+    """
+    if not sensor_data:
+        return {
+            "co2_data": [],
+            "temperature_data": [],
+            "humidity_data": [],
+            "tvoc_data": [],
+            "ambient_temp_data": [],
+            "time_data": [],
+        }
+
+    return {
+        "co2_data": fill_missing_with_last_known(
+            [data.get("co2", None) for data in sensor_data]
+        ),
+        "temperature_data": fill_missing_with_last_known(
+            [data.get("temperature", None) for data in sensor_data]
+        ),
+        "humidity_data": fill_missing_with_last_known(
+            [data.get("humidity", None) for data in sensor_data]
+        ),
+        "tvoc_data": fill_missing_with_last_known(
+            [data.get("tvoc", None) for data in sensor_data]
+        ),
+        "ambient_temp_data": fill_missing_with_last_known(
+            [data.get("ambient_temp", None) for data in sensor_data]
+        ),
+        "time_data": [data.get("time", None) for data in sensor_data],
+    }
+
+
+def future_timestamp(timestamp):
+    """
+    Berechnet den Zeitstempel 5 Minuten nach dem angefragten Zeitstempel.
+
+    :param timestamp: Zeitstempel im Format "%Y-%m-%d %H:%M"
+    :return: Zeitstempel im selben Format
+    """
+    timestamp_dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M")
+    return (timestamp_dt + timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M")
+
+
+def format_future_data(future_data):
+    """
+    Formatiert die gemittelten Zukunftsdaten für die JSON-Antwort.
+
+    :return: formatierte Daten oder None, wenn keine Daten vorliegen
+    """
+    if not future_data:
+        return None
+
+    return {
+        "timestamp": future_data.get("timestamp"),
+        "co2_values": (
+            float(future_data.get("co2_values"))
+            if future_data.get("co2_values") is not None
+            else None
+        ),
+        "temperature": (
+            float(future_data.get("temperature"))
+            if future_data.get("temperature") is not None
+            else None
+        ),
+        "humidity": (
+            float(future_data.get("humidity"))
+            if future_data.get("humidity") is not None
+            else None
+        ),
+    }
@@ -0,0 +1,274 @@
+"""
+Kennzahlen des Dienstes im Prometheus-Textformat (Version 0.0.4).
+
+Zähler und Histogramme werden auf dem heißen Pfad (on_message, Datenbank,
+Lock) nur fortgeschrieben: eine binäre Suche im Bucket-Array und einige
+Additionen unter einem eigenen, kurz gehaltenen Lock. Gauges (z. B.
+Puffergrößen) werden erst beim Abruf von /metrics über eine Funktion
+berechnet und kosten im Betrieb nichts.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Obergrenzen in Sekunden, von Lock-Wartezeiten (µs) bis zu langsamen Abfragen
+LATENCY_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        """
+        :param labels: Tuple mit den Werten der Labels in der Reihenfolge labelnames
+        :param amount: Zuwachs
+        """
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        with self.lock:
+            values = sorted(self.values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Labels -> [Anzahl pro Bucket (nicht kumuliert, letzter = +Inf), Summe, Anzahl]
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        """
+        :param value: Messwert, z. B. Dauer in Sekunden
+        :param labels: Tuple mit den Werten der Labels in der Reihenfolge labelnames
+        """
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, labels=()):
+        """
+        Kontextmanager, der die Dauer des Blocks beobachtet.
+        """
+        return _Timer(self, labels)
+
+    def render(self):
+        with self.lock:
+            series = sorted(
+                (labels, (list(counts), total, count))
+                for labels, (counts, total, count) in self.series.items()
+            )
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = _number(bound) if bound != float("inf") else "+Inf"
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}"
+                )
+            label_text = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.histogram.observe(time.perf_counter() - self.started, self.labels)
+        return False
+
+
+class Gauge:
+    """
+    Gauge, deren Werte erst beim Abruf berechnet werden.
+
+    Die Funktion liefert eine Zahl oder ein Dictionary Label-Tuple -> Zahl.
+    """
+
+    def __init__(self, name, documentation, function, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        values = self.function()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            value = float("nan") if value is None else value
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Registriert eine Kennzahl. Eine Gauge mit demselben Namen wird ersetzt
+        (z. B. wenn ein neuer MQTTClient erzeugt wird).
+        """
+        with self.lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, function, labelnames=()):
+        return self.register(Gauge(name, documentation, function, labelnames))
+
+    def render(self):
+        """
+        :return: alle Kennzahlen im Prometheus-Textformat
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name}: Fehler beim Berechnen: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+MESSAGES_INGESTED = REGISTRY.counter(
+    "smart_ventilation_mqtt_messages_total",
+    "Empfangene MQTT-Nachrichten pro Topic",
+    ["topic"],
+)
+ON_MESSAGE_SECONDS = REGISTRY.histogram(
+    "smart_ventilation_on_message_seconds",
+    "Verarbeitungsdauer von MQTTClient.on_message pro Topic",
+    ["topic"],
+)
+LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "smart_ventilation_lock_wait_seconds",
+    "Wartezeit bis zum Erhalt eines Locks",
+    ["lock"],
+)
+LOCK_HOLD_SECONDS = REGISTRY.histogram(
+    "smart_ventilation_lock_hold_seconds",
+    "Haltedauer eines Locks",
+    ["lock"],
+)
+DB_SECONDS = REGISTRY.histogram(
+    "smart_ventilation_db_seconds",
+    "Dauer von Datenbankoperationen (Ausführung und Commit bzw. Abruf)",
+    ["operation", "table"],
+)
+PREDICTION_SECONDS = REGISTRY.histogram(
+    "smart_ventilation_prediction_seconds",
+    "Dauer eines Vorhersagedurchlaufs aller Modelle",
+)
+
+
+class InstrumentedLock:
+    """
+    threading.Lock, das Warte- und Haltezeiten in LOCK_WAIT_SECONDS und
+    LOCK_HOLD_SECONDS erfasst. Wie threading.Lock nicht reentrant.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.labels = (name,)
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        started = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired_at = time.perf_counter()
+            LOCK_WAIT_SECONDS.observe(self._acquired_at - started, self.labels)
+        return acquired
+
+    def release(self):
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        LOCK_HOLD_SECONDS.observe(held, self.labels)
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return True
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+        return False
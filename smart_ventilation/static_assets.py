@@ -0,0 +1,229 @@
+"""
+Fingerprinting und Auslieferung der statischen Dateien.
+
+Zur Build-Zeit (``python static_assets.py``) wird für jede Datei unter
+``static/`` eine Kopie mit Inhalts-Hash im Dateinamen nach ``static/dist/``
+geschrieben, für Textdateien zusätzlich vorkomprimierte ``.gz``- und
+``.br``-Varianten. Das Manifest ``static/dist/manifest.json`` bildet die
+logischen Dateinamen auf die gehashten Namen ab und wird von der Flask-
+Anwendung über ``asset_url()`` in den Templates genutzt.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+
+from flask import abort, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # Brotli ist optional, gzip reicht als Fallback
+    brotli = None
+
+DIST_DIR_NAME = "dist"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".json", ".txt", ".html"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def content_hash(file_path, length=HASH_LENGTH):
+    """
+    Berechnet einen kurzen SHA-256-Hash über den Inhalt einer Datei.
+
+    :param file_path: Pfad zur Datei
+    :param length: Anzahl der Hex-Zeichen im Ergebnis
+    :return: Hash als Hex-String
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()[:length]
+
+
+def fingerprinted_name(filename, digest):
+    """
+    Fügt den Hash vor der Dateiendung ein, z. B. ``css/styles.css`` ->
+    ``css/styles.3f2a9c1b0d4e.css``.
+    """
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{digest}{ext}"
+
+
+def _write_compressed_variants(file_path):
+    """
+    Schreibt gzip- und (falls verfügbar) Brotli-Varianten neben die Datei.
+    Der gzip-Header enthält keinen Zeitstempel, damit Builds reproduzierbar sind.
+    """
+    with open(file_path, "rb") as file:
+        data = file.read()
+
+    with open(file_path + ".gz", "wb") as raw:
+        with gzip.GzipFile(
+            filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0
+        ) as gz:
+            gz.write(data)
+
+    if brotli is not None:
+        with open(file_path + ".br", "wb") as file:
+            file.write(brotli.compress(data, quality=11))
+
+
+def build_manifest(static_folder):
+    """
+    Erstellt die gehashten Kopien aller statischen Dateien samt komprimierter
+    Varianten und schreibt das Manifest.
+
+    :param static_folder: Pfad zum ``static``-Verzeichnis
+    :return: Manifest als Dictionary (logischer Name -> gehashter Name)
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR_NAME)
+    if os.path.exists(dist_folder):
+        shutil.rmtree(dist_folder)
+    os.makedirs(dist_folder)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        # Das Ausgabeverzeichnis selbst nicht erneut verarbeiten
+        dirs[:] = [
+            d for d in dirs if os.path.join(root, d) != dist_folder
+        ]
+        for name in sorted(files):
+            source_path = os.path.join(root, name)
+            filename = os.path.relpath(source_path, static_folder).replace(
+                os.sep, "/"
+            )
+            hashed = fingerprinted_name(filename, content_hash(source_path))
+            target_path = os.path.join(dist_folder, *hashed.split("/"))
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            shutil.copyfile(source_path, target_path)
+
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                _write_compressed_variants(target_path)
+
+            manifest[filename] = hashed
+
+    with open(os.path.join(dist_folder, MANIFEST_NAME), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+    logging.info(
+        f"{len(manifest)} statische Dateien mit Fingerprint nach {dist_folder} geschrieben"
+    )
+    return manifest
+
+
+def load_manifest(static_folder):
+    """
+    Lädt das Manifest aus ``static/dist``.
+
+    :return: Manifest als Dictionary oder leeres Dictionary, wenn kein Build vorliegt
+    """
+    manifest_path = os.path.join(static_folder, DIST_DIR_NAME, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.error(f"Fehler beim Laden des Asset-Manifests: {e}")
+        return {}
+
+
+class StaticAssets:
+    """
+    Flask-Erweiterung, die die gehashten Dateien unter ``/assets/`` mit
+    ``Cache-Control: immutable`` ausliefert und ``asset_url()`` als
+    Template-Funktion bereitstellt.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.static_folder = None
+        self.dist_folder = None
+        self._fallback_hashes = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.dist_folder = os.path.join(self.static_folder, DIST_DIR_NAME)
+        self.manifest = load_manifest(self.static_folder)
+
+        if not self.manifest:
+            logging.warning(
+                "Kein Asset-Manifest gefunden, statische Dateien werden ohne Build-Fingerprint ausgeliefert. "
+                "Zum Erstellen: python static_assets.py"
+            )
+
+        app.add_url_rule(
+            "/assets/<path:filename>", endpoint="assets", view_func=self.serve
+        )
+        app.add_template_global(self.asset_url, "asset_url")
+
+    def asset_url(self, filename):
+        """
+        Liefert die URL einer statischen Datei. Mit Manifest zeigt sie auf die
+        gehashte Kopie, ohne Manifest auf ``/static`` mit Inhalts-Hash als Parameter.
+
+        :param filename: Logischer Dateiname relativ zu ``static/``
+        :return: URL der Datei
+        """
+        hashed = self.manifest.get(filename)
+        if hashed is not None:
+            return url_for("assets", filename=hashed)
+
+        if filename not in self._fallback_hashes:
+            try:
+                self._fallback_hashes[filename] = content_hash(
+                    os.path.join(self.static_folder, filename)
+                )
+            except OSError:
+                self._fallback_hashes[filename] = None
+
+        digest = self._fallback_hashes[filename]
+        if digest is None:
+            return url_for("static", filename=filename)
+        return url_for("static", filename=filename, v=digest)
+
+    def serve(self, filename):
+        """
+        Liefert eine gehashte Datei aus, bevorzugt als vorkomprimierte
+        Brotli- oder gzip-Variante, je nach ``Accept-Encoding`` des Clients.
+        """
+        if self.dist_folder is None or filename == MANIFEST_NAME:
+            abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        served_name = filename
+        encoding = None
+
+        if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+            accepted = request.accept_encodings
+            for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if accepted[candidate] and os.path.isfile(
+                    os.path.join(self.dist_folder, filename + suffix)
+                ):
+                    served_name = filename + suffix
+                    encoding = candidate
+                    break
+
+        response = send_from_directory(
+            self.dist_folder, served_name, mimetype=mimetype, max_age=31536000
+        )
+        response.headers.pop("Content-Disposition", None)
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    base_dir = os.path.abspath(os.path.dirname(__file__))
+    build_manifest(os.path.join(base_dir, "static"))
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from competition_scoring import rank_scores
+
+PERIODS = ("day", "week", "term")
+
+
+def period_keys(minute):
+    """
+    Bestimmt die Schlüssel der Zeiträume, zu denen eine Minute gehört.
+    Das Schuljahr beginnt am 1. August, das zweite Halbjahr am 1. Februar.
+
+    :param minute: datetime der Minute
+    :return: Dictionary, z. B. {"day": "2024-05-06", "week": "2024-W19", "term": "2023/24-2"}
+    """
+    iso_year, iso_week, _ = minute.isocalendar()
+    school_year = minute.year if minute.month >= 8 else minute.year - 1
+    half = 1 if minute.month >= 8 or minute.month == 1 else 2
+    return {
+        "day": minute.strftime("%Y-%m-%d"),
+        "week": f"{iso_year}-W{iso_week:02d}",
+        "term": f"{school_year}/{(school_year + 1) % 100:02d}-{half}",
+    }
+
+
+class TeamStandings:
+    """
+    Tages-, Wochen- und Halbjahreswertungen der Teams.
+
+    Pro Zeitraum werden nur die laufenden Summen der Minutenpunktzahlen und
+    die Anzahl der Minuten gehalten. Jede neue Minute aktualisiert die Summen
+    in O(Teams), ebenso jede Abfrage einer Rangliste - unabhängig davon, wie
+    viele Rohdaten in den Zeitraum fallen.
+    """
+
+    def __init__(self, team_names, path=None):
+        """
+        :param team_names: Namen der Teams in der Reihenfolge der Punktzahlen
+        :param path: optionaler Pfad zu einer JSON-Datei, in der die Summen gesichert werden
+        """
+        self.team_names = list(team_names)
+        self.path = path
+        self.sums = {period: {} for period in PERIODS}
+        self.minutes = {period: {} for period in PERIODS}
+        self.last_minute = None
+        self.last_scores = None
+        self.lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            self.load()
+
+    def record(self, timestamp, scores):
+        """
+        Übernimmt die Punktzahlen aller Teams für eine Minute. Wird dieselbe
+        Minute erneut gemeldet, ersetzen die neuen Punktzahlen die alten;
+        ältere Minuten werden ignoriert.
+
+        :param timestamp: Zeitpunkt der Messung (datetime)
+        :param scores: Punktzahlen in der Reihenfolge von ``team_names``
+        """
+        minute = timestamp.replace(second=0, microsecond=0)
+        scores = np.asarray(scores, dtype=float)
+        if scores.shape != (len(self.team_names),):
+            raise ValueError(
+                f"Erwartet {len(self.team_names)} Punktzahlen, erhalten {scores.shape}"
+            )
+
+        with self.lock:
+            if self.last_minute is not None and minute < self.last_minute:
+                return
+            same_minute = minute == self.last_minute
+
+            for period, key in period_keys(minute).items():
+                period_sums = self.sums[period]
+                if key not in period_sums:
+                    period_sums[key] = np.zeros(len(self.team_names))
+                    self.minutes[period][key] = 0
+
+                if same_minute:
+                    period_sums[key] += scores - self.last_scores
+                else:
+                    period_sums[key] += scores
+                    self.minutes[period][key] += 1
+
+            self.last_minute = minute
+            self.last_scores = scores
+
+        if self.path:
+            self.save()
+
+    def leaderboard(self, period, key=None):
+        """
+        Rangliste eines Zeitraums nach durchschnittlicher Minutenpunktzahl.
+
+        :param period: "day", "week" oder "term"
+        :param key: Schlüssel des Zeitraums (siehe ``period_keys``), Standard: aktueller Zeitraum
+        :return: Dictionary mit Zeitraum und Liste der Teams, oder None ohne Daten
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unbekannter Zeitraum: {period}")
+
+        with self.lock:
+            if key is None:
+                if self.last_minute is None:
+                    return None
+                key = period_keys(self.last_minute)[period]
+            if key not in self.sums[period]:
+                return None
+            sums = self.sums[period][key].copy()
+            minutes = self.minutes[period][key]
+
+        averages = np.round(sums / max(minutes, 1), 1)
+        ranks = rank_scores(averages)
+        teams = [
+            {
+                "name": name,
+                "average_score": float(averages[i]),
+                "total_points": round(float(sums[i]), 1),
+                "rank": int(ranks[i]),
+            }
+            for i, name in enumerate(self.team_names)
+        ]
+        teams.sort(key=lambda team: team["rank"])
+        return {"period": period, "key": key, "minutes": minutes, "teams": teams}
+
+    def periods(self, period):
+        """
+        :return: sortierte Liste aller Schlüssel eines Zeitraums mit Daten
+        """
+        with self.lock:
+            return sorted(self.sums[period])
+
+    def save(self):
+        """
+        Schreibt die Summen atomar in die JSON-Datei.
+        """
+        try:
+            with self.lock:
+                snapshot = {
+                    "team_names": self.team_names,
+                    "last_minute": (
+                        self.last_minute.isoformat() if self.last_minute else None
+                    ),
+                    "last_scores": (
+                        self.last_scores.tolist()
+                        if self.last_scores is not None
+                        else None
+                    ),
+                    "sums": {
+                        period: {key: values.tolist() for key, values in sums.items()}
+                        for period, sums in self.sums.items()
+                    },
+                    "minutes": self.minutes,
+                }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(snapshot, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern der Team-Wertungen: {e}")
+
+    def load(self):
+        """
+        Lädt die Summen aus der JSON-Datei.
+        """
+        try:
+            with open(self.path, "r") as file:
+                snapshot = json.load(file)
+            if snapshot["team_names"] != self.team_names:
+                logging.warning(
+                    "Gespeicherte Team-Wertungen passen nicht zu den Teams und werden ignoriert"
+                )
+                return
+            with self.lock:
+                self.sums = {
+                    period: {
+                        key: np.asarray(values, dtype=float)
+                        for key, values in snapshot["sums"].get(period, {}).items()
+                    }
+                    for period in PERIODS
+                }
+                self.minutes = {
+                    period: dict(snapshot["minutes"].get(period, {}))
+                    for period in PERIODS
+                }
+                if snapshot["last_minute"]:
+                    self.last_minute = datetime.fromisoformat(snapshot["last_minute"])
+                    self.last_scores = np.asarray(snapshot["last_scores"], dtype=float)
+        except Exception as e:
+            logging.error(f"Fehler beim Laden der Team-Wertungen: {e}")
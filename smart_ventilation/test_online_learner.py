@@ -0,0 +1,104 @@
+import numpy as np
+
+from db.local_database import connect_local_database
+from online_learner import OnlineFeedbackLearner
+
+INSERT_FEEDBACK = """
+    INSERT INTO feedback_tabelle
+    (temperature, humidity, co2, timestamp, outdoor_temperature, accurate_prediction)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+def insert_feedback(conn, timestamp, accurate_prediction, co2=800.0):
+    cursor = conn.cursor()
+    cursor.execute(INSERT_FEEDBACK, (21.5, 45.0, co2, timestamp, 12.0, accurate_prediction))
+    conn.commit()
+    cursor.close()
+
+
+def recording_learner(conn, tmp_path, published=None):
+    learner = OnlineFeedbackLearner(
+        lambda: conn,
+        model_path=str(tmp_path / "online.pkl"),
+        state_path=str(tmp_path / "state.pkl"),
+        on_publish=published.append if published is not None else None,
+    )
+    learned = []
+    fetch_batch = learner.fetch_batch
+
+    def record():
+        rows = fetch_batch()
+        if rows:
+            learned.append([row[-1] for row in rows])
+        return rows
+
+    learner.fetch_batch = record
+    return learner, learned
+
+
+def test_feedback_for_an_already_read_minute_is_learned(tmp_path):
+    conn = connect_local_database()
+    insert_feedback(conn, "2024-01-01 10:00", 1, co2=800.0)
+    insert_feedback(conn, "2024-01-01 10:00", 1, co2=900.0)
+    learner, learned = recording_learner(conn, tmp_path)
+    assert learner.learn_pending() == 2
+
+    # Widersprechendes Feedback zur selben Minute, das erst danach eintrifft
+    insert_feedback(conn, "2024-01-01 10:00", 0, co2=850.0)
+    assert learner.learn_pending() == 1
+    assert learned == [[1, 1], [0]]
+    assert learner.model.samples == 3
+    assert learner.learn_pending() == 0
+
+
+def test_position_survives_restart(tmp_path):
+    conn = connect_local_database()
+    insert_feedback(conn, "2024-01-01 10:00", 1)
+    learner, _ = recording_learner(conn, tmp_path)
+    learner.learn_pending()
+
+    insert_feedback(conn, "2024-01-01 10:00", 0)
+    restarted, learned = recording_learner(conn, tmp_path)
+    assert restarted.learn_pending() == 1
+    assert learned == [[0]]
+
+
+def test_published_model_is_a_snapshot(tmp_path):
+    conn = connect_local_database()
+    insert_feedback(conn, "2024-01-01 10:00", 1)
+    insert_feedback(conn, "2024-01-01 11:00", 0)
+    published = []
+    learner, _ = recording_learner(conn, tmp_path, published)
+    learner.learn_pending()
+    learner.publish()
+
+    snapshot = published[-1]
+    coefficients = snapshot.classifier.coef_.copy()
+    insert_feedback(conn, "2024-01-01 12:00", 1, co2=1500.0)
+    learner.learn_pending()
+    assert snapshot is not learner.model
+    assert snapshot.samples == 2
+    np.testing.assert_array_equal(snapshot.classifier.coef_, coefficients)
+
+
+def test_only_one_learner_per_state_path(tmp_path):
+    conn = connect_local_database()
+    insert_feedback(conn, "2024-01-01 10:00", 1)
+    insert_feedback(conn, "2024-01-01 11:00", 0)
+    leader, _ = recording_learner(conn, tmp_path)
+    published = []
+    follower, _ = recording_learner(conn, tmp_path, published)
+
+    assert leader.acquire_lock()
+    assert not follower.acquire_lock()
+    leader.learn_pending()
+    leader.publish()
+    follower.reload_published()
+    assert published[-1].samples == 2
+
+    leader.release_lock()
+    assert follower.acquire_lock()
+    # Der neue lernende Prozess setzt an der gespeicherten Position fort
+    assert follower.last_id == leader.last_id
+    follower.release_lock()
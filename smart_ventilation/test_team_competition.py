@@ -1,8 +1,10 @@
 from flask import Flask, render_template
 import random
 import time
+from static_assets import StaticAssets
 
 app = Flask(__name__)
+StaticAssets(app)
 
 @app.route("/team-competition")
 def team_competition():
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+DIRECTIONS = ("backward", "forward", "nearest")
+
+
+def as_datetime64(times):
+    """
+    Wandelt Zeitstempel in ein datetime64[ns]-Array ohne Zeitzone (UTC) um.
+
+    :param times: Series, Index, Array oder Liste von Zeitstempeln
+    :return: numpy-Array vom Typ datetime64[ns]
+    """
+    times = pd.DatetimeIndex(pd.to_datetime(times))
+    if times.tz is not None:
+        times = times.tz_convert("UTC").tz_localize(None)
+    return times.to_numpy(dtype="datetime64[ns]")
+
+
+def floor_to_minute(times):
+    """
+    Wandelt ISO-8601-Zeitstempel (z. B. aus den ChirpStack-Exporten) in
+    minutengenaue datetime64-Werte in UTC ohne Zeitzone um.
+
+    :param times: Series mit Zeitstempeln als Strings
+    :return: Series vom Typ datetime64[ns]
+    """
+    parsed = pd.to_datetime(times, format="ISO8601", utc=True)
+    return parsed.dt.tz_localize(None).dt.floor("min")
+
+
+def asof_indexer(left_times, right_times, direction="backward", tolerance=None):
+    """
+    Sucht für jeden Zeitpunkt links den passenden Zeitpunkt rechts
+    (binäre Suche mit np.searchsorted, keine Stringvergleiche).
+
+    - backward: letzter Zeitpunkt rechts <= links
+    - forward: erster Zeitpunkt rechts >= links
+    - nearest: der nähere der beiden (bei Gleichstand backward)
+
+    :param left_times: Zeitpunkte, für die ein Partner gesucht wird (beliebige Reihenfolge)
+    :param right_times: aufsteigend sortierte Zeitpunkte (datetime64, ohne NaT)
+    :param direction: "backward", "forward" oder "nearest"
+    :param tolerance: maximaler Abstand (pd.Timedelta), None für unbegrenzt
+    :return: Index in right_times pro Zeitpunkt links, -1 ohne Partner
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unbekannte Richtung: {direction}")
+
+    left = as_datetime64(left_times).view("i8")
+    right = as_datetime64(right_times).view("i8")
+    missing = left == np.iinfo(np.int64).min
+    if len(right) == 0:
+        return np.full(len(left), -1)
+
+    after = np.searchsorted(right, left, side="left")
+    before = np.searchsorted(right, left, side="right") - 1
+    has_before = before >= 0
+    has_after = after < len(right)
+    unreachable = np.iinfo(np.int64).max
+    before_distance = np.where(
+        has_before, left - right[np.maximum(before, 0)], unreachable
+    )
+    after_distance = np.where(
+        has_after, right[np.minimum(after, len(right) - 1)] - left, unreachable
+    )
+
+    if direction == "backward":
+        index, distance = np.where(has_before, before, -1), before_distance
+    elif direction == "forward":
+        index, distance = np.where(has_after, after, -1), after_distance
+    else:
+        use_before = before_distance <= after_distance
+        index = np.where(use_before, np.where(has_before, before, -1), after)
+        distance = np.minimum(before_distance, after_distance)
+
+    if tolerance is not None:
+        index = np.where(distance <= pd.Timedelta(tolerance).value, index, -1)
+    return np.where(missing, -1, index)
+
+
+def asof_join(
+    left,
+    right,
+    left_on,
+    right_on,
+    columns,
+    direction="backward",
+    tolerance=None,
+):
+    """
+    As-of-Join zweier DataFrames über Zeitstempel. Jede Zeile links bleibt
+    genau einmal erhalten (in der ursprünglichen Reihenfolge) und erhält die
+    Werte der passenden Zeile rechts oder NaN, wenn innerhalb der Toleranz
+    keine existiert. Zeilen rechts mit fehlendem Zeitstempel werden ignoriert.
+
+    :param left: DataFrame, dessen Zeilen erhalten bleiben
+    :param right: DataFrame mit den zuzuordnenden Werten (beliebige Reihenfolge)
+    :param left_on: Zeitspalte links
+    :param right_on: Zeitspalte rechts
+    :param columns: Spalten von rechts, die übernommen werden
+    :param direction: "backward", "forward" oder "nearest"
+    :param tolerance: maximaler Abstand (pd.Timedelta oder String wie "10min")
+    :return: neuer DataFrame
+    """
+    right_times = as_datetime64(right[right_on])
+    valid = ~np.isnat(right_times)
+    order = np.argsort(right_times[valid], kind="stable")
+    right_times = right_times[valid][order]
+
+    index = asof_indexer(left[left_on], right_times, direction, tolerance)
+    matched = index >= 0
+
+    result = left.copy()
+    for column in columns:
+        values = right[column].to_numpy()[valid][order]
+        if values.dtype.kind in "iub":
+            values = values.astype(float)
+        if values.dtype.kind == "f":
+            joined = np.full(len(left), np.nan)
+        else:
+            joined = np.full(len(left), None, dtype=object)
+        joined[matched] = values[index[matched]]
+        result[column] = joined
+    return result
@@ -0,0 +1,77 @@
+"""
+Uhren für MQTT-Client und Sensor-Simulator.
+
+Im Normalbetrieb wird die Systemuhr verwendet. Für den Replay-Modus läuft
+eine virtuelle Uhr um einen Faktor beschleunigt, sodass z. B. ein ganzer
+Tag mit Datensammlung, stündlicher Löschung und 10-minütigem
+Vorhersagezyklus in wenigen Minuten (Faktor 1000: ca. 86 Sekunden) abläuft.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """
+    Echte Uhrzeit und echte Wartezeiten.
+    """
+
+    speed = 1.0
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, event, timeout):
+        """
+        Wartet auf ein threading.Event, höchstens ``timeout`` Sekunden.
+
+        :return: True, wenn das Event gesetzt wurde
+        """
+        return event.wait(timeout)
+
+
+class VirtualClock(SystemClock):
+    """
+    Beschleunigte Uhr: eine echte Sekunde entspricht ``speed`` virtuellen Sekunden.
+    Alle Wartezeiten werden entsprechend verkürzt.
+    """
+
+    def __init__(self, speed=1000.0, start=None):
+        """
+        :param speed: Beschleunigungsfaktor, z. B. 1000 für 1000-fache Geschwindigkeit
+        :param start: virtueller Startzeitpunkt (Standard: jetzt)
+        """
+        if speed <= 0:
+            raise ValueError(f"Ungültiger Beschleunigungsfaktor: {speed}")
+        self.speed = float(speed)
+        self.start = start or datetime.now()
+        self.real_start = time.monotonic()
+
+    def now(self):
+        elapsed = (time.monotonic() - self.real_start) * self.speed
+        return self.start + timedelta(seconds=elapsed)
+
+    def sleep(self, seconds):
+        time.sleep(seconds / self.speed)
+
+    def wait(self, event, timeout):
+        return event.wait(timeout / self.speed)
+
+
+def clock_from_environment():
+    """
+    Erstellt die Uhr anhand der Umgebungsvariablen ``REPLAY_SPEED`` (Faktor)
+    und optional ``REPLAY_START`` (ISO-Zeitpunkt). Ohne ``REPLAY_SPEED``
+    wird die Systemuhr verwendet.
+    """
+    speed = os.environ.get("REPLAY_SPEED")
+    if not speed:
+        return SystemClock()
+    start = os.environ.get("REPLAY_START")
+    return VirtualClock(
+        float(speed), datetime.fromisoformat(start) if start else None
+    )